@@ -1,11 +1,29 @@
-from fastapi import APIRouter, Request
-from time7_gateway.models.schemas import ScanResult
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Request, Response, WebSocket, WebSocketDisconnect
+from pydantic import TypeAdapter
+from time7_gateway.models.schemas import ActiveTagChanges, ScanResult
+from time7_gateway.services.response_cache import ResponseCache, etag_matches
 
 router = APIRouter()
 
 
-@router.get("/active-tags", response_model=list[ScanResult])
-def active_tags(request: Request):
+def _scan_result(t, cached) -> ScanResult:
+    auth, info = cached
+    return ScanResult(
+        tidHex=t.tidHex,
+        epcHex=t.epcHex,
+        first_seen=t.first_seen,
+        auth=auth,
+        info=info,
+    )
+
+
+_scan_results = TypeAdapter(list[ScanResult])
+
+
+def _active_rows(request: Request) -> list[ScanResult]:
     active_tags = request.app.state.active_tags
     cache = request.app.state.tag_info_cache
 
@@ -16,19 +34,96 @@ def active_tags(request: Request):
         if cached is None:
             continue
 
-        auth, info = cached
-        results.append(
-            ScanResult(
-                tidHex=t.tidHex,
-                epcHex=t.epcHex,
-                first_seen=t.first_seen,
-                auth=auth,
-                info=info,
-            )
-        )
+        results.append(_scan_result(t, cached))
 
     return results
 
+
+def _response_cache(app) -> ResponseCache:
+    cache = getattr(app.state, "active_tags_response", None)
+    if cache is None:
+        cache = app.state.active_tags_response = ResponseCache()
+    return cache
+
+
+@router.get("/active-tags", response_model=list[ScanResult])
+def active_tags(request: Request):
+    # The JSON body is built once per state version and shared by every poller;
+    # If-None-Match with the current ETag gets a bodyless 304.
+    tags = request.app.state.active_tags
+    tags.remove_inactive()
+    # changes.version covers new/expired tags and IAS results that changed for an
+    # active tag (mark_updated); the cache version also covers TTL expiry/eviction
+    key = (tags.changes.epoch, tags.changes.version, request.app.state.tag_info_cache.version)
+    body, etag = _response_cache(request.app).get(key, lambda: _scan_results.dump_json(_active_rows(request)))
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/active-tags/changes", response_model=ActiveTagChanges)
+def active_tag_changes(request: Request, since: Optional[int] = None, epoch: Optional[str] = None):
+    # Rows that changed after version `since`: `upserts` replace/insert rows by tidHex,
+    # `removed` drops them. reset=true means the client's version is unknown or too old
+    # and `upserts` is the full list (same rows as /active-tags).
+    tags = request.app.state.active_tags
+    cache = request.app.state.tag_info_cache
+    log = tags.changes
+
+    tags.remove_inactive()
+    version = log.version
+    changes = log.since(since) if since is not None and epoch == log.epoch else None
+
+    if changes is None:
+        # anything that changes while the list is built is sent again next time (upserts are idempotent)
+        return ActiveTagChanges(epoch=log.epoch, version=version, reset=True, upserts=_active_rows(request), removed=[])
+
+    upserts: list[ScanResult] = []
+    removed: list[str] = []
+    for tid in dict.fromkeys(tid for v, _, tid in changes if v <= version):
+        t = tags.get(tid)
+        cached = cache.get(tid) if t is not None else None
+        if cached is None:
+            removed.append(tid)
+        else:
+            upserts.append(_scan_result(t, cached))
+
+    return ActiveTagChanges(epoch=log.epoch, version=version, reset=False, upserts=upserts, removed=removed)
+
+
+@router.websocket("/live")
+async def live(websocket: WebSocket, max_hz: Optional[float] = None):
+    # Push feed: a snapshot first, then tag deltas and reader changes (see services/live_feed.py).
+    # max_hz lowers this client's update rate below the server's LIVE_FEED_MAX_HZ.
+    feed = websocket.app.state.live_feed
+    await websocket.accept()
+    sub = feed.subscribe(max_hz)
+
+    async def send_updates():
+        await feed.serve(sub, websocket.send_text)
+        # dropped as a slow consumer; it can reconnect and start from a snapshot
+        await websocket.close(code=1013)
+
+    sender = asyncio.create_task(send_updates())
+    try:
+        # clients don't send anything; receiving only notices the disconnect
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        feed.unsubscribe(sub)
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+
+
 @router.get("/reader-status")
 def reader_status(request: Request):
-    return {"connected": request.app.state.reader_connected}
\ No newline at end of file
+    supervisor = getattr(request.app.state, "reader_supervisor", None)
+    if supervisor is None:
+        return {"connected": request.app.state.reader_connected}
+
+    # "connected" stays the single flag the dashboard reads: true if any reader is up
+    return {"connected": supervisor.connected, "readers": supervisor.status()}
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from time7_gateway.models.schemas import HistoryPage, HistoryRead
+
+router = APIRouter()
+
+
+def _utc(dt: datetime) -> datetime:
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)
+
+
+@router.get("/history", response_model=HistoryPage)
+def history(
+    request: Request,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    tid: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=100000),
+):
+    # Reads between start and end (default: the last hour), optionally for one tidHex.
+    # Segments outside the range, or whose TID filter rules the tag out, are not read.
+    store = getattr(request.app.state, "scan_history", None)
+    if store is None:
+        raise HTTPException(status_code=404, detail="scan history not enabled (HISTORY_DIR)")
+
+    end = _utc(end) if end is not None else datetime.now(timezone.utc)
+    start = _utc(start) if start is not None else end - timedelta(hours=1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start is after end")
+
+    rows, scan = store.query(start.timestamp(), end.timestamp(), tid=tid, limit=limit)
+    reads = [
+        HistoryRead(
+            tidHex=r["tidHex"],
+            epcHex=r["epcHex"],
+            first_seen=datetime.fromtimestamp(r["first_ms"] / 1000, timezone.utc),
+            last_seen=datetime.fromtimestamp(r["last_ms"] / 1000, timezone.utc),
+            antenna=r["antenna"],
+            peakRssiCdbm=r["peakRssiCdbm"],
+            reads=r["reads"],
+            auth=r["auth"],
+            info=r["info"],
+        )
+        for r in rows
+    ]
+    return HistoryPage(
+        reads=reads,
+        truncated=scan.get("truncated", False),
+        segments_read=scan["segments_read"],
+        segments_skipped=scan["segments_skipped"],
+    )
@@ -0,0 +1,113 @@
+import time
+from typing import Dict
+
+from fastapi import APIRouter, Request, Response
+
+from time7_gateway.services.metrics import CONTENT_TYPE, Histogram, Metrics, timed
+
+router = APIRouter()
+
+# Requests timed by RequestTimer, one histogram each; anything else is not recorded
+DASHBOARD_ROUTES = ("/api/active-tags", "/api/active-tags/changes", "/api/reader-status", "/api/history")
+
+
+class RequestTimer:
+
+    # Pure ASGI middleware (no per-request Request/Response objects): an exact-path
+    # dict lookup, and two perf_counter() calls for the timed dashboard routes.
+
+    def __init__(self, app, histograms: Dict[str, Histogram]) -> None:
+        self.app = app
+        self.histograms = histograms
+
+    async def __call__(self, scope, receive, send):
+        h = self.histograms.get(scope["path"]) if scope["type"] == "http" else None
+        if h is None:
+            return await self.app(scope, receive, send)
+        t = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            h.observe(time.perf_counter() - t)
+
+
+def instrument(app) -> Metrics:
+    # Call after app.state.ias_lookup / app.state.db_upsert are set and before the
+    # pipeline and write-behind buffer pick them up.
+    metrics = Metrics()
+
+    ias = metrics.histogram("time7_ias_request_seconds", "IAS lookup latency, failures included.").labels()
+    ias_errors = metrics.counter("time7_ias_errors_total", "IAS lookups that raised.").labels()
+    app.state.ias_lookup = timed(app.state.ias_lookup, ias, ias_errors)
+
+    db = getattr(app.state, "db_upsert", None)
+    if db is not None:
+        upsert = metrics.histogram("time7_db_upsert_seconds", "Database bulk upsert latency, failures included.").labels()
+        upsert_errors = metrics.counter("time7_db_upsert_errors_total", "Database upserts that raised.").labels()
+        app.state.db_upsert = timed(db, upsert, upsert_errors)
+
+    requests = metrics.histogram("time7_http_request_seconds", "Dashboard API request latency.")
+    app.add_middleware(RequestTimer, histograms={path: requests.labels(route=path) for path in DASHBOARD_ROUTES})
+
+    metrics.collector(lambda: _gateway_samples(app))
+    return metrics
+
+
+def _gateway_samples(app):
+    # Counters the components keep anyway, read at scrape time
+    state = app.state
+
+    supervisor = getattr(state, "reader_supervisor", None)
+    for name, reader in (supervisor.states.items() if supervisor is not None else ()):
+        labels = (("reader", name),)
+        yield "time7_reader_events_received_total", "counter", "Lines received from the reader.", labels, reader.events
+        yield "time7_reader_events_filtered_total", "counter", "Received lines that were not tagInventory events.", labels, reader.filtered
+        yield "time7_reader_reconnects_total", "counter", "Reader stream reconnects.", labels, reader.reconnects
+        yield "time7_reader_connected", "gauge", "1 while the reader stream is connected.", labels, reader.connected
+
+    decoder = getattr(state, "event_decoder", None)
+    if decoder is not None:
+        yield "time7_events_decoded_total", "counter", "tagInventory events decoded.", (), decoder.decoded
+        yield "time7_events_decode_errors_total", "counter", "Lines that failed to parse.", (), decoder.errors
+    coalescer = getattr(state, "read_coalescer", None)
+    if coalescer is not None:
+        # across readers: a repeat read is coalesced whichever reader saw it first
+        yield "time7_events_coalesced_total", "counter", "Repeat reads that only refreshed last_seen.", (), coalescer.coalesced
+
+    pipeline = getattr(state, "ingest_pipeline", None)
+    for stage in (pipeline.stages if pipeline is not None else ()):
+        labels = (("stage", stage.name),)
+        yield "time7_pipeline_queue_depth", "gauge", "Items waiting in the stage queue.", labels, stage.queue.qsize()
+        yield "time7_pipeline_processed_total", "counter", "Items handled by the stage.", labels, stage.processed
+        yield "time7_pipeline_errors_total", "counter", "Stage handler failures.", labels, stage.errors
+        yield "time7_pipeline_dropped_total", "counter", "Items dropped on a full queue.", labels, stage.queue.dropped
+
+    cache = state.tag_info_cache
+    yield "time7_tag_cache_hits_total", "counter", "TagInfoCache hits.", (), cache.hits
+    yield "time7_tag_cache_misses_total", "counter", "TagInfoCache misses.", (), cache.misses
+    yield "time7_tag_cache_evictions_total", "counter", "TagInfoCache evictions.", (), cache.evictions
+    yield "time7_tag_cache_expirations_total", "counter", "TagInfoCache TTL expirations.", (), cache.expirations
+    yield "time7_tag_cache_entries", "gauge", "TagInfoCache entries.", (), len(cache)
+
+    active = state.active_tags
+    yield "time7_active_tags", "gauge", "Tags currently in view.", (), len(active)
+    yield "time7_active_tags_expired_total", "counter", "Tags that left view (grace period passed).", (), active.expired
+
+    monitor = getattr(state, "loop_monitor", None)
+    if monitor is not None:
+        yield "time7_event_loop_slow_callbacks_total", "counter", "Event-loop stalls over the slow-callback threshold.", (), monitor.slow_callbacks
+
+    writer = getattr(state, "db_writer", None)
+    if writer is not None:
+        yield "time7_db_backlog_rows", "gauge", "Rows waiting to be written.", (("buffer", "write_behind"),), len(writer)
+    outbox = getattr(state, "outbox", None)
+    if outbox is not None:
+        yield "time7_db_backlog_rows", "gauge", "Rows waiting to be written.", (("buffer", "outbox"),), outbox.stats()["backlog"]
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    """
+    Prometheus text format: ingestion, cache, IAS, database and dashboard metrics.
+    """
+    return Response(request.app.state.metrics.render(), media_type=CONTENT_TYPE)
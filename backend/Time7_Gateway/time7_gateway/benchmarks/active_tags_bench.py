@@ -0,0 +1,101 @@
+"""
+ActiveTags read/expiry cost from 1k to 1M tags in view.
+
+Compares the expiry-heap implementation against the previous full scan + sort
+(kept here as ScanSortActiveTags) for:
+  expire_none   remove_inactive() when nothing is due (every dashboard poll)
+  expire_1pct   remove_inactive() when 1% of the tags have gone quiet
+  get_active    a dashboard read (expiry check + newest-first list)
+
+    python -m time7_gateway.benchmarks.active_tags_bench --sizes 1000,10000,100000,1000000
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timezone, timedelta
+from typing import List, Optional
+
+from time7_gateway.services.active_tags import ActiveTag, ActiveTags, _ts
+
+GRACE = 5.0
+
+
+class ScanSortActiveTags(ActiveTags):
+
+    # the pre-index read path: walk every tag to expire, sort on every read
+
+    def remove_inactive(self, now: Optional[datetime] = None) -> int:
+        cutoff = _ts(now) - self._grace
+        removed = 0
+        for tid in list(self._tags.keys()):
+            if self._tags[tid].last_ts < cutoff:
+                del self._tags[tid]
+                removed += 1
+        return removed
+
+    def get_active(self, now: Optional[datetime] = None) -> List[ActiveTag]:
+        self.remove_inactive(now)
+        return sorted(self._tags.values(), key=lambda x: x.first_ts, reverse=True)
+
+
+def populate(cls, n: int, t0: datetime) -> ActiveTags:
+    # tags arrive over one second, so the first 1% go quiet first
+    tags = cls(remove_grace_seconds=GRACE)
+    step = 1.0 / n
+    for i in range(n):
+        tags.sync_seen([f"E280{i:020X}"], seen_at=t0 + timedelta(seconds=i * step))
+    return tags
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t)
+    return statistics.median(samples)
+
+
+def measure(cls, n: int, repeat: int) -> dict:
+    t0 = datetime.now(timezone.utc) - timedelta(seconds=GRACE + 60)
+    tags = populate(cls, n, t0)
+    quiet = t0 + timedelta(seconds=GRACE)            # nothing due yet
+    one_pct = t0 + timedelta(seconds=GRACE + 0.01)   # first 1% due
+
+    out = {"expire_none": timed(lambda: tags.remove_inactive(now=quiet), repeat)}
+
+    t = time.perf_counter()
+    removed = tags.remove_inactive(now=one_pct)
+    out["expire_1pct"] = time.perf_counter() - t
+    out["removed"] = removed
+
+    if isinstance(tags, ScanSortActiveTags):
+        out["get_active"] = timed(lambda: tags.get_active(now=one_pct), repeat)
+    else:
+        def read():
+            tags.remove_inactive(now=one_pct)
+            with tags._lock:
+                items = tags._ordered()
+            items.reverse()
+        out["get_active"] = timed(read, repeat)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'tags':>9} {'impl':<10} {'expire_none':>12} {'expire_1pct':>12} {'get_active':>12}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        for label, cls in (("scan+sort", ScanSortActiveTags), ("heap", ActiveTags)):
+            r = measure(cls, n, args.repeat)
+            print(
+                f"{n:>9,} {label:<10} {r['expire_none'] * 1e3:>10.3f}ms {r['expire_1pct'] * 1e3:>10.3f}ms "
+                f"{r['get_active'] * 1e3:>10.3f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
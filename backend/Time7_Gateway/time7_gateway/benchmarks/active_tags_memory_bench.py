@@ -0,0 +1,114 @@
+"""
+Memory per tag and sync_seen throughput: slotted ActiveTag vs the previous dataclass.
+
+LegacyActiveTags is the earlier record layout (a @dataclass holding two aware
+datetimes) with a plain dict and no expiry index, copied here for comparison.
+
+    python -m time7_gateway.benchmarks.active_tags_memory_bench --tags 100000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Optional
+
+from time7_gateway.services.active_tags import ActiveTags, _utc
+
+
+@dataclass
+class LegacyActiveTag:
+    tidHex: str
+    first_seen: datetime
+    last_seen: datetime
+    epcHex: Optional[str] = None
+    messageHex: Optional[str] = None
+    responseHex: Optional[str] = None
+    reads: int = 1
+
+
+class LegacyActiveTags:
+
+    def __init__(self, remove_grace_seconds: float) -> None:
+        self._tags: Dict[str, LegacyActiveTag] = {}
+
+    def sync_seen(self, tidHex, epcHex=None, messageHex=None, responseHex=None, seen_at=None):
+        now = _utc(seen_at) if seen_at else datetime.now(timezone.utc)
+        new_ids = set()
+        for tid in {str(t) for t in (tidHex or [])}:
+            epc_val = epcHex.get(tid) if epcHex else None
+            msg_val = messageHex.get(tid) if messageHex else None
+            resp_val = responseHex.get(tid) if responseHex else None
+            cur = self._tags.get(tid)
+            if cur is None:
+                self._tags[tid] = LegacyActiveTag(tid, now, now, epc_val, msg_val, resp_val)
+                new_ids.add(tid)
+            else:
+                cur.last_seen = now
+                cur.reads += 1
+                if epcHex is not None:
+                    cur.epcHex = epc_val
+                if messageHex is not None:
+                    cur.messageHex = msg_val
+                if responseHex is not None:
+                    cur.responseHex = resp_val
+        return new_ids
+
+
+def ids(n: int):
+    return [(f"E280{i:020X}", f"3036{i:020X}") for i in range(n)]
+
+
+def bytes_per_tag(cls, n: int) -> float:
+    tags_in = ids(n)
+    t0 = datetime.now(timezone.utc)
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tags = cls(remove_grace_seconds=5.0)
+    for i, (tid, epc) in enumerate(tags_in):
+        # distinct timestamps, like real reads
+        tags.sync_seen([tid], epcHex={tid: epc}, seen_at=t0 + timedelta(microseconds=i))
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del tags
+    return used / n
+
+
+def reads_per_second(cls, n: int, rounds: int) -> dict:
+    tags_in = ids(n)
+    tags = cls(remove_grace_seconds=5.0)
+    t0 = datetime.now(timezone.utc)
+
+    t = time.perf_counter()
+    for tid, epc in tags_in:
+        tags.sync_seen([tid], epcHex={tid: epc}, seen_at=t0)
+    first = n / (time.perf_counter() - t)
+
+    t = time.perf_counter()
+    for r in range(rounds):
+        seen_at = t0 + timedelta(seconds=r + 1)
+        for tid, epc in tags_in:
+            tags.sync_seen([tid], epcHex={tid: epc}, seen_at=seen_at)
+    repeat = n * rounds / (time.perf_counter() - t)
+    return {"new": first, "repeat": repeat}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tags", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    for label, cls in (("dataclass", LegacyActiveTags), ("slots", ActiveTags)):
+        mem = bytes_per_tag(cls, args.tags)
+        rate = reads_per_second(cls, args.tags, args.rounds)
+        print(
+            f"{label:<10} {mem:7.0f} B/tag   sync_seen new {rate['new']:>10,.0f}/s   "
+            f"repeat {rate['repeat']:>10,.0f}/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
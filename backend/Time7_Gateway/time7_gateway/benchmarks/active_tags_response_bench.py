@@ -0,0 +1,121 @@
+"""
+/api/active-tags throughput: the per-request handler (rows rebuilt, validated and
+encoded by FastAPI on every poll, kept here as legacy_active_tags) vs the
+version-keyed serialized body, with and without If-None-Match revalidation.
+
+Clients poll in-process through httpx's ASGI transport, so the numbers are the
+handler + framework cost without sockets. --churn changes that many tags per
+second while polling to show how often the cached body is actually rebuilt.
+
+    python -m time7_gateway.benchmarks.active_tags_response_bench --sizes 1000 10000 50000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timezone
+
+import httpx
+from fastapi import FastAPI, Request
+
+from time7_gateway.api.dashboard import _scan_result, router as dashboard_router
+from time7_gateway.models.schemas import ScanResult
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.tag_info_cache import TagInfoCache
+
+
+def legacy_active_tags(request: Request):
+    # the handler before the response cache
+    active_tags = request.app.state.active_tags
+    cache = request.app.state.tag_info_cache
+
+    results: list[ScanResult] = []
+
+    for t in active_tags.get_active():
+        cached = cache.get(t.tidHex)
+        if cached is None:
+            continue
+
+        results.append(_scan_result(t, cached))
+
+    return results
+
+
+def make_app(n: int) -> FastAPI:
+    app = FastAPI()
+    app.include_router(dashboard_router, prefix="/api")
+    app.add_api_route("/legacy/active-tags", legacy_active_tags, response_model=list[ScanResult])
+    app.state.active_tags = ActiveTags(remove_grace_seconds=3600.0)
+    app.state.tag_info_cache = TagInfoCache()
+    for i in range(n):
+        see(app, f"E280{i:020X}", f"3036{i:020X}")
+    return app
+
+
+def see(app: FastAPI, tid: str, epc: str) -> None:
+    app.state.active_tags.sync_seen([tid], epcHex={tid: epc}, seen_at=datetime.now(timezone.utc))
+    if app.state.tag_info_cache.set(tid, True, "ok"):
+        app.state.active_tags.mark_updated(tid)
+
+
+async def churn(app: FastAPI, per_second: int, stop: asyncio.Event) -> None:
+    i = 0
+    while per_second and not stop.is_set():
+        await asyncio.sleep(1.0 / per_second)
+        see(app, f"E280{i:020X}", f"{time.monotonic_ns():024X}")
+        i += 1
+
+
+async def poller(client: httpx.AsyncClient, path: str, revalidate: bool, stop: asyncio.Event, out: list) -> None:
+    etag = None
+    while not stop.is_set():
+        headers = {"If-None-Match": etag} if revalidate and etag else None
+        t = time.perf_counter()
+        resp = await client.get(path, headers=headers)
+        out.append(time.perf_counter() - t)
+        if resp.status_code == 200:
+            etag = resp.headers.get("etag")
+
+
+async def run(n: int, mode: str, clients: int, seconds: float, churn_per_s: int) -> dict:
+    app = make_app(n)
+    path = "/legacy/active-tags" if mode == "legacy" else "/api/active-tags"
+    latencies: list = []
+    stop = asyncio.Event()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get(path)   # warm up (first build for the cached modes)
+        tasks = [asyncio.create_task(poller(client, path, mode == "etag", stop, latencies)) for _ in range(clients)]
+        tasks.append(asyncio.create_task(churn(app, churn_per_s, stop)))
+        t0 = time.perf_counter()
+        await asyncio.sleep(seconds)
+        stop.set()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - t0
+
+    builds = app.state.active_tags_response.builds if mode != "legacy" else len(latencies)
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": statistics.quantiles(latencies, n=100)[98] * 1000 if len(latencies) > 1 else latencies[0] * 1000,
+        "builds": builds,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--clients", type=int, default=8, help="concurrent pollers")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--churn", type=int, default=2, help="tag changes per second while polling")
+    args = parser.parse_args()
+
+    print(f"{'tags':>7} {'mode':<7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'builds':>7}")
+    for n in args.sizes:
+        for mode in ("legacy", "cached", "etag"):
+            r = asyncio.run(run(n, mode, args.clients, args.seconds, args.churn))
+            print(f"{n:>7} {mode:<7} {r['rps']:>9.1f} {r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['builds']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Ingestion cost per event with and without the read coalescing window.
+
+Replays a capture through build_ingest_pipeline with real ActiveTags/TagInfoCache,
+the mock IAS and a no-op database.
+
+    python -m time7_gateway.benchmarks.coalesce_bench --file datastream4.ndjson --window 1.0
+"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from time7_gateway.clients.reader_client import build_ingest_pipeline
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.tag_info_cache import TagInfoCache
+from time7_gateway.simulators.ias_services import mock_ias_lookup
+
+SIM_DIR = Path(__file__).resolve().parents[1] / "simulators"
+CHUNK_LINES = 16
+
+
+def make_app():
+    return SimpleNamespace(state=SimpleNamespace(
+        active_tags=ActiveTags(remove_grace_seconds=5.0),
+        tag_info_cache=TagInfoCache(cache_ttl_hours=24),
+        ias_lookup=mock_ias_lookup,
+    ))
+
+
+async def run_once(lines: list, window: float) -> dict:
+    app = make_app()
+    pipeline = build_ingest_pipeline(app, coalesce_window=window, persist_fn=lambda **kw: None)
+    pipeline.start()
+
+    t0 = time.perf_counter()
+    c0 = time.process_time()
+    for i, line in enumerate(lines):
+        await pipeline.put(line)
+        if i % CHUNK_LINES == 0:
+            # the real read loop awaits the socket between chunks
+            await asyncio.sleep(0)
+    await pipeline.drain()
+    cpu = time.process_time() - c0
+    elapsed = time.perf_counter() - t0
+    await pipeline.stop()
+
+    c = app.state.read_coalescer
+    return {
+        "events": len(lines),
+        "elapsed": elapsed,
+        "cpu_us_per_event": cpu / len(lines) * 1e6,
+        "coalesced": c.coalesced,
+        "full": c.full,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", default="datastream4.ndjson")
+    parser.add_argument("--window", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with (SIM_DIR / args.file).open("rb") as f:
+        lines = [line.strip() for line in f if line.strip()]
+
+    for window in (0.0, args.window):
+        best = min((asyncio.run(run_once(lines, window)) for _ in range(args.repeat)), key=lambda r: r["elapsed"])
+        print(
+            f"window={window:<5} {best['events'] / best['elapsed']:>10,.0f} ev/s  "
+            f"{best['cpu_us_per_event']:6.1f} us cpu/ev  full={best['full']} coalesced={best['coalesced']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Rows/sec written through the Supabase REST client vs the pooled async SQL backend
+(DB_MODE=sql), per-row and in bulk batches.
+
+By default both sides write to local SQLite files so only the write path differs:
+  rest  the real supabase-py client posting to a PostgREST stand-in (uvicorn child
+        process, upserts the JSON rows into SQLite)
+  sql   SqlDatabase on sqlite+aiosqlite, `--concurrency` batches in flight
+Point them at real services with --supabase-url/--supabase-key and --database-url.
+
+    python -m time7_gateway.benchmarks.db_backend_bench --rows 5000 --batch 1 100 500
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+from fastapi import FastAPI, Request
+
+from time7_gateway.benchmarks.multi_reader_bench import free_port
+from time7_gateway.services.database import tag_row
+from time7_gateway.services.sql_database import SqlDatabase
+
+# --- PostgREST stand-in (runs in the uvicorn child) ---
+
+rest_app = FastAPI()
+_db = None
+
+
+def _conn() -> sqlite3.Connection:
+    global _db
+    if _db is None:
+        _db = sqlite3.connect(os.environ["REST_BENCH_DB"], check_same_thread=False)
+        _db.execute("PRAGMA journal_mode=WAL")
+        _db.execute(
+            "CREATE TABLE IF NOT EXISTS data (tid_hex TEXT PRIMARY KEY, first_seen TEXT, auth INTEGER, info TEXT, epc_hex TEXT)"
+        )
+    return _db
+
+
+@rest_app.post("/rest/v1/data")
+async def _upsert(request: Request):
+    rows = await request.json()
+    if isinstance(rows, dict):
+        rows = [rows]
+    db = _conn()
+    db.executemany(
+        "INSERT INTO data VALUES (:tid_hex, :first_seen, :auth, :info, :epc_hex) "
+        "ON CONFLICT (tid_hex) DO UPDATE SET first_seen=excluded.first_seen, auth=excluded.auth, "
+        "info=excluded.info, epc_hex=excluded.epc_hex",
+        rows,
+    )
+    db.commit()
+    return rows
+
+
+@rest_app.get("/ping")
+def _ping():
+    return {"ok": True}
+
+
+def start_rest(port: int, path: str) -> subprocess.Popen:
+    env = dict(os.environ, REST_BENCH_DB=path)
+    cmd = [
+        sys.executable, "-m", "uvicorn", "time7_gateway.benchmarks.db_backend_bench:rest_app",
+        "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+    ]
+    proc = subprocess.Popen(cmd, env=env)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/ping", timeout=0.5)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("REST stand-in did not start")
+
+
+# --- client side ---
+
+def make_rows(n: int, round_: int) -> list:
+    seen = datetime.now(timezone.utc)
+    return [tag_row(f"E280{i:020X}", seen, True, f"ok {round_}", f"3036{i:020X}") for i in range(n)]
+
+
+def run_rest(url: str, key: str, rows: list, batch: int) -> float:
+    from supabase import create_client
+
+    sb = create_client(url, key)
+    t0 = time.perf_counter()
+    for i in range(0, len(rows), batch):
+        chunk = rows[i:i + batch]
+        sb.table("data").upsert(chunk if batch > 1 else chunk[0]).execute()
+    return time.perf_counter() - t0
+
+
+async def run_sql(url: str, rows: list, batch: int, concurrency: int) -> float:
+    db = SqlDatabase(url, pool_size=concurrency)
+    await db.prepare()
+    sem = asyncio.Semaphore(concurrency)
+
+    async def write(chunk):
+        async with sem:
+            await db.upsert_latest_tags(chunk)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(write(rows[i:i + batch]) for i in range(0, len(rows), batch)))
+    elapsed = time.perf_counter() - t0
+    await db.close()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 100, 500])
+    parser.add_argument("--concurrency", type=int, default=4, help="SQL batches in flight (pool size)")
+    parser.add_argument("--supabase-url", default=None)
+    parser.add_argument("--supabase-key", default="x" * 40)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="db_backend_bench_")
+    server = None
+    rest_url = args.supabase_url
+    if rest_url is None:
+        port = free_port()
+        server = start_rest(port, os.path.join(tmp, "rest.sqlite"))
+        rest_url = f"http://127.0.0.1:{port}"
+    sql_url = args.database_url or f"sqlite+aiosqlite:///{os.path.join(tmp, 'sql.sqlite')}"
+
+    try:
+        print(f"{args.rows} rows")
+        print(f"{'backend':<8} {'batch':>6} {'rows/s':>10}")
+        for batch in args.batch:
+            for backend in ("rest", "sql"):
+                rows = make_rows(args.rows, batch)
+                if backend == "rest":
+                    elapsed = run_rest(rest_url, args.supabase_key, rows, batch)
+                else:
+                    elapsed = asyncio.run(run_sql(sql_url, rows, batch, args.concurrency))
+                print(f"{backend:<8} {batch:>6} {len(rows) / elapsed:>10.0f}")
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+
+if __name__ == "__main__":
+    main()
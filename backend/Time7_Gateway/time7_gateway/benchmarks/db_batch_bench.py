@@ -0,0 +1,103 @@
+"""
+A pallet of new tags arriving at once: database round-trips and time until every
+row is written, per-record upserts (the previous persist stage) vs the write-behind
+buffer with bulk upserts.
+
+The database is simulated: each call sleeps --rtt-ms plus --row-us per row (in the
+worker thread, like the blocking Supabase client). Tags arrive without an
+authentication response, so they go straight to persist (no IAS).
+
+    python -m time7_gateway.benchmarks.db_batch_bench --tags 500 --rtt-ms 40
+"""
+import argparse
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from time7_gateway.clients.reader_client import build_ingest_pipeline
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.tag_info_cache import TagInfoCache
+from time7_gateway.services.write_behind import WriteBehind
+from time7_gateway.simulators.ias_services import mock_ias_lookup
+
+
+class FakeDatabase:
+
+    def __init__(self, rtt: float, per_row: float) -> None:
+        self.rtt = rtt
+        self.per_row = per_row
+        self.calls = 0
+        self.rows = 0
+        self._lock = threading.Lock()
+
+    def _call(self, n: int) -> None:
+        time.sleep(self.rtt + n * self.per_row)
+        with self._lock:
+            self.calls += 1
+            self.rows += n
+
+    def upsert_latest_tag(self, **kw) -> None:
+        self._call(1)
+
+    def upsert_latest_tags(self, rows) -> None:
+        self._call(len(rows))
+
+
+def pallet(n: int) -> list:
+    return [
+        {"eventType": "tagInventory", "tagInventoryEvent": {"tidHex": f"E280{i:020X}", "epcHex": f"3036{i:020X}"}}
+        for i in range(n)
+    ]
+
+
+async def run(mode: str, events: list, db: FakeDatabase, max_batch: int, max_age: float) -> dict:
+    app = SimpleNamespace(state=SimpleNamespace(
+        active_tags=ActiveTags(remove_grace_seconds=60.0),
+        tag_info_cache=TagInfoCache(),
+        ias_lookup=mock_ias_lookup,
+    ))
+    writer = None
+    if mode == "per-row":
+        pipeline = build_ingest_pipeline(app, coalesce_window=0, persist_fn=db.upsert_latest_tag)
+    else:
+        writer = WriteBehind(db.upsert_latest_tags, max_batch=max_batch, max_age=max_age)
+        pipeline = build_ingest_pipeline(app, coalesce_window=0, writer=writer)
+    pipeline.start()
+
+    t0 = time.perf_counter()
+    for ev in events:
+        await pipeline.put(ev)
+    await pipeline.drain()
+    ingested = time.perf_counter() - t0
+    if writer is not None:
+        while db.rows < len(events):
+            await asyncio.sleep(0.001)
+    written = time.perf_counter() - t0
+    await pipeline.stop()
+    if writer is not None:
+        await writer.close()
+
+    return {"calls": db.calls, "ingested_s": ingested, "written_s": written}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tags", type=int, default=500)
+    parser.add_argument("--rtt-ms", type=float, default=40.0, help="simulated round-trip per upsert call")
+    parser.add_argument("--row-us", type=float, default=50.0, help="simulated cost per row in a call")
+    parser.add_argument("--max-batch", type=int, default=500)
+    parser.add_argument("--max-age", type=float, default=0.5)
+    args = parser.parse_args()
+
+    events = pallet(args.tags)
+    print(f"{args.tags} new tags, {args.rtt_ms:.0f} ms round-trip")
+    print(f"{'mode':<13} {'db calls':>8} {'pipeline drained':>17} {'all rows written':>17}")
+    for mode in ("per-row", "write-behind"):
+        db = FakeDatabase(args.rtt_ms / 1000, args.row_us / 1e6)
+        r = asyncio.run(run(mode, events, db, args.max_batch, args.max_age))
+        print(f"{mode:<13} {r['calls']:>8} {r['ingested_s'] * 1000:>15.1f}ms {r['written_s'] * 1000:>15.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
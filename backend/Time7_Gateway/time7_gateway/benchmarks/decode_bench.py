@@ -0,0 +1,65 @@
+"""
+Per-event decode cost for the reader NDJSON stream.
+
+Compares the original path (json.loads to a dict, then dict lookups) with
+ImpinjEventDecoder on each installed backend.
+
+    python -m time7_gateway.benchmarks.decode_bench --file datastream3.ndjson
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+from time7_gateway.clients.event_decoder import ImpinjEventDecoder, available_backends
+
+SIM_DIR = Path(__file__).resolve().parents[1] / "simulators"
+
+
+def load_lines(name: str) -> list:
+    with (SIM_DIR / name).open("rb") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def baseline_decode(line: bytes):
+    # what run_reader_stream did before the decoder existed
+    ev = json.loads(line)
+    if ev.get("eventType") != "tagInventory":
+        return None
+    tie = ev.get("tagInventoryEvent", {})
+    tar = tie.get("tagAuthenticationResponse", {})
+    return tie.get("tidHex"), tie.get("epcHex"), tar.get("messageHex"), tar.get("responseHex")
+
+
+def time_it(fn, lines: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for line in lines:
+            fn(line)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", default="datastream3.ndjson")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    lines = load_lines(args.file)
+    print(f"{args.file}: {len(lines)} lines\n")
+
+    rows = [("json.loads (baseline)", time_it(baseline_decode, lines, args.repeat))]
+    for backend in available_backends():
+        dec = ImpinjEventDecoder(backend)
+        rows.append((f"decoder[{backend}]", time_it(dec.decode, lines, args.repeat)))
+
+    base = rows[0][1]
+    for name, elapsed in rows:
+        per_event_us = elapsed / len(lines) * 1e6
+        print(f"{name:24s} {len(lines) / elapsed:>12,.0f} ev/s  {per_event_us:7.2f} us/ev  x{base / elapsed:5.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Read-history cost: ingest throughput with and without ScanHistory, then query
+latency over what was written.
+
+Replays the captures through build_ingest_pipeline at --speed x their recorded
+pace (mock IAS, no-op database). Each pass gives the tags new TIDs (a new pallet),
+so the history holds --passes x the capture's tags. The history clock follows the
+capture's own timeline, so a 20 s capture replayed 30 times is ~10 minutes of reads
+split into --segment-seconds segments.
+
+    python -m time7_gateway.benchmarks.history_bench --files datastream3.ndjson datastream4.ndjson --speed 100
+"""
+import argparse
+import asyncio
+import json
+import re
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List, Optional, Tuple
+
+from time7_gateway.clients.reader_client import build_ingest_pipeline
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.scan_history import ScanHistory
+from time7_gateway.services.tag_info_cache import TagInfoCache
+from time7_gateway.simulators.ias_services import mock_ias_lookup
+
+SIM_DIR = Path(__file__).resolve().parents[1] / "simulators"
+_TID = re.compile(rb'"tidHex": ?"([0-9A-Fa-f]+)"')
+
+
+def load(files: List[str], passes: int) -> Tuple[List[Tuple[float, bytes]], List[List[str]], float]:
+    # [(capture offset seconds, line)] back to back over all passes, the TIDs of each
+    # pass and the length of one pass
+    base = []
+    for name in files:
+        with (SIM_DIR / name).open("rb") as f:
+            for line in f:
+                line = line.strip()
+                if b'"tagInventory"' not in line:
+                    continue
+                ts = json.loads(line)["timestamp"]
+                base.append((datetime.fromisoformat(ts[:26].rstrip("Z") + "+00:00").timestamp(), line))
+    base.sort(key=lambda x: x[0])
+    t0, span = base[0][0], base[-1][0] - base[0][0] + 1.0
+
+    events, tids = [], []
+    for p in range(passes):
+        suffix = f"{p:04X}".encode()
+        seen = set()
+        for ts, line in base:
+            line = _TID.sub(lambda m: m.group(0)[:-1] + suffix + b'"', line)
+            seen.update(m.group(1).decode() for m in _TID.finditer(line))
+            events.append((p * span + ts - t0, line))
+        tids.append(sorted(seen))
+    return events, tids, span
+
+
+async def ingest(events, speed: float, history: Optional[ScanHistory], clock) -> dict:
+    app = SimpleNamespace(state=SimpleNamespace(
+        active_tags=ActiveTags(remove_grace_seconds=5.0),
+        tag_info_cache=TagInfoCache(),
+        ias_lookup=mock_ias_lookup,
+        scan_history=history,
+    ))
+    if history is not None:
+        history.auth_of = app.state.tag_info_cache.peek
+    pipeline = build_ingest_pipeline(app, persist_fn=lambda **kw: None)
+    pipeline.start()
+    flusher = asyncio.create_task(history.run_flusher(interval=1.0 / speed * 10)) if history else None
+
+    t0 = time.perf_counter()
+    c0 = time.process_time()
+    clock.start(t0)
+    max_lag = 0.0
+    for i, (offset, line) in enumerate(events):
+        due = offset / speed
+        ahead = due - (time.perf_counter() - t0)
+        if ahead > 0.002:
+            await asyncio.sleep(ahead)
+        else:
+            max_lag = max(max_lag, -ahead)
+            if i % 16 == 0:
+                await asyncio.sleep(0)
+        await pipeline.put(line)
+    await pipeline.drain()
+    elapsed = time.perf_counter() - t0
+    cpu = time.process_time() - c0
+    await pipeline.stop()
+    if flusher is not None:
+        flusher.cancel()
+        await asyncio.gather(flusher, return_exceptions=True)
+        history.close()
+
+    return {
+        "events_per_s": len(events) / elapsed,
+        "cpu_us_per_event": cpu / len(events) * 1e6,
+        "max_lag_ms": max_lag * 1000,
+    }
+
+
+class ReplayClock:
+
+    # capture time at `speed` x wall time, so history timestamps follow the capture
+
+    def __init__(self, start: float, speed: float) -> None:
+        self.origin = start
+        self.speed = speed
+        self.t0 = time.perf_counter()
+
+    def start(self, t0: float) -> None:
+        self.t0 = t0
+
+    def __call__(self) -> float:
+        return self.origin + (time.perf_counter() - self.t0) * self.speed
+
+
+def timed(fn, runs: int) -> Tuple[float, float, dict]:
+    samples, out = [], None
+    for _ in range(runs):
+        t = time.perf_counter()
+        out = fn()
+        samples.append(time.perf_counter() - t)
+    samples.sort()
+    return statistics.median(samples) * 1000, samples[int(len(samples) * 0.99) - 1] * 1000, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", nargs="+", default=["datastream3.ndjson", "datastream4.ndjson"])
+    parser.add_argument("--speed", type=float, default=100.0)
+    parser.add_argument("--passes", type=int, default=30)
+    parser.add_argument("--segment-seconds", type=float, default=60.0)
+    parser.add_argument("--runs", type=int, default=50, help="repetitions per query")
+    args = parser.parse_args()
+
+    events, tids, pass_span = load(args.files, args.passes)
+    span = events[-1][0]
+    print(f"{len(events)} reads, {sum(map(len, tids))} tags, {span:.0f} s of capture time at {args.speed:.0f}x")
+
+    origin = 1_760_000_000.0
+    directory = tempfile.mkdtemp(prefix="history_bench_")
+    try:
+        r = asyncio.run(ingest(events, args.speed, None, ReplayClock(origin, args.speed)))
+        print(f"ingest  no history   {r['events_per_s']:>9,.0f} ev/s  {r['cpu_us_per_event']:6.1f} us cpu/ev  max lag {r['max_lag_ms']:.0f} ms")
+
+        clock = ReplayClock(origin, args.speed)
+        history = ScanHistory(directory, segment_seconds=args.segment_seconds, retention_seconds=None, clock=clock)
+        r = asyncio.run(ingest(events, args.speed, history, clock))
+        print(f"ingest  history      {r['events_per_s']:>9,.0f} ev/s  {r['cpu_us_per_event']:6.1f} us cpu/ev  max lag {r['max_lag_ms']:.0f} ms")
+
+        history = ScanHistory(directory, retention_seconds=None)
+        s = history.stats()
+        print(
+            f"history: {s['segments']} segments, {s['records']:,} records "
+            f"({len(events) / max(1, s['records']):.1f} reads/record), {s['disk_bytes'] / 1024:.0f} KiB"
+        )
+
+        end = origin + span * 2   # replay lag stretches the recorded timeline a little
+        mid = origin + span / 2
+        mid_tid = tids[int(span / 2 / pass_span)][0]   # a tag read inside the 60 s window
+        queries = [
+            ("all", lambda: history.query(origin, end, limit=10 ** 7)),
+            ("60 s window", lambda: history.query(mid, mid + 60, limit=10 ** 7)),
+            ("one tid, all time", lambda: history.query(origin, end, tid=mid_tid)),
+            ("one tid, 60 s", lambda: history.query(mid, mid + 60, tid=mid_tid)),
+            ("absent tid", lambda: history.query(origin, end, tid="FFFFFFFFFFFFFFFFFFFFFFFF")),
+        ]
+        print(f"{'query':<18} {'p50 ms':>8} {'p99 ms':>8} {'rows':>7} {'segs read':>9} {'skipped':>8}")
+        for name, fn in queries:
+            p50, p99, (rows, scan) = timed(fn, args.runs)
+            print(f"{name:<18} {p50:>8.2f} {p99:>8.2f} {len(rows):>7} {scan['segments_read']:>9} {scan['segments_skipped']:>8}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
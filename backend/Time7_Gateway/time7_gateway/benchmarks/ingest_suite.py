@@ -0,0 +1,458 @@
+"""
+End-to-end ingestion benchmark: the bundled captures and synthetic scenarios through
+the real ImpinjReaderClient -> ingest pipeline -> ActiveTags / TagInfoCache ->
+/api/active-tags path.
+
+The simulator (the same replay / generator code as /data/stream) is served
+in-process over a streaming ASGI transport. IAS is MockIASClient (--ias-latency-ms)
+and the database a WriteBehind whose flush only waits --db-latency-ms. Every scenario
+runs in its own process, so peak RSS is per scenario, in two phases:
+  throughput  source unthrottled for --seconds: decoded events/s and CPU per event
+              (gateway CPU = process CPU minus the simulator's own, measured alone)
+  latency     source paced (captures at --latency-speed x, synthetic at
+              --latency-rate reads/s), dashboard polled every --poll-ms: first read of
+              a tag -> first /api/active-tags body that lists it, p50/p99
+Results are written to --out as JSON; --compare old.json prints the change per metric.
+
+    python -m time7_gateway.benchmarks.ingest_suite --seconds 5
+    python -m time7_gateway.benchmarks.ingest_suite --scenarios datastream4 synthetic-churn --compare ingest_suite_abc123.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import re
+import resource
+import statistics
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from time7_gateway.api.dashboard import router as dashboard_router
+from time7_gateway.api.metrics import instrument
+from time7_gateway.clients.reader_client import ReaderDefinition, ReaderState, build_ingest_pipeline, run_reader_stream
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.response_cache import ResponseCache
+from time7_gateway.services.tag_info_cache import TagInfoCache
+from time7_gateway.services.write_behind import WriteBehind
+from time7_gateway.simulators.capture_replay import capture_index, replay_stream
+from time7_gateway.simulators.ias_services import MockIASClient
+from time7_gateway.simulators.tag_generator import GeneratorConfig, SyntheticReader, parse_mix
+
+SIM_DIR = Path(__file__).resolve().parents[1] / "simulators"
+SIM_URL = "http://simulator"
+_TID = re.compile(rb'"tidHex": ?"([0-9A-Fa-f]*)"')
+
+MIX = "passing=7,failing=1,unsupported=1,disabled=1"
+
+
+@dataclass
+class Scenario:
+    name: str
+    file: Optional[str] = None              # capture replay, or
+    generator: dict = field(default_factory=dict)   # GeneratorConfig fields
+
+
+SCENARIOS = [Scenario(f"datastream{i}", file=f"datastream{i}.ndjson") for i in range(1, 6)] + [
+    Scenario("synthetic-5k", generator={"tags": 5000, "churn": 0.0, "mix": MIX}),
+    Scenario("synthetic-churn", generator={"tags": 1000, "churn": 200.0, "mix": MIX}),
+]
+
+
+def make_stream(scenario: Scenario, paced: bool, args) -> AsyncIterator[bytes]:
+    if scenario.file is not None:
+        index = capture_index(SIM_DIR / scenario.file)
+        # paced: one pass at the recorded timing; unthrottled: loop for as long as it runs
+        return replay_stream(index, speed=args.latency_speed if paced else 0, loop=not paced)
+    cfg = dict(scenario.generator, mix=parse_mix(scenario.generator["mix"]))
+    return SyntheticReader(GeneratorConfig(rate=args.latency_rate if paced else 0, seed=1, **cfg)).stream()
+
+
+# --- in-process transport ---
+
+class StreamingASGITransport(httpx.AsyncBaseTransport):
+
+    # httpx.ASGITransport collects the whole body before returning, which never
+    # happens for an endless /data/stream. This one hands body chunks over as the app
+    # sends them, through a small queue so a slow reader holds the simulator back
+    # the way a TCP window would.
+
+    def __init__(self, app, queue_size: int = 8) -> None:
+        self.app = app
+        self.queue_size = queue_size
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        chunks: asyncio.Queue = asyncio.Queue(self.queue_size)
+        started = asyncio.get_running_loop().create_future()
+        closed = asyncio.Event()
+        request_sent = False
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": request.method,
+            "headers": [(k.lower(), v) for k, v in request.headers.raw],
+            "scheme": request.url.scheme,
+            "path": request.url.path,
+            "raw_path": request.url.raw_path.split(b"?")[0],
+            "query_string": request.url.query,
+            "server": (request.url.host, request.url.port or 80),
+            "client": ("127.0.0.1", 0),
+            "root_path": "",
+        }
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await closed.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                started.set_result((message["status"], message.get("headers", [])))
+            elif message["type"] == "http.response.body":
+                if message.get("body"):
+                    await chunks.put(message["body"])
+                if not message.get("more_body", False):
+                    await chunks.put(None)
+
+        async def run_app():
+            try:
+                await self.app(scope, receive, send)
+            except Exception as e:
+                if not started.done():
+                    started.set_exception(e)
+            finally:
+                # cancelled with a full queue means nobody is reading any more
+                try:
+                    chunks.put_nowait(None)
+                except asyncio.QueueFull:
+                    pass
+
+        task = asyncio.create_task(run_app())
+        status, headers = await started
+        return httpx.Response(status, headers=headers, stream=_QueueStream(chunks, task, closed), request=request)
+
+
+class _QueueStream(httpx.AsyncByteStream):
+
+    def __init__(self, chunks: asyncio.Queue, task: asyncio.Task, closed: asyncio.Event) -> None:
+        self._chunks = chunks
+        self._task = task
+        self._closed = closed
+
+    async def __aiter__(self):
+        while True:
+            chunk = await self._chunks.get()
+            if chunk is None:
+                return
+            yield chunk
+
+    async def aclose(self) -> None:
+        self._closed.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+def simulator_app(make_body: Callable[[], AsyncIterator[bytes]]) -> FastAPI:
+    sim = FastAPI()
+
+    @sim.get("/data/stream")
+    async def data_stream():
+        return StreamingResponse(make_body(), media_type="application/x-ndjson")
+
+    return sim
+
+
+# --- gateway under test ---
+
+class StandInDatabase:
+
+    # bulk upsert that only costs a round-trip
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.rows = 0
+
+    async def upsert_latest_tags(self, rows: List[dict]) -> None:
+        await asyncio.sleep(self.latency)
+        self.rows += len(rows)
+
+
+def build_gateway(args) -> FastAPI:
+    app = FastAPI()
+    app.include_router(dashboard_router, prefix="/api")
+    app.state.active_tags = ActiveTags(remove_grace_seconds=5.0)
+    app.state.tag_info_cache = TagInfoCache(cache_ttl_hours=24)
+    app.state.active_tags_response = ResponseCache()
+    app.state.ias_client = MockIASClient(latency=args.ias_latency_ms / 1000.0)
+    app.state.ias_lookup = app.state.ias_client.lookup
+    app.state.database = StandInDatabase(args.db_latency_ms / 1000.0)
+    app.state.db_upsert = app.state.database.upsert_latest_tags
+    if getattr(args, "metrics", False):
+        app.state.metrics = instrument(app)
+    app.state.db_writer = WriteBehind(app.state.db_upsert)
+    return app
+
+
+class Gateway:
+
+    # gateway app + one reader streaming from an in-process simulator
+
+    def __init__(self, args, make_body: Callable[[], AsyncIterator[bytes]], name: str) -> None:
+        self.app = build_gateway(args)
+        self.pipeline = build_ingest_pipeline(self.app)
+        self.state = ReaderState(name=name, base_url=SIM_URL)
+        self._transport = StreamingASGITransport(simulator_app(make_body))
+        self._reader = ReaderDefinition(name=name, base_url=SIM_URL)
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self.pipeline.start()
+        self.task = asyncio.create_task(
+            run_reader_stream(self.app, self.pipeline, self._reader, self.state, transport=self._transport)
+        )
+
+    async def stop(self) -> None:
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        await self.pipeline.stop()
+        await self.app.state.db_writer.close()
+
+
+# --- phases ---
+
+async def simulator_cost(scenario: Scenario, args, seconds: float = 0.5) -> float:
+    # CPU per event of the simulator alone, subtracted from the throughput phase
+    stream = make_stream(scenario, paced=False, args=args)
+    events = 0
+    c0, t0 = time.process_time(), time.perf_counter()
+    async for chunk in stream:
+        events += chunk.count(b"\n")
+        if time.perf_counter() - t0 > seconds:
+            break
+    await stream.aclose()
+    return (time.process_time() - c0) / max(1, events)
+
+
+async def throughput(scenario: Scenario, args) -> dict:
+    gw = Gateway(args, lambda: make_stream(scenario, paced=False, args=args), scenario.name)
+    gw.start()
+    await asyncio.sleep(args.warmup)   # connection, first IAS lookups
+
+    decode = gw.pipeline.stage("decode")
+    decoded0, received0 = decode.processed, gw.state.events
+    cpu0, t0 = time.process_time(), time.perf_counter()
+    await asyncio.sleep(args.seconds)
+    cpu, elapsed = time.process_time() - cpu0, time.perf_counter() - t0
+    decoded = decode.processed - decoded0
+    received = gw.state.events - received0
+    backlog = decode.queue.qsize()
+    await gw.stop()
+
+    return {
+        "events_per_s": decoded / elapsed,
+        "received_per_s": received / elapsed,
+        "cpu_us_per_event": cpu / max(1, decoded) * 1e6,
+        "decode_backlog": backlog,
+    }
+
+
+def _first_reads(chunk: bytes, emitted: Dict[str, float], now: float) -> None:
+    # the TID the gateway keys a tag by: tagAuthenticationResponse.tidHex when set
+    # (it comes last in the line), else tagInventoryEvent.tidHex
+    for line in chunk.split(b"\n"):
+        tid = None
+        for m in _TID.finditer(line):
+            tid = m.group(1) or tid
+        if tid:
+            emitted.setdefault(tid.decode(), now)
+
+
+async def latency(scenario: Scenario, args) -> dict:
+    emitted: Dict[str, float] = {}
+    visible: Dict[str, float] = {}
+    ended = asyncio.Event()
+
+    async def tracked():
+        stream = make_stream(scenario, paced=True, args=args)
+        try:
+            async for chunk in stream:
+                if ended.is_set():
+                    return
+                _first_reads(chunk, emitted, time.monotonic())
+                yield chunk
+        finally:
+            await stream.aclose()
+
+    gw = Gateway(args, tracked, scenario.name)
+    dashboard = httpx.AsyncClient(transport=httpx.ASGITransport(app=gw.app), base_url="http://gateway")
+
+    async def poll():
+        etag = None
+        while True:
+            r = await dashboard.get("/api/active-tags", headers={"If-None-Match": etag} if etag else {})
+            if r.status_code == 200:
+                etag = r.headers.get("etag")
+                now = time.monotonic()
+                for row in r.json():
+                    visible.setdefault(row["tidHex"], now)
+            await asyncio.sleep(args.poll_ms / 1000.0)
+
+    gw.start()
+    poller = asyncio.create_task(poll())
+    # captures end after one pass, synthetic streams run for --latency-seconds
+    await asyncio.wait([gw.task], timeout=args.latency_seconds if scenario.file is None else None)
+    ended.set()
+    deadline = time.monotonic() + args.settle
+    while time.monotonic() < deadline and not emitted.keys() <= visible.keys():
+        await asyncio.sleep(0.05)
+
+    poller.cancel()
+    await asyncio.gather(poller, return_exceptions=True)
+    await gw.stop()
+    await dashboard.aclose()
+
+    samples = sorted((visible[t] - emitted[t]) * 1000 for t in emitted if t in visible)
+    return {
+        "tags": len(emitted),
+        "tags_missing": len(emitted) - len(samples),
+        "latency_p50_ms": statistics.median(samples) if samples else None,
+        "latency_p99_ms": samples[math.ceil(len(samples) * 0.99) - 1] if samples else None,
+        "latency_max_ms": samples[-1] if samples else None,
+    }
+
+
+def run_scenario(name: str, args: argparse.Namespace) -> dict:
+    # runs in a fresh process: ru_maxrss is this scenario's peak
+    scenario = next(s for s in SCENARIOS if s.name == name)
+
+    async def run():
+        sim_cost = await simulator_cost(scenario, args)
+        result = await throughput(scenario, args)
+        result["sim_cpu_us_per_event"] = sim_cost * 1e6
+        result["gateway_cpu_us_per_event"] = max(0.0, result["cpu_us_per_event"] - sim_cost * 1e6)
+        result.update(await latency(scenario, args))
+        return result
+
+    result = asyncio.run(run())
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result
+
+
+# --- reporting ---
+
+METRICS = [
+    # (key, label, format, higher is better)
+    ("events_per_s", "ev/s", "{:,.0f}", True),
+    ("gateway_cpu_us_per_event", "gw cpu us/ev", "{:.1f}", False),
+    ("latency_p50_ms", "p50 ms", "{:.1f}", False),
+    ("latency_p99_ms", "p99 ms", "{:.1f}", False),
+    ("peak_rss_mb", "rss MB", "{:.0f}", False),
+]
+
+
+def _fmt(fmt: str, value) -> str:
+    return "-" if value is None else fmt.format(value)
+
+
+def print_results(results: Dict[str, dict]) -> None:
+    print(f"{'scenario':<16}" + "".join(f"{label:>14}" for _, label, _, _ in METRICS) + f"{'tags':>8}{'missing':>8}")
+    for name, r in results.items():
+        print(
+            f"{name:<16}" + "".join(f"{_fmt(fmt, r.get(key)):>14}" for key, _, fmt, _ in METRICS)
+            + f"{r['tags']:>8}{r['tags_missing']:>8}"
+        )
+
+
+def print_comparison(old: dict, new: dict) -> None:
+    print(f"\nvs {old['version'].get('commit')} ({old['started_at']}):")
+    print(f"{'scenario':<16} {'metric':<14} {'before':>12} {'after':>12} {'change':>9}")
+    for name, r in new["scenarios"].items():
+        before = old["scenarios"].get(name)
+        if before is None:
+            continue
+        for key, label, fmt, higher_better in METRICS:
+            a, b = before.get(key), r.get(key)
+            if not a or b is None:
+                continue
+            change = (b - a) / a * 100
+            worse = change < 0 if higher_better else change > 0
+            flag = "  worse" if worse and abs(change) >= 10 else ""
+            print(f"{name:<16} {label:<14} {_fmt(fmt, a):>12} {_fmt(fmt, b):>12} {change:>+8.1f}%{flag}")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=Path(__file__).parent, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", nargs="+", default=[s.name for s in SCENARIOS],
+                        choices=[s.name for s in SCENARIOS])
+    parser.add_argument("--seconds", type=float, default=5.0, help="throughput measurement window")
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--latency-speed", type=float, default=10.0, help="capture replay speed in the latency phase")
+    parser.add_argument("--latency-rate", type=float, default=2000.0, help="synthetic reads/s in the latency phase")
+    parser.add_argument("--latency-seconds", type=float, default=5.0, help="synthetic latency phase length")
+    parser.add_argument("--settle", type=float, default=3.0, help="max wait for the last tags to show up")
+    parser.add_argument("--poll-ms", type=float, default=5.0, help="dashboard poll interval")
+    parser.add_argument("--ias-latency-ms", type=float, default=20.0)
+    parser.add_argument("--db-latency-ms", type=float, default=5.0)
+    parser.add_argument("--metrics", action="store_true", help="run the gateway with /metrics instrumentation")
+    parser.add_argument("--out", default=None, help="results JSON (default ingest_suite_<commit>.json)")
+    parser.add_argument("--compare", default=None, help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    report = {
+        "version": {
+            "commit": commit,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "settings": {k: v for k, v in vars(args).items() if k not in ("out", "compare", "scenarios")},
+        "scenarios": {},
+    }
+
+    ctx = get_context("spawn")
+    for name in args.scenarios:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            report["scenarios"][name] = pool.submit(run_scenario, name, args).result()
+        print(f"{name}: done", flush=True)
+
+    print()
+    print_results(report["scenarios"])
+
+    out = Path(args.out or f"ingest_suite_{commit or 'local'}.json")
+    out.write_text(json.dumps(report, indent=2))
+    print(f"\nresults written to {out}")
+
+    if args.compare:
+        print_comparison(json.loads(Path(args.compare).read_text()), report)
+
+
+if __name__ == "__main__":
+    main()
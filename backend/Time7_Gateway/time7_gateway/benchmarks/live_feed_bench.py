@@ -0,0 +1,184 @@
+"""
+Dashboard fan-out: N clients polling /api/active-tags + /api/reader-status once a
+second vs N clients subscribed to the /api/live WebSocket feed.
+
+The server (bench_app, separate uvicorn process) holds --tags tags with IAS results
+and changes --churn of them per second (new tags and epcHex updates). Reports the
+server process CPU and the bytes clients received.
+
+    python -m time7_gateway.benchmarks.live_feed_bench --clients 100 300 --tags 2000 --seconds 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+import websockets
+from fastapi import FastAPI
+
+from time7_gateway.api.dashboard import router as dashboard_router
+from time7_gateway.benchmarks.multi_reader_bench import free_port
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.live_feed import LiveFeed
+from time7_gateway.services.tag_info_cache import TagInfoCache
+
+# --- server side (runs in the uvicorn child) ---
+
+bench_app = FastAPI()
+bench_app.include_router(dashboard_router, prefix="/api")
+
+
+@bench_app.on_event("startup")
+async def _seed():
+    state = bench_app.state
+    state.active_tags = ActiveTags(remove_grace_seconds=3600.0)
+    state.tag_info_cache = TagInfoCache()
+    state.reader_connected = True
+    state.live_feed = LiveFeed.from_env(bench_app)
+
+    n = int(os.getenv("LIVE_BENCH_TAGS", "2000"))
+    for i in range(n):
+        _see(f"E280{i:020X}", f"3036{i:020X}")
+    state.next_id = n
+    asyncio.create_task(state.live_feed.run())
+    asyncio.create_task(_churn(int(os.getenv("LIVE_BENCH_CHURN", "20"))))
+
+
+def _see(tid: str, epc: str) -> None:
+    state = bench_app.state
+    state.active_tags.sync_seen([tid], epcHex={tid: epc}, seen_at=datetime.now(timezone.utc))
+    if state.tag_info_cache.set(tid, True, "ok"):
+        state.active_tags.mark_updated(tid)
+
+
+async def _churn(per_second: int) -> None:
+    state = bench_app.state
+    rng = random.Random(7)
+    while True:
+        await asyncio.sleep(0.1)
+        for _ in range(max(1, per_second // 10)):
+            if rng.random() < 0.5:
+                tid = f"E280{state.next_id:020X}"
+                state.next_id += 1
+                _see(tid, "NEW")
+            else:
+                i = rng.randrange(state.next_id)
+                _see(f"E280{i:020X}", f"{rng.getrandbits(96):024X}")
+
+
+@bench_app.get("/bench/cpu")
+def _cpu():
+    return {"cpu": time.process_time()}
+
+
+# --- client side ---
+
+def start_server(port: int, tags: int, churn: int) -> subprocess.Popen:
+    env = dict(os.environ, LIVE_BENCH_TAGS=str(tags), LIVE_BENCH_CHURN=str(churn))
+    cmd = [
+        sys.executable, "-m", "uvicorn", "time7_gateway.benchmarks.live_feed_bench:bench_app",
+        "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+    ]
+    proc = subprocess.Popen(cmd, env=env)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/bench/cpu", timeout=0.5)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("bench server did not start")
+
+
+async def server_cpu(client: httpx.AsyncClient) -> float:
+    return (await client.get("/bench/cpu")).json()["cpu"]
+
+
+async def poller(client: httpx.AsyncClient, stop: asyncio.Event, counts: dict) -> None:
+    await asyncio.sleep(random.random())   # spread clients over the second
+    while not stop.is_set():
+        t = time.perf_counter()
+        try:
+            tags, status = await asyncio.gather(client.get("/api/active-tags"), client.get("/api/reader-status"))
+            counts["bytes"] += len(tags.content) + len(status.content)
+            counts["requests"] += 2
+        except httpx.HTTPError:
+            counts["errors"] += 1
+        await asyncio.sleep(max(0.0, 1.0 - (time.perf_counter() - t)))
+
+
+async def subscriber(url: str, stop: asyncio.Event, counts: dict) -> None:
+    try:
+        async with websockets.connect(url, max_size=None) as ws:
+            while not stop.is_set():
+                try:
+                    msg = await asyncio.wait_for(ws.recv(), 0.5)
+                except asyncio.TimeoutError:
+                    continue
+                counts["bytes"] += len(msg)
+                counts["messages"] += 1
+    except (OSError, websockets.WebSocketException):
+        counts["errors"] += 1
+
+
+async def run(port: int, mode: str, n: int, seconds: float) -> dict:
+    base = f"http://127.0.0.1:{port}"
+    counts = {"bytes": 0, "requests": 0, "messages": 0, "errors": 0}
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=n * 2, max_keepalive_connections=n * 2)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=30) as client:
+        if mode == "poll":
+            tasks = [asyncio.create_task(poller(client, stop, counts)) for _ in range(n)]
+        else:
+            url = f"ws://127.0.0.1:{port}/api/live?max_hz=1"
+            tasks = [asyncio.create_task(subscriber(url, stop, counts)) for _ in range(n)]
+
+        await asyncio.sleep(2.0)   # connect / first snapshot
+        bytes0 = counts["bytes"]
+        cpu0, t0 = await server_cpu(client), time.perf_counter()
+        await asyncio.sleep(seconds)
+        cpu, elapsed = await server_cpu(client) - cpu0, time.perf_counter() - t0
+        received = counts["bytes"] - bytes0
+
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return {
+        "server_cpu_pct": 100.0 * cpu / elapsed,
+        "kb_per_client_s": received / elapsed / n / 1024,
+        "errors": counts["errors"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, nargs="+", default=[100, 300])
+    parser.add_argument("--tags", type=int, default=2000)
+    parser.add_argument("--churn", type=int, default=20, help="tag changes per second")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"{'clients':>7} {'mode':<5} {'server cpu%':>11} {'KiB/client/s':>14} {'errors':>7}")
+    for n in args.clients:
+        for mode in ("poll", "push"):
+            port = free_port()
+            server = start_server(port, args.tags, args.churn)
+            try:
+                r = asyncio.run(run(port, mode, n, args.seconds))
+            finally:
+                server.terminate()
+                try:
+                    server.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+            print(f"{n:>7} {mode:<5} {r['server_cpu_pct']:>11.1f} {r['kb_per_client_s']:>14.2f} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Cost of the /metrics instrumentation on the ingestion path.
+
+Runs the ingest suite's throughput phase (unthrottled source, real reader client ->
+pipeline, mock IAS / database) with and without instrument(), alternating the two
+for --rounds rounds, each run in a fresh process. With instrumentation on, the
+registry is also rendered every --scrape-s seconds, like a Prometheus scrape.
+Reports the median gateway CPU per event of each and the overhead between them,
+plus the per-call cost of the recording primitives and of one scrape.
+
+    python -m time7_gateway.benchmarks.metrics_overhead --scenarios datastream4 synthetic-5k --rounds 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from types import SimpleNamespace
+
+from time7_gateway.api.metrics import DASHBOARD_ROUTES, RequestTimer
+from time7_gateway.benchmarks.ingest_suite import SCENARIOS, Gateway, make_stream, simulator_cost
+from time7_gateway.services.metrics import Histogram, Metrics, timed
+
+
+def run_throughput(name: str, args: argparse.Namespace) -> dict:
+    scenario = next(s for s in SCENARIOS if s.name == name)
+
+    async def run():
+        sim_cost = await simulator_cost(scenario, args)
+        result = await throughput(scenario, args)
+        result["gateway_cpu_us_per_event"] = max(0.0, result["cpu_us_per_event"] - sim_cost * 1e6)
+        return result
+
+    return asyncio.run(run())
+
+
+async def throughput(scenario, args) -> dict:
+    # ingest_suite.throughput, plus a scraper reading the gateway's registry
+    gw = Gateway(args, lambda: make_stream(scenario, paced=False, args=args), scenario.name)
+    gw.app.state.ingest_pipeline = gw.pipeline
+    gw.app.state.reader_supervisor = SimpleNamespace(states={scenario.name: gw.state})
+    gw.start()
+    await asyncio.sleep(args.warmup)
+
+    async def scrape():
+        while True:
+            await asyncio.sleep(args.scrape_s)
+            gw.app.state.metrics.render()
+
+    scraper = asyncio.create_task(scrape()) if args.metrics else None
+    decode = gw.pipeline.stage("decode")
+    decoded0 = decode.processed
+    cpu0, t0 = time.process_time(), time.perf_counter()
+    await asyncio.sleep(args.seconds)
+    cpu, elapsed = time.process_time() - cpu0, time.perf_counter() - t0
+    decoded = decode.processed - decoded0
+    if scraper is not None:
+        scraper.cancel()
+    await gw.stop()
+    return {"events_per_s": decoded / elapsed, "cpu_us_per_event": cpu / max(1, decoded) * 1e6}
+
+
+def primitives() -> dict:
+    # ns per call of what the hot paths actually run
+    h = Histogram()
+    out = {"histogram.observe": timeit.timeit(lambda: h.observe(0.003), number=200_000) / 200_000}
+
+    def fn(x):
+        return x
+
+    wrapped = timed(fn, h)
+    out["timed(sync) extra"] = (
+        timeit.timeit(lambda: wrapped(1), number=200_000) - timeit.timeit(lambda: fn(1), number=200_000)
+    ) / 200_000
+
+    async def afn(x):
+        return x
+
+    awrapped = timed(afn, h)
+
+    async def calls(f, n):
+        t = time.perf_counter()
+        for _ in range(n):
+            await f(1)
+        return time.perf_counter() - t
+
+    out["timed(async) extra"] = (asyncio.run(calls(awrapped, 200_000)) - asyncio.run(calls(afn, 200_000))) / 200_000
+
+    async def app(scope, receive, send):
+        return None
+
+    timer = RequestTimer(app, {"/api/active-tags": h})
+    hit, miss = {"type": "http", "path": "/api/active-tags"}, {"type": "http", "path": "/data/stream"}
+
+    async def requests(scope, n):
+        t = time.perf_counter()
+        for _ in range(n):
+            await timer(scope, None, None)
+        return time.perf_counter() - t
+
+    out["RequestTimer (timed route)"] = asyncio.run(requests(hit, 200_000)) / 200_000
+    out["RequestTimer (other route)"] = asyncio.run(requests(miss, 200_000)) / 200_000
+    return {k: v * 1e9 for k, v in out.items()}
+
+
+def scrape_cost(readers: int = 8) -> float:
+    # ms per render of a registry the size of a gateway with `readers` readers
+    metrics = Metrics()
+    for name in ("time7_ias_request_seconds", "time7_db_upsert_seconds"):
+        metrics.histogram(name, "x").labels().observe(0.01)
+    requests = metrics.histogram("time7_http_request_seconds", "x")
+    for route in DASHBOARD_ROUTES:
+        requests.labels(route=route).observe(0.002)
+
+    def samples():
+        for i in range(readers):
+            labels = (("reader", f"reader-{i}"),)
+            for name in ("received", "filtered", "reconnects", "connected"):
+                yield f"time7_reader_{name}", "counter", "x", labels, 123456
+        for stage in ("decode", "presence", "auth", "persist"):
+            for name in ("queue_depth", "processed", "errors", "dropped"):
+                yield f"time7_pipeline_{name}", "counter", "x", (("stage", stage),), 42
+        for i in range(12):
+            yield f"time7_other_{i}", "gauge", "x", (), 7
+
+    metrics.collector(samples)
+    n = 2000
+    return timeit.timeit(metrics.render, number=n) / n * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", nargs="+", default=["datastream4", "synthetic-5k"],
+                        choices=[s.name for s in SCENARIOS])
+    parser.add_argument("--rounds", type=int, default=5, help="off/on pairs per scenario")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--scrape-s", type=float, default=1.0, help="render interval with metrics on")
+    parser.add_argument("--ias-latency-ms", type=float, default=20.0)
+    parser.add_argument("--db-latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print("recording primitives:")
+    for name, ns in primitives().items():
+        print(f"  {name:<28}{ns:>8.0f} ns")
+    print(f"  {'scrape (8 readers)':<28}{scrape_cost() * 1000:>8.0f} us")
+
+    ctx = get_context("spawn")
+    print(f"\n{'scenario':<16}{'off us/ev':>11}{'on us/ev':>11}{'off ev/s':>12}{'on ev/s':>12}{'overhead':>10}")
+    for name in args.scenarios:
+        runs = {False: [], True: []}
+        for _ in range(args.rounds):
+            for metrics in (False, True):
+                run_args = argparse.Namespace(**vars(args), metrics=metrics)
+                with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                    runs[metrics].append(pool.submit(run_throughput, name, run_args).result())
+
+        def median(key, on):
+            return statistics.median(r[key] for r in runs[on])
+
+        off, on = median("gateway_cpu_us_per_event", False), median("gateway_cpu_us_per_event", True)
+        print(
+            f"{name:<16}{off:>11.2f}{on:>11.2f}{median('events_per_s', False):>12,.0f}"
+            f"{median('events_per_s', True):>12,.0f}{(on - off) / off * 100:>+9.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
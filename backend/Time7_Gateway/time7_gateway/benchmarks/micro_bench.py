@@ -0,0 +1,406 @@
+"""
+Component scaling curves: ActiveTags, TagInfoCache and the auth helpers at 1k to 1M
+entries, per hit rate / churn / batch size. Used to see which component runs out
+first as a site grows (time per operation, memory per entry).
+
+Each case is measured like timeit: operations per sample are calibrated so a sample
+takes at least --min-time, --warmup samples run untimed, then --repeat samples are
+timed with the garbage collector off. Reported: median time per operation, its
+spread (interquartile range / median) and ops/s. tracemalloc gives the bytes the
+structure holds after setup (per entry) and the peak one operation allocates.
+
+  active.sync_seen   one read; `hit` of reads are for tags already in view, the rest
+                     are arrivals, and each arrival replaces the least recently read
+                     tag, which then expires after the grace period (virtual clock,
+                     remove_inactive every 1000 reads like a dashboard poll)
+  active.get_active  one dashboard read of n tags;  active.snapshot  the debug dump
+  cache.get          lookup, `hit` of them for cached tags
+  cache.set          store a result, `churn` of them for new tags (evicting the LRU
+                     entry at max_entries=n), the rest refresh cached ones
+  cache.snapshot     the debug dump
+  auth.generate_response / ias.mock_lookup / ias.mock_lookup_batch
+                     `batch` responses per operation
+
+    python -m time7_gateway.benchmarks.micro_bench --sizes 1000,10000,100000,1000000
+    python -m time7_gateway.benchmarks.micro_bench --only '^cache\\.' --save micro_baseline.json
+    python -m time7_gateway.benchmarks.micro_bench --compare micro_baseline.json
+"""
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import random
+import re
+import statistics
+import time
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from time7_gateway.benchmarks.ingest_suite import git_commit
+from time7_gateway.models.schemas import AuthPayload
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.tag_info_cache import TagInfoCache
+from time7_gateway.simulators.ias_services import mock_ias_lookup, mock_ias_lookup_batch
+from time7_gateway.utilities.simulate_encryption import generate_response
+
+GRACE = 5.0
+POLL_EVERY = 1000
+PROBES = 1 << 16
+
+# run(k) performs k operations; size() is the number of entries afterwards; held is
+# what the structure under test occupies after setup (None: not a container)
+Workload = Tuple[Callable[[int], None], Callable[[], int], Optional[int]]
+
+
+@dataclass
+class Case:
+    group: str
+    params: Dict[str, object]
+    setup: Callable[[], Workload]
+    items_per_op: int = 1
+
+    @property
+    def id(self) -> str:
+        return f"{self.group}[{','.join(f'{k}={v}' for k, v in self.params.items())}]"
+
+
+def tid(i: int) -> str:
+    return f"E280{i:020X}"
+
+
+def utc(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, timezone.utc)
+
+
+def traced(build: Callable[[], object]) -> Tuple[object, int]:
+    # the object `build` returns and the bytes allocated while building it that are still held
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return obj, held
+
+
+# --- workloads ---
+
+def active_sync_seen(n: int, hit: float) -> Workload:
+    t = time.time()
+    ring = deque(tid(i) for i in range(n))
+    tags, held = traced(lambda: in_view(n, GRACE, seen_at=utc(t)))
+    # every tag still in view is re-read within 2/3 of the grace period
+    dt = GRACE / (1.5 * n / hit)
+    rng = random.Random(1)
+    state = {"t": t, "next": n, "ops": 0}
+
+    def run(k: int) -> None:
+        now, nxt, ops = state["t"], state["next"], state["ops"]
+        for _ in range(k):
+            now += dt
+            if rng.random() < hit:
+                cur = ring[0]
+                ring.rotate(-1)
+            else:
+                ring.popleft()
+                cur = tid(nxt)
+                nxt += 1
+                ring.append(cur)
+            tags.sync_seen([cur], epcHex={cur: "3036"}, seen_at=utc(now))
+            ops += 1
+            if ops % POLL_EVERY == 0:
+                tags.remove_inactive(now=utc(now))
+        state.update(t=now, next=nxt, ops=ops)
+
+    return run, lambda: len(tags), held
+
+
+def in_view(n: int, grace: float, seen_at: Optional[datetime] = None) -> ActiveTags:
+    tags = ActiveTags(remove_grace_seconds=grace)
+    tags.sync_seen([tid(i) for i in range(n)], epcHex={tid(i): "3036" for i in range(n)}, seen_at=seen_at)
+    return tags
+
+
+def active_get_active(n: int) -> Workload:
+    tags, held = traced(lambda: in_view(n, 3600))
+
+    def run(k: int) -> None:
+        for _ in range(k):
+            tags.get_active()
+
+    return run, lambda: len(tags), held
+
+
+def active_snapshot(n: int) -> Workload:
+    tags, held = traced(lambda: in_view(n, 3600))
+
+    def run(k: int) -> None:
+        for _ in range(k):
+            tags.snapshot()
+
+    return run, lambda: len(tags), held
+
+
+def filled_cache(n: int) -> TagInfoCache:
+    cache = TagInfoCache(max_entries=n)
+    for i in range(n):
+        cache.set(tid(i), True, "Authentication Passed")
+    return cache
+
+
+def cache_get(n: int, hit: float) -> Workload:
+    cache, held = traced(lambda: filled_cache(n))
+    rng = random.Random(1)
+    probes = [tid(rng.randrange(n)) if rng.random() < hit else f"FFFF{j:020X}" for j in range(PROBES)]
+    state = {"i": 0}
+
+    def run(k: int) -> None:
+        i = state["i"]
+        get = cache.get
+        for _ in range(k):
+            get(probes[i & (PROBES - 1)])
+            i += 1
+        state["i"] = i
+
+    return run, lambda: len(cache), held
+
+
+def cache_set(n: int, churn: float) -> Workload:
+    cache, held = traced(lambda: filled_cache(n))
+    rng = random.Random(1)
+    state = {"next": n}
+
+    def run(k: int) -> None:
+        nxt = state["next"]
+        for _ in range(k):
+            if rng.random() < churn:
+                cache.set(tid(nxt), True, "Authentication Passed")
+                nxt += 1
+            else:
+                cache.set(tid(nxt - 1 - rng.randrange(n)), True, "Authentication Passed")
+        state["next"] = nxt
+
+    return run, lambda: len(cache), held
+
+
+def cache_snapshot(n: int) -> Workload:
+    cache, held = traced(lambda: filled_cache(n))
+
+    def run(k: int) -> None:
+        for _ in range(k):
+            cache.snapshot()
+
+    return run, lambda: len(cache), held
+
+
+def payloads(batch: int) -> List[AuthPayload]:
+    out = []
+    for i in range(batch):
+        challenge = f"{i:012X}"
+        out.append(AuthPayload(messageHex=challenge, responseHex=generate_response(tid(i), challenge), tidHex=tid(i)))
+    return out
+
+
+def auth_generate_response(batch: int) -> Workload:
+    items = [(p.tidHex, p.messageHex) for p in payloads(batch)]
+
+    def run(k: int) -> None:
+        for _ in range(k):
+            for t, c in items:
+                generate_response(t, c)
+
+    return run, lambda: batch, None
+
+
+def ias_mock_lookup(batch: int) -> Workload:
+    items = payloads(batch)
+
+    def run(k: int) -> None:
+        for _ in range(k):
+            for p in items:
+                mock_ias_lookup(p)
+
+    return run, lambda: batch, None
+
+
+def ias_mock_lookup_batch(batch: int) -> Workload:
+    # one awaited batch call per operation, as the async IAS path makes it
+    items = payloads(batch)
+    loop = asyncio.new_event_loop()
+
+    def run(k: int) -> None:
+        for _ in range(k):
+            loop.run_until_complete(mock_ias_lookup_batch(items))
+
+    return run, lambda: batch, None
+
+
+def cases(sizes: List[int], batches: List[int]) -> List[Case]:
+    out = []
+    for n in sizes:
+        for hit in (1.0, 0.99, 0.9):
+            out.append(Case("active.sync_seen", {"n": n, "hit": hit}, lambda n=n, hit=hit: active_sync_seen(n, hit)))
+        out.append(Case("active.get_active", {"n": n}, lambda n=n: active_get_active(n), items_per_op=n))
+        out.append(Case("active.snapshot", {"n": n}, lambda n=n: active_snapshot(n), items_per_op=n))
+        for hit in (1.0, 0.9, 0.5):
+            out.append(Case("cache.get", {"n": n, "hit": hit}, lambda n=n, hit=hit: cache_get(n, hit)))
+        for churn in (0.0, 0.1, 1.0):
+            out.append(Case("cache.set", {"n": n, "churn": churn}, lambda n=n, churn=churn: cache_set(n, churn)))
+        out.append(Case("cache.snapshot", {"n": n}, lambda n=n: cache_snapshot(n), items_per_op=n))
+    for b in batches:
+        out.append(Case("auth.generate_response", {"batch": b}, lambda b=b: auth_generate_response(b), items_per_op=b))
+        out.append(Case("ias.mock_lookup", {"batch": b}, lambda b=b: ias_mock_lookup(b), items_per_op=b))
+        out.append(Case("ias.mock_lookup_batch", {"batch": b}, lambda b=b: ias_mock_lookup_batch(b), items_per_op=b))
+    return out
+
+
+# --- harness ---
+
+def calibrate(run: Callable[[int], None], min_time: float) -> int:
+    # operations per sample: 1, 2, 5, 10, 20, 50, ... until one sample takes min_time
+    number = 1
+    while True:
+        for step in (1, 2, 5):
+            k = number * step
+            t = time.perf_counter()
+            run(k)
+            if time.perf_counter() - t >= min_time:
+                return k
+        number *= 10
+
+
+def measure(case: Case, min_time: float, warmup: int, repeat: int) -> dict:
+    run, size, held = case.setup()
+    entries = size()
+
+    number = calibrate(run, min_time)
+    for _ in range(warmup):
+        run(number)
+
+    samples = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            t = time.perf_counter()
+            run(number)
+            samples.append((time.perf_counter() - t) / number)
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    run(1)
+    op_peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    median = statistics.median(samples)
+    q1, _, q3 = statistics.quantiles(samples, n=4) if len(samples) > 1 else (median, median, median)
+    return {
+        "group": case.group,
+        "params": case.params,
+        "median_s": median,
+        "min_s": min(samples),
+        "spread_pct": (q3 - q1) / median * 100 if median else 0.0,
+        "ops_per_s": 1.0 / median if median else None,
+        "per_item_s": median / case.items_per_op,
+        "number": number,
+        "repeat": repeat,
+        "entries": size(),
+        "setup_bytes": held,
+        "bytes_per_entry": held / entries if held is not None and entries else None,
+        "op_peak_bytes": op_peak,
+    }
+
+
+def fmt_time(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def fmt_bytes(n: Optional[float]) -> str:
+    if n is None:
+        return "-"
+    for unit, scale in (("MiB", 1 << 20), ("KiB", 1 << 10)):
+        if abs(n) >= scale:
+            return f"{n / scale:.1f} {unit}"
+    return f"{n:.0f} B"
+
+
+def print_row(case_id: str, r: dict) -> None:
+    print(
+        f"{case_id:<44} {fmt_time(r['median_s']):>10} {'±' + format(r['spread_pct'], '.0f') + '%':>6} "
+        f"{r['ops_per_s']:>12,.{0 if r['ops_per_s'] >= 100 else 2}f} {fmt_time(r['per_item_s']):>10} {r['entries']:>9,} "
+        f"{fmt_bytes(r['bytes_per_entry']):>10} {fmt_bytes(r['op_peak_bytes']):>10}",
+        flush=True,
+    )
+
+
+def print_comparison(old: dict, new: dict, threshold: float) -> None:
+    # a change counts when it beats both the threshold and the two runs' own spread
+    print(f"\nvs {old['version'].get('commit')} ({old['started_at']}):")
+    print(f"{'case':<44} {'before':>10} {'after':>10} {'change':>8}")
+    slower = 0
+    for case_id, r in new["results"].items():
+        before = old["results"].get(case_id)
+        if before is None:
+            continue
+        change = (r["median_s"] - before["median_s"]) / before["median_s"] * 100
+        noise = max(threshold, before["spread_pct"] + r["spread_pct"])
+        flag = ""
+        if change > noise:
+            flag, slower = "  slower", slower + 1
+        elif change < -noise:
+            flag = "  faster"
+        print(f"{case_id:<44} {fmt_time(before['median_s']):>10} {fmt_time(r['median_s']):>10} {change:>+7.1f}%{flag}")
+    print(f"{slower} case(s) slower than the baseline")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,100000", help="add 1000000 for the full curve (~8 min)")
+    parser.add_argument("--batches", default="1,32,256")
+    parser.add_argument("--only", default=None, help="regex on case ids, e.g. '^cache\\.get'")
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per sample at least")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--save", default=None, help="write results JSON (e.g. a baseline)")
+    parser.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change to report")
+    args = parser.parse_args()
+
+    selected = [
+        c for c in cases([int(s) for s in args.sizes.split(",")], [int(b) for b in args.batches.split(",")])
+        if args.only is None or re.search(args.only, c.id)
+    ]
+
+    report = {
+        "version": {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform()},
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "settings": {"min_time": args.min_time, "warmup": args.warmup, "repeat": args.repeat},
+        "results": {},
+    }
+
+    print(f"{'case':<44} {'per op':>10} {'spread':>6} {'ops/s':>12} {'per item':>10} {'entries':>9} "
+          f"{'mem/entry':>10} {'op peak':>10}")
+    for case in selected:
+        r = measure(case, args.min_time, args.warmup, args.repeat)
+        report["results"][case.id] = r
+        print_row(case.id, r)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(report, indent=2))
+        print(f"\nresults written to {args.save}")
+    if args.compare:
+        print_comparison(json.loads(Path(args.compare).read_text()), report, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
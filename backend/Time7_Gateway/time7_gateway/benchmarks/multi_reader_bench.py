@@ -0,0 +1,124 @@
+"""
+How many simulated readers one gateway process can keep up with.
+
+Starts the reader simulator (simulators/reader_streamer.py, unthrottled) in a
+separate uvicorn process, then runs a ReaderSupervisor with N readers against
+it for a fixed time and reports aggregate / per-reader event rates, gateway CPU
+use and the decode-stage backlog. When aggregate ev/s stops growing with N
+while CPU sits near 100%, the process is saturated.
+
+    python -m time7_gateway.benchmarks.multi_reader_bench --readers 1 2 4 8 --seconds 5
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from time7_gateway.clients.reader_client import ReaderDefinition, build_ingest_pipeline
+from time7_gateway.clients.reader_supervisor import ReaderSupervisor
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.tag_info_cache import TagInfoCache
+from time7_gateway.simulators.ias_services import mock_ias_lookup
+from time7_gateway.simulators.reader_streamer import ndjson_line_stream
+
+# Simulator app served by the child uvicorn process: same generator as /data/stream, no rate limit
+sim_app = FastAPI()
+
+
+@sim_app.get("/data/stream")
+async def unthrottled_stream():
+    return StreamingResponse(ndjson_line_stream(loop=True, rate_hz=0), media_type="application/x-ndjson")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_simulator(port: int, workers: int) -> subprocess.Popen:
+    cmd = [
+        sys.executable, "-m", "uvicorn", "time7_gateway.benchmarks.multi_reader_bench:sim_app",
+        "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+    ]
+    proc = subprocess.Popen(cmd)
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/docs", timeout=0.5)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("simulator did not start")
+
+
+async def run_readers(base_url: str, n: int, seconds: float) -> dict:
+    app = SimpleNamespace(state=SimpleNamespace(
+        active_tags=ActiveTags(remove_grace_seconds=5.0),
+        tag_info_cache=TagInfoCache(cache_ttl_hours=24),
+        ias_lookup=mock_ias_lookup,
+    ))
+    pipeline = build_ingest_pipeline(app, persist_fn=lambda **kw: None)
+    readers = [ReaderDefinition(name=f"sim-{i}", base_url=base_url) for i in range(n)]
+    sup = ReaderSupervisor(app, readers, pipeline)
+
+    sup.start()
+    await asyncio.sleep(1.0)  # warm up: connections, first IAS lookups
+
+    events0 = {name: s.events for name, s in sup.states.items()}
+    decoded0 = pipeline.stage("decode").processed
+    cpu0, t0 = time.process_time(), time.perf_counter()
+    await asyncio.sleep(seconds)
+    cpu, elapsed = time.process_time() - cpu0, time.perf_counter() - t0
+    per_reader = [(s.events - events0[name]) / elapsed for name, s in sup.states.items()]
+    decoded = (pipeline.stage("decode").processed - decoded0) / elapsed
+    backlog = pipeline.stage("decode").queue.qsize()
+
+    await sup.stop(drain=False)
+    return {
+        "readers": n,
+        "received_per_s": sum(per_reader),
+        "decoded_per_s": decoded,
+        "min_reader_per_s": min(per_reader),
+        "max_reader_per_s": max(per_reader),
+        "cpu_pct": 100.0 * cpu / elapsed,
+        "decode_backlog": backlog,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--sim-workers", type=int, default=min(4, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    port = free_port()
+    sim = start_simulator(port, args.sim_workers)
+    try:
+        print(f"{'readers':>7} {'recv ev/s':>11} {'decoded/s':>11} {'per reader min..max':>22} {'cpu%':>6} {'backlog':>8}")
+        for n in args.readers:
+            r = asyncio.run(run_readers(f"http://127.0.0.1:{port}", n, args.seconds))
+            print(
+                f"{r['readers']:>7} {r['received_per_s']:>11,.0f} {r['decoded_per_s']:>11,.0f} "
+                f"{r['min_reader_per_s']:>10,.0f}..{r['max_reader_per_s']:<10,.0f} {r['cpu_pct']:>6.1f} {r['decode_backlog']:>8}"
+            )
+    finally:
+        sim.terminate()
+        try:
+            sim.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            sim.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Cold start vs warm start of the tag cache after a gateway restart.
+
+Run 1 starts with an empty TagInfoCache backed by a fresh TagInfoStore, replays a
+capture at its recorded pace and closes the store (shutdown flush). Run 2 is a
+"restart": a new cache loaded from the same file, replaying the same capture.
+Reports IAS lookups, the delay between a tag's first read and its auth result
+showing up, and the time until every tag in the capture is on the dashboard.
+
+    python -m time7_gateway.benchmarks.warm_start_bench --file datastream4.ndjson --ias-latency-ms 150 --speed 4
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+from time7_gateway.clients.reader_client import build_ingest_pipeline
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.tag_info_cache import TagInfoCache
+from time7_gateway.services.tag_info_store import TagInfoStore
+from time7_gateway.simulators.ias_services import MockIASClient
+
+SIM_DIR = Path(__file__).resolve().parents[1] / "simulators"
+
+
+def load_capture(name: str) -> list:
+    # (offset seconds from first event, tidHex, raw line)
+    out = []
+    t0 = None
+    with (SIM_DIR / name).open("rb") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            ev = json.loads(line)
+            ts = datetime.fromisoformat(ev["timestamp"][:26].rstrip("Z"))
+            t0 = t0 or ts
+            tid = (ev.get("tagInventoryEvent") or {}).get("tidHex")
+            out.append(((ts - t0).total_seconds(), tid, line))
+    return out
+
+
+async def run_once(capture: list, store_path: str, latency: float, speed: float) -> dict:
+    cache = TagInfoCache(cache_ttl_hours=24)
+    store = TagInfoStore(store_path)
+    loaded = store.load(cache)
+
+    resolved = {}
+
+    def on_set(tid, auth, info, fetched_at):
+        store.record(tid, auth, info, fetched_at)
+        resolved.setdefault(tid, time.perf_counter())
+
+    cache.on_set = on_set
+    for item in cache.snapshot()["items"]:
+        resolved[item["id"]] = 0.0   # already answered before the replay starts
+
+    ias = MockIASClient(latency=latency)
+    lookups = 0
+
+    async def counting_lookup(payload):
+        nonlocal lookups
+        lookups += 1
+        return await ias.lookup(payload)
+
+    app = SimpleNamespace(state=SimpleNamespace(
+        active_tags=ActiveTags(remove_grace_seconds=5.0),
+        tag_info_cache=cache,
+        ias_lookup=counting_lookup,
+    ))
+    pipeline = build_ingest_pipeline(app, persist_fn=lambda **kw: None)
+    pipeline.start()
+
+    first_read = {}
+    t_start = time.perf_counter()
+    for offset, tid, line in capture:
+        due = t_start + offset / speed
+        wait = due - time.perf_counter()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        if tid and tid not in first_read:
+            first_read[tid] = time.perf_counter()
+        await pipeline.put(line)
+    await pipeline.drain()
+    await pipeline.stop()
+    store.close()
+
+    delays = [max(0.0, resolved.get(tid, time.perf_counter()) - t) for tid, t in first_read.items()]
+    full = max(max(resolved.get(tid, time.perf_counter()), t) for tid, t in first_read.items()) - t_start
+    return {
+        "loaded": loaded,
+        "tags": len(first_read),
+        "ias_lookups": lookups,
+        "auth_delay_mean_ms": statistics.mean(delays) * 1000,
+        "auth_delay_max_ms": max(delays) * 1000,
+        "full_dashboard_s": full,
+        "last_new_tag_s": max(first_read.values()) - t_start,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", default="datastream4.ndjson")
+    parser.add_argument("--ias-latency-ms", type=float, default=150.0)
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier")
+    args = parser.parse_args()
+
+    capture = load_capture(args.file)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "tag_cache.sqlite")
+        for label in ("cold", "warm"):
+            r = asyncio.run(run_once(capture, path, args.ias_latency_ms / 1000.0, args.speed))
+            print(
+                f"{label}: loaded={r['loaded']:<4} tags={r['tags']:<4} ias_lookups={r['ias_lookups']:<4} "
+                f"auth delay mean={r['auth_delay_mean_ms']:7.1f} ms max={r['auth_delay_max_ms']:7.1f} ms  "
+                f"full dashboard at {r['full_dashboard_s']:.2f} s (last new tag read at {r['last_new_tag_s']:.2f} s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import json
+import os
+from typing import Optional, Union
+
+# Optional fast JSON backends. msgspec decodes straight into typed structs and skips
+# fields we don't declare; orjson is a faster drop-in for json.loads.
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+Line = Union[bytes, bytearray, memoryview, str]
+
+# Cheap substring check done before any parsing; non-inventory events (keepalives,
+# antenna/inventory status) never reach the JSON parser.
+_MARKER_BYTES = b"tagInventory"
+_MARKER_STR = "tagInventory"
+
+
+class TagInventory:
+
+    # Compact view of one tagInventory event: only the fields the gateway uses.
+    # tarPresent is False when tagAuthenticationResponse was missing or had none of
+    # messageHex/responseHex/tidHex.
+
+    __slots__ = (
+        "tidHex",
+        "epcHex",
+        "antennaPort",
+        "peakRssiCdbm",
+        "tarPresent",
+        "messageHex",
+        "responseHex",
+        "tarTidHex",
+    )
+
+    def __init__(
+        self,
+        tidHex: Optional[str],
+        epcHex: Optional[str] = None,
+        antennaPort: Optional[int] = None,
+        peakRssiCdbm: Optional[int] = None,
+        tarPresent: bool = False,
+        messageHex: Optional[str] = None,
+        responseHex: Optional[str] = None,
+        tarTidHex: Optional[str] = None,
+    ) -> None:
+        self.tidHex = tidHex
+        self.epcHex = epcHex
+        self.antennaPort = antennaPort
+        self.peakRssiCdbm = peakRssiCdbm
+        self.tarPresent = tarPresent
+        self.messageHex = messageHex
+        self.responseHex = responseHex
+        self.tarTidHex = tarTidHex
+
+    def __repr__(self) -> str:
+        return f"TagInventory(tidHex={self.tidHex!r}, epcHex={self.epcHex!r}, tarPresent={self.tarPresent})"
+
+
+def inventory_from_dict(ev: dict) -> Optional[TagInventory]:
+    if ev.get("eventType") != "tagInventory":
+        return None
+
+    tie = ev.get("tagInventoryEvent") or {}
+    tar = (tie.get("tagAuthenticationResponse") or {}) if isinstance(tie, dict) else None
+    if not isinstance(tar, dict):
+        # counted as a decode error by ImpinjEventDecoder
+        raise TypeError("tagInventoryEvent / tagAuthenticationResponse is not an object")
+    return TagInventory(
+        tidHex=tie.get("tidHex"),
+        epcHex=tie.get("epcHex"),
+        antennaPort=tie.get("antennaPort"),
+        peakRssiCdbm=tie.get("peakRssiCdbm"),
+        tarPresent=any(tar.get(k) is not None for k in ("messageHex", "responseHex", "tidHex")),
+        messageHex=tar.get("messageHex"),
+        responseHex=tar.get("responseHex"),
+        tarTidHex=tar.get("tidHex"),
+    )
+
+
+if msgspec is not None:
+
+    class _Tar(msgspec.Struct):
+        messageHex: Optional[str] = None
+        responseHex: Optional[str] = None
+        tidHex: Optional[str] = None
+
+    class _Tie(msgspec.Struct):
+        tidHex: Optional[str] = None
+        epcHex: Optional[str] = None
+        antennaPort: Optional[int] = None
+        peakRssiCdbm: Optional[int] = None
+        tagAuthenticationResponse: Optional[_Tar] = None
+
+    class _Event(msgspec.Struct):
+        eventType: Optional[str] = None
+        tagInventoryEvent: Optional[_Tie] = None
+
+
+def is_inventory(ev) -> bool:
+    # The decoder's pre-filter on its own: False for lines that can't be tagInventory
+    if isinstance(ev, dict):
+        return ev.get("eventType") == "tagInventory"
+    return (_MARKER_STR if isinstance(ev, str) else _MARKER_BYTES) in ev
+
+
+def available_backends() -> list:
+    backends = ["json"]
+    if orjson is not None:
+        backends.insert(0, "orjson")
+    if msgspec is not None:
+        backends.insert(0, "msgspec")
+    return backends
+
+
+def loads(line: Line):
+    # Full parse to dicts, used by ImpinjReaderClient when raw lines are not requested
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+class ImpinjEventDecoder:
+
+    # Turns raw NDJSON lines from /data/stream into TagInventory objects.
+    # Backend is picked from READER_JSON_BACKEND (msgspec | orjson | json), otherwise
+    # the fastest one installed.
+
+    def __init__(self, backend: Optional[str] = None) -> None:
+        backend = (backend or os.getenv("READER_JSON_BACKEND", "")).strip().lower()
+        available = available_backends()
+        if not backend:
+            backend = available[0]
+        if backend not in available:
+            raise ValueError(f"JSON backend {backend!r} not available (installed: {available})")
+        self.backend = backend
+
+        if backend == "msgspec":
+            self._decoder = msgspec.json.Decoder(_Event)
+            self._decode = self._decode_msgspec
+        elif backend == "orjson":
+            self._decode = self._decode_orjson
+        else:
+            self._decode = self._decode_json
+
+        self.decoded = 0
+        self.filtered = 0
+        self.errors = 0
+
+    def decode(self, line: Line) -> Optional[TagInventory]:
+        # Pre-filter: skip the parse entirely for anything that can't be a tagInventory event
+        marker = _MARKER_STR if isinstance(line, str) else _MARKER_BYTES
+        if marker not in line:
+            self.filtered += 1
+            return None
+
+        try:
+            inv = self._decode(line)
+        except (ValueError, TypeError):
+            # msgspec.ValidationError / orjson.JSONDecodeError are ValueError subclasses
+            self.errors += 1
+            return None
+
+        if inv is None:
+            self.filtered += 1
+        else:
+            self.decoded += 1
+        return inv
+
+    def _decode_msgspec(self, line: Line) -> Optional[TagInventory]:
+        try:
+            ev = self._decoder.decode(line)
+        except msgspec.ValidationError:
+            # unexpected field types: fall back to the untyped path for this line
+            return self._decode_json(line)
+
+        if ev.eventType != "tagInventory" or ev.tagInventoryEvent is None:
+            return None
+
+        tie = ev.tagInventoryEvent
+        tar = tie.tagAuthenticationResponse
+        tarPresent = tar is not None and (
+            tar.messageHex is not None or tar.responseHex is not None or tar.tidHex is not None
+        )
+        if not tarPresent:
+            return TagInventory(tie.tidHex, tie.epcHex, tie.antennaPort, tie.peakRssiCdbm)
+        return TagInventory(
+            tie.tidHex,
+            tie.epcHex,
+            tie.antennaPort,
+            tie.peakRssiCdbm,
+            True,
+            tar.messageHex,
+            tar.responseHex,
+            tar.tidHex,
+        )
+
+    def _decode_orjson(self, line: Line) -> Optional[TagInventory]:
+        ev = orjson.loads(line)
+        return inventory_from_dict(ev) if isinstance(ev, dict) else None
+
+    def _decode_json(self, line: Line) -> Optional[TagInventory]:
+        if isinstance(line, memoryview):
+            line = line.tobytes()
+        ev = json.loads(line)
+        return inventory_from_dict(ev) if isinstance(ev, dict) else None
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "decoded": self.decoded,
+            "filtered": self.filtered,
+            "errors": self.errors,
+        }
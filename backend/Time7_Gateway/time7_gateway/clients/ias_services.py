@@ -1,9 +1,192 @@
-from typing import Tuple
+import asyncio
+import os
+from typing import Awaitable, Callable, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+import httpx
+
 from time7_gateway.models.schemas import AuthPayload
 
-def ias_lookup(tag_id: AuthPayload) -> Tuple[bool, str]:
+IASResult = Tuple[bool, str]
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class IASError(Exception):
+    # IAS could not give an answer (network error, timeout, bad response).
+    # Not an authentication failure: the result must not be cached.
+    pass
+
+
+class MicroBatcher(Generic[T, R]):
+
+    # Collects single submissions for up to `max_delay` seconds (or `max_batch` items)
+    # and resolves them with one call to `fn(items) -> results` (same order).
+
+    def __init__(
+        self,
+        fn: Callable[[List[T]], Awaitable[List[R]]],
+        max_batch: int = 32,
+        max_delay: float = 0.01,
+    ) -> None:
+        self._fn = fn
+        self.max_batch = max(1, int(max_batch))
+        self.max_delay = float(max_delay)
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: set = set()
+
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((item, fut))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run(self, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self._fn([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise IASError(f"batch returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        for (_, fut), result in zip(batch, results):
+            if not fut.done():
+                fut.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "pending": len(self._pending),
+        }
+
+
+class IASClient:
+
+    # Async IAS client: one keep-alive connection pool, a cap on concurrent requests,
+    # per-request timeouts, and optional batching of AuthPayloads into one request.
+    #
+    #   POST {base_url}{auth_path}   {"messageHex", "responseHex", "tidHex"} -> {"auth", "info"}
+    #   POST {base_url}{batch_path}  {"items": [...]} -> {"results": [{"auth", "info"}, ...]}  (same order)
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str] = None,
+        auth_path: str = "/authenticate",
+        batch_path: Optional[str] = "/authenticate/batch",
+        max_connections: int = 10,
+        max_concurrency: int = 8,
+        timeout: float = 5.0,
+        batch_size: int = 32,
+        batch_delay: float = 0.01,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else None
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers=headers,
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+        self.auth_path = auth_path
+        self.batch_path = batch_path
+        self._sem = asyncio.Semaphore(max(1, int(max_concurrency)))
+
+        # batching only when the IAS exposes a batch endpoint
+        self._batcher: Optional[MicroBatcher[AuthPayload, IASResult]] = None
+        if batch_path and batch_size > 1:
+            self._batcher = MicroBatcher(self.lookup_batch, max_batch=batch_size, max_delay=batch_delay)
+
+        self.requests = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> "IASClient":
+        base_url = os.getenv("IAS_BASE_URL")
+        if not base_url:
+            raise ValueError("IAS_MODE=real needs IAS_BASE_URL (the IAS service URL)")
+        return cls(
+            base_url=base_url,
+            api_key=os.getenv("IAS_API_KEY") or None,
+            auth_path=os.getenv("IAS_AUTH_PATH", "/authenticate"),
+            batch_path=os.getenv("IAS_BATCH_PATH", "/authenticate/batch") or None,
+            max_connections=int(os.getenv("IAS_MAX_CONNECTIONS", "10")),
+            max_concurrency=int(os.getenv("IAS_MAX_CONCURRENCY", "8")),
+            timeout=float(os.getenv("IAS_TIMEOUT", "5")),
+            batch_size=int(os.getenv("IAS_BATCH_SIZE", "32")),
+            batch_delay=float(os.getenv("IAS_BATCH_DELAY_MS", "10")) / 1000.0,
+        )
+
+    async def lookup(self, auth_payload: AuthPayload) -> IASResult:
+        if self._batcher is not None:
+            return await self._batcher.submit(auth_payload)
+        return await self.lookup_one(auth_payload)
+
+    async def lookup_one(self, auth_payload: AuthPayload) -> IASResult:
+        data = await self._post(self.auth_path, auth_payload.model_dump())
+        return _result(data)
+
+    async def lookup_batch(self, payloads: Sequence[AuthPayload]) -> List[IASResult]:
+        if not self.batch_path:
+            return list(await asyncio.gather(*(self.lookup_one(p) for p in payloads)))
+        data = await self._post(self.batch_path, {"items": [p.model_dump() for p in payloads]})
+        try:
+            return [_result(r) for r in data["results"]]
+        except (KeyError, TypeError) as e:
+            raise IASError(f"malformed IAS batch response: {e!r}") from e
+
+    async def _post(self, path: str, body: dict) -> dict:
+        async with self._sem:
+            self.requests += 1
+            try:
+                r = await self._client.post(path, json=body)
+                r.raise_for_status()
+                return r.json()
+            except (httpx.HTTPError, ValueError) as e:
+                self.errors += 1
+                raise IASError(f"IAS request to {path} failed: {e!r}") from e
 
+    async def aclose(self) -> None:
+        await self._client.aclose()
 
+    def stats(self) -> dict:
+        stats = {"requests": self.requests, "errors": self.errors}
+        if self._batcher is not None:
+            stats["batching"] = self._batcher.stats()
+        return stats
 
-    return False, "Actual connection to IAS yet to establish"
 
+def _result(data) -> IASResult:
+    try:
+        return bool(data["auth"]), data.get("info") or ""
+    except (KeyError, TypeError, AttributeError) as e:
+        raise IASError(f"malformed IAS response: {e!r}") from e
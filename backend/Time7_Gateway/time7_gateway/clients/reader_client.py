@@ -1,17 +1,77 @@
-import json
+import asyncio
+import inspect
 import os
+import random
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from time7_gateway.models.schemas import AuthPayload #---NEW
+from typing import Callable, Optional
+from time7_gateway.models.schemas import AuthPayload
 
 import httpx
 
-from time7_gateway.services.database import upsert_latest_tag
+from time7_gateway.clients.event_decoder import (
+    ImpinjEventDecoder,
+    TagInventory,
+    inventory_from_dict,
+    is_inventory,
+    loads,
+)
+from time7_gateway.services.database import tag_row, upsert_latest_tags
+from time7_gateway.services.pipeline import (
+    OverflowPolicy,
+    Pipeline,
+    Stage,
+    StageConfig,
+    stage_config_from_env,
+)
+from time7_gateway.services.read_coalescer import ReadCoalescer
+from time7_gateway.services.single_flight import SingleFlight
+from time7_gateway.services.write_behind import WriteBehind
+
+
+def reader_timeout(idle_seconds: Optional[float] = None) -> httpx.Timeout:
+    # The stream itself is long-lived; `read` is the longest gap allowed between two
+    # chunks before the connection is treated as dead (READER_IDLE_TIMEOUT).
+    if idle_seconds is None:
+        idle_seconds = float(os.getenv("READER_IDLE_TIMEOUT", "60"))
+    return httpx.Timeout(connect=10.0, read=idle_seconds, write=10.0, pool=10.0)
+
+
+@dataclass
+class ReconnectPolicy:
+    # Exponential backoff with jitter between reconnect attempts
+    initial: float = 0.5
+    maximum: float = 30.0
+    multiplier: float = 2.0
+    max_retries: Optional[int] = None  # consecutive failures before giving up (None = never)
+
+    @classmethod
+    def from_env(cls) -> Optional["ReconnectPolicy"]:
+        if os.getenv("READER_RECONNECT", "1").strip().lower() in ("0", "false", "no"):
+            return None
+        return cls(
+            initial=float(os.getenv("READER_RECONNECT_INITIAL", "0.5")),
+            maximum=float(os.getenv("READER_RECONNECT_MAX", "30")),
+        )
+
+    def delay(self, attempt: int) -> float:
+        # "equal jitter": half fixed, half random, so many readers on one site
+        # don't retry in lock-step after a switch or AP outage
+        base = min(self.maximum, self.initial * (self.multiplier ** attempt))
+        return base / 2 + random.uniform(0, base / 2)
 
 
 class ImpinjReaderClient:
-    def __init__(self, base_url: str, username: str, password: str):
+    def __init__(self, base_url: str, username: str, password: str, raw: bool = False,
+                 idle_timeout: Optional[float] = None, transport: Optional[httpx.AsyncBaseTransport] = None):
         self.base_url = base_url 
-        self._client = httpx.AsyncClient(auth=(username, password), timeout=None)
+        # One pooled client for the lifetime of the stream, reused across reconnects
+        # (transport: e.g. an in-process simulator for benchmarks)
+        self._client = httpx.AsyncClient(auth=(username, password), timeout=reader_timeout(idle_timeout),
+                                         transport=transport)
+        # raw=True yields undecoded NDJSON lines (bytes) so decoding can happen in the pipeline
+        self.raw = raw
 
     async def stream_events(self, on_connect=None):
     #async def stream_events(self):
@@ -22,155 +82,398 @@ class ImpinjReaderClient:
             if on_connect:
                on_connect()
 
+            if self.raw:
+                async for line in _iter_raw_lines(r):
+                    yield line
+                return
+
             async for line in r.aiter_lines():
                 if not line:
                     continue
-                yield json.loads(line)
+                yield loads(line)
 
     async def aclose(self):
         await self._client.aclose()
 
-def handle_invalid_tag(
-    tidHex,
-    epcHex,
-    seen_at,
-    active_tags,
-    cache,
-    info_message
-):
-    auth = False
-    info = info_message
 
-    active_tags.sync_seen(
-        [tidHex],
-        epcHex={tidHex: epcHex},
-        seen_at=seen_at
-    )
+async def _iter_raw_lines(r):
+    # Split the byte stream on newlines ourselves: no per-line str decode
+    pending = b""
+    async for chunk in r.aiter_bytes():
+        if pending:
+            chunk = pending + chunk
+        lines = chunk.split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if line and not line.isspace():
+                yield line
+    if pending and not pending.isspace():
+        yield pending
+
+
+@dataclass
+class IngestRecord:
+    # One decoded read travelling through the ingestion pipeline
+    tidHex: str
+    epcHex: Optional[str]
+    seen_at: datetime
+    auth_payload: Optional[AuthPayload] = None
+    auth: Optional[bool] = None  # already decided (invalid tags) or filled in by the auth stage
+    info: Optional[str] = None
+    responseHex: Optional[str] = None  # raw response for invalid tags (None = auth disabled, "" = unsupported)
+
+
+def read_inventory(ev, decoder: ImpinjEventDecoder) -> Optional[TagInventory]:
+    # ev is either a raw NDJSON line or an already-parsed event dict
+    if isinstance(ev, dict):
+        return inventory_from_dict(ev)
+    return decoder.decode(ev)
+
+
+def effective_tid(inv: TagInventory) -> str:
+    # tidHex inside tagAuthenticationResponse wins when present
+    return inv.tarTidHex or inv.tidHex
+
+
+def decode_event(ev, decoder: ImpinjEventDecoder) -> Optional[IngestRecord]:
+    inv = read_inventory(ev, decoder)
+    # Skip if not a valid tagInventoryEvent
+    if inv is None:
+        return None
+    return record_from_inventory(inv)
+
+
+def record_from_inventory(inv: TagInventory) -> Optional[IngestRecord]:
+    tidHex = inv.tidHex # Unique tag identification number
+    epcHex = inv.epcHex # Product information number
 
-    cache.set(tidHex, auth, info)
+    # Skip if no tidHex:
+    if not tidHex:
+        return None
 
-    upsert_latest_tag(
+    # Save timestamp as variable:
+    seen_at = datetime.now(timezone.utc)
+
+    # ----- TAG AUTHENTICATION RESPONSE INGESTION -----
+    if not inv.tarPresent:
+        #authentication failed, display tag as invalid
+        return IngestRecord(tidHex, epcHex, seen_at, auth=False, info="Authentication Disabled")
+
+    # tagAuthenticationResponse variables:
+    # messageHex  - challenge that was sent to the tag, will always be included.
+    # responseHex - always will be included, but will be an empty string if failed/invalid.
+    # tarTidHex   - may be empty, if so, use the tidHex variable from above.
+    if inv.tarTidHex:
+        tidHex = inv.tarTidHex
+
+    # Final checks:
+    if inv.responseHex == "":
+        #unable to authenticate due to missing responseHex. marked as incompatible tag
+        return IngestRecord(tidHex, epcHex, seen_at, auth=False, info="Unsupported Tag", responseHex="")
+
+    # ----- AUTHENTICATION RESPONSE VALID -----
+    auth_payload = AuthPayload(
+        messageHex=inv.messageHex,
+        responseHex=inv.responseHex,
         tidHex=tidHex,
-        seen_at=seen_at,
-        auth=auth,
-        info=info,
-        epcHex=epcHex,
     )
-                
-
+    return IngestRecord(tidHex, epcHex, seen_at, auth_payload=auth_payload)
 
-async def run_reader_stream(app):
-    reader_base_url = os.getenv("READER_BASE_URL", "").strip()
-    reader_user = os.getenv("READER_USER", "").strip()
-    reader_password = os.getenv("READER_PASSWORD", "").strip()
 
-    client = ImpinjReaderClient(reader_base_url, reader_user, reader_password)
+def _tid_key(rec: IngestRecord) -> str:
+    return rec.tidHex
 
-    
 
+def build_ingest_pipeline(
+    app,
+    coalesce_window: Optional[float] = None,
+    persist_fn: Optional[Callable[..., None]] = None,
+    writer: Optional[WriteBehind] = None,
+) -> Pipeline:
+    # decode -> presence -> auth -> persist (the auth stage hands its result to persist itself)
+    # IAS and the database are blocking calls, so they run in worker threads inside
+    # their own stages; a slow round-trip only fills that stage's queue.
     active_tags = app.state.active_tags
     cache = app.state.tag_info_cache
     ias_lookup = app.state.ias_lookup
-    
-    # reader status flag
-    app.state.reader_connected = False
-    def mark_connected():
-        app.state.reader_connected = True
-     
-      
+    # async lookups (IASClient / MockIASClient) are awaited directly and batch across
+    # many concurrent auth workers; plain functions run in a worker thread
+    ias_is_async = inspect.iscoroutinefunction(ias_lookup)
+    decoder = ImpinjEventDecoder()
+    app.state.event_decoder = decoder
 
-    try:
-        
-        # Subscribe to data-stream
-        async for ev in client.stream_events(on_connect=mark_connected): 
-        #async for ev in client.stream_events():
-            # Skip if not a valid tagInventoryEvent
-            
-            if ev.get("eventType") != "tagInventory":
-                
-                continue
+    # Repeat reads of a tag inside this window only bump last_seen (0 disables)
+    if coalesce_window is None:
+        coalesce_window = float(os.getenv("INGEST_COALESCE_WINDOW", "1.0"))
+    coalescer = ReadCoalescer(window_seconds=coalesce_window)
+    app.state.read_coalescer = coalescer
 
-            # Save required variables:
-            tieDict = ev.get("tagInventoryEvent", {}) # a dict object holding the variables needed for Authentication
+    # One IAS lookup per TID at a time
+    flights = SingleFlight()
+    app.state.ias_flights = flights
 
-            tidHex = tieDict.get("tidHex") # Unique tag identification number
-            epcHex = tieDict.get("epcHex") # Product information number
+    # Every read (repeats included) goes to the on-disk read history when enabled
+    history = getattr(app.state, "scan_history", None)
 
+    # Database rows go through the shared write-behind buffer (bulk upserts) unless
+    # a per-record stand-in persist_fn was given
+    if persist_fn is None and writer is None:
+        writer = getattr(app.state, "db_writer", None)
+        if writer is None:
+            writer = app.state.db_writer = WriteBehind.from_env(upsert_latest_tags)
 
+    async def decode(ev):
+        inv = read_inventory(ev, decoder)
+        if inv is None:
+            return None
 
-            # Skip if no tidHex:
-            if not tidHex:
-                continue
-            
-            # Save timestamp as variable:
-            seen_at = datetime.now(timezone.utc)
-            
-            #tid Hex from inventory event
-            tidHex_from_event = tidHex
-            
-            # ----- TAG AUTHENTICATION RESPONSE INGESTION -----
-            tarDict = tieDict.get("tagAuthenticationResponse", {}) # a dict object holding authentication payload to be sent to IAS
-            
-            if not tarDict:
-                #authentication failed, display tag as invalid
-                handle_invalid_tag(
-                    tidHex=tidHex_from_event,
-                    epcHex=epcHex,
-                    seen_at=seen_at,
-                    active_tags=active_tags,
-                    cache=cache,
-                    info_message="Authentication Disabled")
-                continue 
-
-            # Save tagAuthenticationResponse variables:
-            messageHex=tarDict.get("messageHex") # Challenge that was sent to the tag, will always be included.
-            responseHex=tarDict.get("responseHex") # Always will be included, but will be an empty string if failed/invalid.
-            tidHex=tarDict.get("tidHex") # May be empty, if so, use the tidHex variable from above.
-            
-            # If tidHex was not found inside tagAuthenticationResponse, use tidHex
-            if not tidHex:
-                tidHex = tidHex_from_event
-
-           # Final checks:
-            if responseHex == "":
-                #unable to authenticate due to missing responseHex. marked as incompatible tag
-                handle_invalid_tag(
-                    tidHex=tidHex,
-                    epcHex=epcHex,
-                    seen_at=seen_at,
-                    active_tags=active_tags,
-                    cache=cache,
-                    info_message="Unsupported Tag")
-                continue
-
-            # ----- AUTHENTICATION RESPONSE VALID -----
-            # Create auth_payload:
-            auth_payload = AuthPayload(
-                    messageHex=messageHex,
-                    responseHex=responseHex,
-                    tidHex=tidHex
-                )
-            
-            # Update active live tags
-            active_tags.sync_seen(
-                [tidHex],
-                epcHex={tidHex: epcHex},
-                seen_at=seen_at
-            )
-            
+        if history is not None and inv.tidHex:
+            history.record(effective_tid(inv), inv.antennaPort, inv.peakRssiCdbm, inv.epcHex)
+
+        if coalescer.enabled and inv.tidHex:
+            tid = effective_tid(inv)
+            if coalescer.is_repeat(tid, inv.epcHex, inv.responseHex) and active_tags.touch(tid):
+                coalescer.coalesced += 1
+                return None
+
+        coalescer.full += 1
+        return record_from_inventory(inv)
+
+    async def presence(rec: IngestRecord):
+        # Update active live tags
+        active_tags.sync_seen(
+            [rec.tidHex],
+            epcHex={rec.tidHex: rec.epcHex},
+            seen_at=rec.seen_at
+        )
+
+        if rec.auth_payload is None:
+            # invalid tag: result is already known, skip IAS
+            if cache.set(rec.tidHex, rec.auth, rec.info):
+                active_tags.mark_updated(rec.tidHex)
+            responseHex = rec.responseHex
+        else:
+            responseHex = rec.auth_payload.responseHex
+
+        # Later repeats can be coalesced once a result for this tag is cached
+        coalescer.remember(rec.tidHex, rec.epcHex, responseHex, cache.remaining_ttl(rec.tidHex))
+
+        if rec.auth_payload is None:
+            await pipeline.put(rec, stage="persist")
+            return None
+        return rec
+
+    async def authenticate(rec: IngestRecord):
+        # returns auth(bool): true if valid; else false
+        #         info(str) : information about the authentication request
+        if ias_is_async:
+            rec.auth, rec.info = await ias_lookup(rec.auth_payload)
+        else:
+            rec.auth, rec.info = await asyncio.to_thread(ias_lookup, rec.auth_payload)
+
+        # cache before the flight completes so no later miss can start a second lookup
+        if cache.set(rec.tidHex, rec.auth, rec.info):   # IAS results
+            active_tags.mark_updated(rec.tidHex)
+        coalescer.remember(rec.tidHex, rec.epcHex, rec.auth_payload.responseHex, cache.remaining_ttl(rec.tidHex))
+        await pipeline.put(rec, stage="persist")
+
+    async def auth(rec: IngestRecord):
+        # --- SENDING TO IAS ---
+        # Check if this event's tidHex exists in the cache:
+        if cache.get(rec.tidHex) is not None:
+            return None
+
+        # Concurrent misses for the same tag wait on the one lookup already in flight
+        await flights.do(rec.tidHex, lambda: authenticate(rec))
+        return None
+
+    async def persist(rec: IngestRecord):
+        # Sending to database: queued for the next bulk upsert, returns immediately
+        if writer is not None:
+            writer.add(tag_row(rec.tidHex, rec.seen_at, rec.auth, rec.info, rec.epcHex))
+            return None
+        await asyncio.to_thread(
+            persist_fn,
+            tidHex=rec.tidHex,
+            seen_at=rec.seen_at,
+            auth=rec.auth,
+            info=rec.info,
+            epcHex=rec.epcHex,
+        )
+
+    pipeline = Pipeline([
+        Stage("decode", decode, stage_config_from_env(
+            "decode", StageConfig(concurrency=1, maxsize=8192, policy=OverflowPolicy.BLOCK))),
+        Stage("presence", presence, stage_config_from_env(
+            "presence", StageConfig(concurrency=1, maxsize=8192, policy=OverflowPolicy.BLOCK))),
+        Stage("auth", auth, stage_config_from_env(
+            "auth", StageConfig(concurrency=64 if ias_is_async else 4, maxsize=4096, policy=OverflowPolicy.COALESCE)),
+            key=_tid_key),
+        Stage("persist", persist, stage_config_from_env(
+            "persist", StageConfig(concurrency=2, maxsize=4096, policy=OverflowPolicy.COALESCE)), key=_tid_key),
+    ])
+    return pipeline
+
+
+@dataclass
+class ReaderDefinition:
+    name: str
+    base_url: str
+    username: str = ""
+    password: str = ""
+
+    @classmethod
+    def from_env(cls, name: str = "reader") -> "ReaderDefinition":
+        return cls(
+            name=name,
+            base_url=os.getenv("READER_BASE_URL", "").strip(),
+            username=os.getenv("READER_USER", "").strip(),
+            password=os.getenv("READER_PASSWORD", "").strip(),
+        )
+
+
+@dataclass
+class ReaderState:
+    # Per-reader connection state and counters, reported by /api/reader-status
+    name: str
+    base_url: str = ""
+    connected: bool = False
+    events: int = 0
+    filtered: int = 0                       # keepalives / status events, not sent down the pipeline
+    last_event_at: Optional[float] = None   # epoch seconds
+    connected_at: Optional[float] = None
+    last_error: Optional[str] = None
+
+    # reconnect metrics
+    reconnects: int = 0
+    downtime_seconds: float = 0.0           # total time spent disconnected after the first connect
+    last_downtime_seconds: Optional[float] = None
+    last_time_to_first_event: Optional[float] = None  # reconnect -> first event
+    disconnected_at: Optional[float] = None  # monotonic, while down
+    reconnected_at: Optional[float] = None   # monotonic, until the first event after a reconnect
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "base_url": self.base_url,
+            "connected": self.connected,
+            "events": self.events,
+            "filtered": self.filtered,
+            "last_event_at": _iso(self.last_event_at),
+            "connected_at": _iso(self.connected_at),
+            "last_error": self.last_error,
+            "reconnects": self.reconnects,
+            "downtime_seconds": round(self.current_downtime() + self.downtime_seconds, 3),
+            "last_downtime_seconds": self.last_downtime_seconds,
+            "last_time_to_first_event": self.last_time_to_first_event,
+        }
+
+    def current_downtime(self) -> float:
+        return time.monotonic() - self.disconnected_at if self.disconnected_at is not None else 0.0
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+
+
+# Errors that mean "connection lost / reader unavailable" rather than a bug
+RECONNECT_ERRORS = (httpx.HTTPError, OSError)
+
+
+async def run_reader_stream(
+    app,
+    pipeline: Optional[Pipeline] = None,
+    reader: Optional[ReaderDefinition] = None,
+    state: Optional[ReaderState] = None,
+    reconnect: Optional[ReconnectPolicy] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+):
+    # With a reconnect policy the stream never ends on its own: dropped connections,
+    # HTTP errors and idle timeouts are retried with backoff on the same client,
+    # and ActiveTags / TagInfoCache / the pipeline stay warm in between.
+    if reader is None:
+        reader = ReaderDefinition.from_env()
+
+    client = ImpinjReaderClient(reader.base_url, reader.username, reader.password, raw=True, transport=transport)
+
+    # Without a shared pipeline this stream owns one and drains it when the stream ends
+    own_pipeline = pipeline is None
+    if own_pipeline:
+        pipeline = build_ingest_pipeline(app)
+        app.state.ingest_pipeline = pipeline
+        pipeline.start()
+
+    # Standalone streams keep driving the single app.state.reader_connected flag;
+    # supervised streams report through their own ReaderState
+    standalone = state is None
+    if standalone:
+        state = ReaderState(name=reader.name, base_url=reader.base_url)
+
+    # reader status flag
+    state.connected = False
+    if standalone:
+        app.state.reader_connected = False
+    def mark_connected():
+        state.connected = True
+        state.connected_at = time.time()
+        if state.disconnected_at is not None:
+            state.last_downtime_seconds = round(state.current_downtime(), 3)
+            state.downtime_seconds += state.last_downtime_seconds
+            state.disconnected_at = None
+            state.reconnected_at = time.monotonic()
+        if standalone:
+            app.state.reader_connected = True
+
+    def mark_disconnected(error: Optional[BaseException]):
+        state.connected = False
+        if state.disconnected_at is None:
+            state.disconnected_at = time.monotonic()
+        if error is not None:
+            state.last_error = repr(error)
+        if standalone:
+            app.state.reader_connected = False
+
+    failures = 0
+
+    try:
+        while True:
+            try:
+                # Subscribe to data-stream; the read loop only hands events to the decode stage
+                async for ev in client.stream_events(on_connect=mark_connected):
+                    state.events += 1
+                    state.last_event_at = time.time()
+                    if state.reconnected_at is not None:
+                        state.last_time_to_first_event = round(time.monotonic() - state.reconnected_at, 3)
+                        state.reconnected_at = None
+                    failures = 0
+                    if not is_inventory(ev):
+                        state.filtered += 1
+                        continue
+                    await pipeline.put(ev)
+                error = None
+            except RECONNECT_ERRORS as e:
+                if reconnect is None:
+                    raise
+                error = e
+
+            if reconnect is None:
+                break
 
-            # --- SENDING TO IAS ---
-            # Check if this event's tidHex exists in the cache:
-            if cache.get(tidHex) is None: 
-                
-                # Send event payload to clients/ias_services.py
-                auth, info = ias_lookup(auth_payload) 
-                # returns auth(bool): true if valid; else false
-                #         info(str) : information about the authentication request
+            mark_disconnected(error)
+            if reconnect.max_retries is not None and failures >= reconnect.max_retries:
+                raise ConnectionError(f"reader {reader.name}: gave up after {failures} reconnect attempts") from error
+            delay = reconnect.delay(failures)
+            failures += 1
+            state.reconnects += 1
+            await asyncio.sleep(delay)
 
-                cache.set(tidHex, auth, info)   # IAS results
-                upsert_latest_tag(tidHex=tidHex, seen_at=seen_at, auth=auth, info=info,epcHex=epcHex) # Sending to database
+        if own_pipeline:
+            await pipeline.drain()
 
     finally:
+        if own_pipeline:
+            await pipeline.stop()
         await client.aclose()
-        app.state.reader_connected = False #reader status
+        state.connected = False
+        if standalone:
+            app.state.reader_connected = False #reader status
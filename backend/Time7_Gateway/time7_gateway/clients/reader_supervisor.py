@@ -0,0 +1,108 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+
+from time7_gateway.clients.reader_client import (
+    ReaderDefinition,
+    ReaderState,
+    ReconnectPolicy,
+    run_reader_stream,
+)
+from time7_gateway.services.pipeline import Pipeline
+
+logger = logging.getLogger(__name__)
+
+
+def readers_from_env() -> List[ReaderDefinition]:
+    # READERS can be a JSON list of {"name", "base_url", "username", "password"} objects
+    # or a comma separated list of base URLs sharing READER_USER / READER_PASSWORD.
+    # Without READERS the single READER_BASE_URL reader is used.
+    raw = os.getenv("READERS", "").strip()
+    if not raw:
+        return [ReaderDefinition.from_env()]
+
+    user = os.getenv("READER_USER", "").strip()
+    password = os.getenv("READER_PASSWORD", "").strip()
+
+    if raw.startswith("["):
+        readers = []
+        for i, item in enumerate(json.loads(raw)):
+            readers.append(ReaderDefinition(
+                name=item.get("name") or f"reader-{i}",
+                base_url=item["base_url"].strip(),
+                username=item.get("username", user),
+                password=item.get("password", password),
+            ))
+        return readers
+
+    urls = [u.strip() for u in raw.split(",") if u.strip()]
+    return [ReaderDefinition(name=f"reader-{i}", base_url=u, username=user, password=password) for i, u in enumerate(urls)]
+
+
+class ReaderSupervisor:
+
+    # Runs one ImpinjReaderClient stream task per reader on the current loop.
+    # Every reader feeds the same ingestion pipeline. With a reconnect policy each
+    # stream retries on its own; without one a stream ends when its connection does.
+
+    def __init__(
+        self,
+        app,
+        readers: List[ReaderDefinition],
+        pipeline: Pipeline,
+        reconnect: Optional[ReconnectPolicy] = None,
+    ) -> None:
+        names = [r.name for r in readers]
+        if len(set(names)) != len(names):
+            raise ValueError(f"reader names must be unique: {names}")
+
+        self.app = app
+        self.readers = list(readers)
+        self.pipeline = pipeline
+        self.reconnect = reconnect
+        self.states: Dict[str, ReaderState] = {
+            r.name: ReaderState(name=r.name, base_url=r.base_url) for r in self.readers
+        }
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def running(self) -> bool:
+        return any(not t.done() for t in self._tasks.values())
+
+    @property
+    def connected(self) -> bool:
+        return any(s.connected for s in self.states.values())
+
+    def start(self) -> None:
+        self.pipeline.start()
+        for reader in self.readers:
+            task = self._tasks.get(reader.name)
+            if task is None or task.done():
+                self._tasks[reader.name] = asyncio.create_task(self._run(reader), name=f"reader-{reader.name}")
+
+    async def _run(self, reader: ReaderDefinition) -> None:
+        state = self.states[reader.name]
+        try:
+            await run_reader_stream(
+                self.app, pipeline=self.pipeline, reader=reader, state=state, reconnect=self.reconnect
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            state.last_error = repr(e)
+            logger.exception("reader %s stream failed", reader.name)
+
+    async def stop(self, drain: bool = True) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+        if drain:
+            await self.pipeline.drain()
+        await self.pipeline.stop()
+
+    def status(self) -> List[dict]:
+        return [self.states[r.name].to_dict() for r in self.readers]
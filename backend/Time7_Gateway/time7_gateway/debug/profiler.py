@@ -0,0 +1,183 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Dict, Tuple
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+def _short_path(filename: str) -> str:
+    # path relative to the sys.path entry it was imported from
+    best = ""
+    for entry in sys.path:
+        if entry and filename.startswith(entry) and len(entry) > len(best):
+            best = entry
+    return filename[len(best):].lstrip(os.sep) if best else filename
+
+
+class Profile:
+
+    # Sample counts per (thread, stack); stacks are root-first tuples of frame labels.
+
+    def __init__(self, stacks: Dict[Tuple[str, Tuple[str, ...]], int], samples: int, seconds: float,
+                 interval: float, sampler_cpu: float) -> None:
+        self.stacks = stacks
+        self.samples = samples
+        self.seconds = seconds
+        self.interval = interval
+        self.sampler_cpu = sampler_cpu
+
+    def collapsed(self) -> str:
+        # one "thread;outer;...;leaf count" line per stack (flamegraph.pl / speedscope input)
+        lines = [f"{';'.join((thread,) + stack)} {n}" for (thread, stack), n in self.stacks.items()]
+        lines.sort()
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self, top: int = 25) -> dict:
+        own: Dict[str, int] = {}
+        total: Dict[str, int] = {}
+        threads: Dict[str, int] = {}
+        for (thread, stack), n in self.stacks.items():
+            threads[thread] = threads.get(thread, 0) + n
+            if stack:
+                own[stack[-1]] = own.get(stack[-1], 0) + n
+            for frame in set(stack):
+                total[frame] = total.get(frame, 0) + n
+        ranked = sorted(own.items(), key=lambda kv: kv[1], reverse=True)[:top]
+        return {
+            "mode": "cpu",
+            "seconds": round(self.seconds, 3),
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "sampler_cpu_ms": round(self.sampler_cpu * 1000, 1),
+            "threads": threads,
+            "top": [{"frame": f, "self": n, "total": total[f]} for f, n in ranked],
+            "collapsed": self.collapsed(),
+        }
+
+
+class Profiler:
+
+    # On-demand profiling of the live process. sample() walks every thread's current
+    # frame (sys._current_frames()) each `interval` from the calling thread, which is
+    # skipped; nothing is installed in the profiled code, so there is no cost
+    # outside a run. allocations() traces allocations with tracemalloc for the run
+    # only. One run at a time, never longer than max_seconds.
+
+    def __init__(self, max_seconds: float = 30.0, min_interval: float = 0.001) -> None:
+        self.max_seconds = float(max_seconds)
+        self.min_interval = float(min_interval)
+        self._busy = threading.Lock()
+        self.runs = 0
+
+    @classmethod
+    def from_env(cls) -> "Profiler":
+        return cls(max_seconds=float(os.getenv("PROFILE_MAX_SECONDS", "30")))
+
+    def _check(self, seconds: float) -> None:
+        if not 0 < seconds <= self.max_seconds:
+            raise ValueError(f"seconds must be in (0, {self.max_seconds:g}]")
+        if not self._busy.acquire(blocking=False):
+            raise ProfilerBusy("a profile is already running")
+
+    def sample(self, seconds: float, interval: float = 0.01, lines: bool = False) -> Profile:
+        # Blocking: call from a worker thread
+        self._check(seconds)
+        try:
+            self.runs += 1
+            return self._sample(seconds, max(self.min_interval, interval), lines)
+        finally:
+            self._busy.release()
+
+    def _sample(self, seconds: float, interval: float, lines: bool) -> Profile:
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        raw: Dict[Tuple[int, tuple], int] = {}
+        samples = 0
+        cpu0, start = time.thread_time(), time.monotonic()
+        deadline = start + seconds
+        due = start
+        while True:
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append((frame.f_code, frame.f_lineno) if lines else frame.f_code)
+                    frame = frame.f_back
+                key = (ident, tuple(stack))
+                raw[key] = raw.get(key, 0) + 1
+            samples += 1
+            frame = None
+
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            due += interval
+            if due < now:
+                due = now   # fell behind (GIL contention): skip ticks rather than burst
+            time.sleep(min(due, deadline) - now)
+
+        names.update({t.ident: t.name for t in threading.enumerate()})
+        labels: Dict[object, str] = {}
+        stacks: Dict[Tuple[str, Tuple[str, ...]], int] = {}
+        for (ident, stack), n in raw.items():
+            key = (names.get(ident, f"thread-{ident}"), tuple(_label(f, labels) for f in reversed(stack)))
+            stacks[key] = stacks.get(key, 0) + n
+        return Profile(stacks, samples, time.monotonic() - start, interval, time.thread_time() - cpu0)
+
+    def allocations(self, seconds: float, top: int = 25, frames: int = 1) -> dict:
+        # Blocking: call from a worker thread. Sites of the memory allocated during
+        # the run and still alive at its end, largest first.
+        self._check(seconds)
+        try:
+            self.runs += 1
+            already = tracemalloc.is_tracing()
+            if not already:
+                tracemalloc.start(max(1, frames))
+            try:
+                time.sleep(seconds)
+                snapshot = tracemalloc.take_snapshot()
+                traced, peak = tracemalloc.get_traced_memory()
+            finally:
+                if not already:
+                    tracemalloc.stop()
+        finally:
+            self._busy.release()
+
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        stats = snapshot.statistics("traceback" if frames > 1 else "lineno")
+        return {
+            "mode": "alloc",
+            "seconds": seconds,
+            "already_tracing": already,   # tracing started before this run: older allocations included
+            "traced_kib": round(traced / 1024, 1),
+            "peak_kib": round(peak / 1024, 1),
+            "top": [
+                {
+                    "site": _site(stat.traceback[-1]) if stat.traceback else "?",
+                    "size_kib": round(stat.size / 1024, 1),
+                    "count": stat.count,
+                    "traceback": [_site(f) for f in stat.traceback] if frames > 1 else None,
+                }
+                for stat in stats[:top]
+            ],
+        }
+
+
+def _label(frame, labels: Dict[object, str]) -> str:
+    # frame is a code object, or (code, line); labels caches them for one profile
+    label = labels.get(frame)
+    if label is None:
+        code, line = frame if isinstance(frame, tuple) else (frame, None)
+        where = _short_path(code.co_filename) + (f":{line}" if line is not None else "")
+        label = labels[frame] = f"{code.co_qualname} ({where})"
+    return label
+
+
+def _site(frame: tracemalloc.Frame) -> str:
+    return f"{_short_path(frame.filename)}:{frame.lineno}"
@@ -1,5 +1,7 @@
 import asyncio
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, Request, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from time7_gateway.debug.profiler import ProfilerBusy
 from time7_gateway.clients.reader_client import run_reader_stream
 
 router = APIRouter(prefix="/debug", tags=["debug"])
@@ -19,8 +21,128 @@ def post_ias_snapshot(request: Request):
     """
     return request.app.state.tag_info_cache.snapshot()
 
+@router.get("/cache")
+def cache_stats(request: Request):
+    """
+    TagInfoCache size, limits and hit / miss / eviction / expiry counters,
+    plus the serialized /api/active-tags response cache.
+    """
+    stats = request.app.state.tag_info_cache.stats()
+    store = getattr(request.app.state, "tag_info_store", None)
+    if store is not None:
+        stats["store"] = store.stats()
+    response = getattr(request.app.state, "active_tags_response", None)
+    if response is not None:
+        stats["active_tags_response"] = response.stats()
+    return stats
+
+@router.get("/outbox")
+def outbox_stats(request: Request):
+    """
+    Local database outbox backlog, disk use and replay rate / failures.
+    """
+    outbox = getattr(request.app.state, "outbox", None)
+    if outbox is None:
+        raise HTTPException(status_code=404, detail="outbox not configured (OUTBOX_DB)")
+    return outbox.stats()
+
+@router.get("/history")
+def history_stats(request: Request):
+    """
+    Read history segments, disk use and write counters.
+    """
+    history = getattr(request.app.state, "scan_history", None)
+    if history is None:
+        raise HTTPException(status_code=404, detail="scan history not enabled (HISTORY_DIR)")
+    return history.stats()
+
+@router.get("/pipeline")
+def pipeline_stats(request: Request):
+    """
+    Queue depth and counters for each ingestion stage.
+    """
+    pipeline = getattr(request.app.state, "ingest_pipeline", None)
+    if pipeline is None:
+        raise HTTPException(status_code=404, detail="ingestion pipeline not running")
+    stats = pipeline.stats()
+    for name in ("event_decoder", "read_coalescer", "ias_flights", "db_writer", "sql_database"):
+        component = getattr(request.app.state, name, None)
+        if component is not None:
+            stats[name] = component.stats()
+    return stats
+
+@router.get("/live")
+def live_feed_stats(request: Request):
+    """
+    Live feed subscribers and broadcast counters.
+    """
+    feed = getattr(request.app.state, "live_feed", None)
+    if feed is None:
+        raise HTTPException(status_code=404, detail="live feed not configured")
+    return feed.stats()
+
+@router.get("/ias")
+def ias_stats(request: Request):
+    """
+    IAS client request / error / batching counters.
+    """
+    client = getattr(request.app.state, "ias_client", None)
+    if client is None:
+        raise HTTPException(status_code=404, detail="no IAS client configured")
+    return client.stats()
+
+@router.get("/loop")
+def loop_stats(request: Request):
+    """
+    Event-loop scheduling lag histogram and the most recent slow callbacks with their stacks.
+    """
+    monitor = getattr(request.app.state, "loop_monitor", None)
+    if monitor is None:
+        raise HTTPException(status_code=404, detail="loop monitor not configured")
+    return monitor.stats()
+
+@router.get("/profile")
+async def profile(
+    request: Request,
+    seconds: float = Query(5.0, gt=0),
+    mode: str = Query("cpu", pattern="^(cpu|alloc)$"),
+    interval_ms: float = Query(10.0, gt=0),
+    format: str = Query("collapsed", pattern="^(collapsed|json)$"),
+    lines: bool = False,
+    top: int = Query(25, ge=1, le=1000),
+    frames: int = Query(1, ge=1, le=50),
+):
+    """
+    Profiles the running process for `seconds` (at most PROFILE_MAX_SECONDS).
+    mode=cpu samples every thread's stack each interval_ms and returns collapsed
+    stacks (flamegraph.pl / speedscope input), or counts per frame with format=json.
+    mode=alloc returns the top allocation sites (tracemalloc) of the run.
+    One profile at a time; 409 while another is running.
+    """
+    profiler = getattr(request.app.state, "profiler", None)
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="profiler not configured")
+    try:
+        if mode == "alloc":
+            return await asyncio.to_thread(profiler.allocations, seconds, top, frames)
+        result = await asyncio.to_thread(profiler.sample, seconds, interval_ms / 1000.0, lines)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if format == "json":
+        return result.to_dict(top)
+    return PlainTextResponse(result.collapsed())
+
 @router.post("/reader/start")
 async def start_reader(request: Request):
+    supervisor = getattr(request.app.state, "reader_supervisor", None)
+    if supervisor is not None:
+        if supervisor.running:
+            raise HTTPException(status_code=409, detail="reader streams already running")
+        supervisor.start()
+        return {"ok": True, "readers": [r.name for r in supervisor.readers]}
+
     if getattr(request.app.state, "reader_task", None):
         raise HTTPException(status_code=409, detail="reader_task already running")
     request.app.state.reader_task = asyncio.create_task(run_reader_stream(request.app))
@@ -28,6 +150,13 @@ async def start_reader(request: Request):
 
 @router.post("/reader/stop")
 async def stop_reader(request: Request):
+    supervisor = getattr(request.app.state, "reader_supervisor", None)
+    if supervisor is not None:
+        if not supervisor.running:
+            raise HTTPException(status_code=404, detail="reader streams not running")
+        await supervisor.stop()
+        return {"ok": True}
+
     task = getattr(request.app.state, "reader_task", None)
     if not task:
         raise HTTPException(status_code=404, detail="reader_task not running")
@@ -4,15 +4,28 @@ from dotenv import load_dotenv
 import asyncio
 import os
 
-from time7_gateway.clients.reader_client import run_reader_stream
+from time7_gateway.clients.reader_client import ReconnectPolicy, build_ingest_pipeline
+from time7_gateway.clients.reader_supervisor import ReaderSupervisor, readers_from_env
 from time7_gateway.services.active_tags import ActiveTags
 from time7_gateway.services.tag_info_cache import TagInfoCache
+from time7_gateway.services.tag_info_store import TagInfoStore
+from time7_gateway.services.live_feed import LiveFeed
+from time7_gateway.services.loop_monitor import LAG_BUCKETS, LoopMonitor
+from time7_gateway.services.response_cache import ResponseCache
+from time7_gateway.services.write_behind import WriteBehind
+from time7_gateway.services.outbox import Outbox
+from time7_gateway.services.scan_history import ScanHistory
+from time7_gateway.services.database import upsert_latest_tags
+from time7_gateway.services.sql_database import SqlDatabase
 from time7_gateway.api.dashboard import router as dashboard_router
-from time7_gateway.simulators.ias_services import mock_ias_lookup
-from time7_gateway.clients.ias_services import ias_lookup as real_ias_lookup
+from time7_gateway.api.history import router as history_router
+from time7_gateway.api.metrics import instrument, router as metrics_router
+from time7_gateway.simulators.ias_services import MockIASClient
+from time7_gateway.clients.ias_services import IASClient
 
 #for debug
 from time7_gateway.debug.routes import router as debug_router
+from time7_gateway.debug.profiler import Profiler
 
 #terminal reader sim
 from time7_gateway.simulators.reader_route import router as terminal_inject_router
@@ -34,20 +47,69 @@ def create_app() -> FastAPI:
     )
 
     # Shared in-memory state
-    app.state.active_tags = ActiveTags(remove_grace_seconds=5.0)
-    app.state.tag_info_cache = TagInfoCache(cache_ttl_hours=24)
+    app.state.active_tags = ActiveTags(
+        remove_grace_seconds=5.0,
+        change_log_size=int(os.getenv("ACTIVE_TAGS_CHANGE_LOG", "10000")),
+    )
+    app.state.tag_info_cache = TagInfoCache(
+        cache_ttl_hours=float(os.getenv("TAG_CACHE_TTL_HOURS", "24")),
+        max_entries=int(os.getenv("TAG_CACHE_MAX_ENTRIES", "100000")),
+        max_bytes=int(os.getenv("TAG_CACHE_MAX_BYTES", "0")) or None,
+    )
+    # an active tag whose result expires / is evicted changes for delta clients too
+    app.state.tag_info_cache.on_drop = app.state.active_tags.mark_updated
+    # optional on-disk copy of the cache for warm restarts (TAG_CACHE_DB)
+    app.state.tag_info_store = TagInfoStore.from_env(app.state.tag_info_cache.cache_ttl.total_seconds())
+    # optional append-only read history on disk (HISTORY_DIR), queried via /api/history
+    app.state.scan_history = ScanHistory.from_env(auth_of=app.state.tag_info_cache.peek)
     app.state.reader_connected = False #for reader status
 
     # IAS switch (mock vs real)
     ias_mode = os.getenv("IAS_MODE", "mock")
-    app.state.ias_lookup = real_ias_lookup if ias_mode == "real" else mock_ias_lookup
+    app.state.ias_client = IASClient.from_env() if ias_mode == "real" else MockIASClient.from_env()
+    app.state.ias_lookup = app.state.ias_client.lookup
+
+    # Database switch (Supabase REST vs pooled async SQL at DATABASE_URL)
+    db_mode = os.getenv("DB_MODE", "supabase")
+    app.state.sql_database = SqlDatabase.from_env() if db_mode == "sql" else None
+    app.state.db_upsert = (
+        app.state.sql_database.upsert_latest_tags if app.state.sql_database is not None else upsert_latest_tags
+    )
+
+    # Prometheus metrics (/metrics); IAS and database calls are timed from here on
+    app.state.metrics = instrument(app)
+    # event-loop scheduling lag and slow-callback stacks (/debug/loop)
+    app.state.loop_monitor = LoopMonitor.from_env(lag=app.state.metrics.histogram(
+        "time7_event_loop_lag_seconds", "Event-loop scheduling lag per monitor tick.", buckets=LAG_BUCKETS
+    ).labels())
+
+    # Database upserts are buffered and written in bulk off the event loop; with
+    # OUTBOX_DB set they go to a local durable outbox first and are replayed from there
+    app.state.outbox = Outbox.from_env()
+    app.state.db_writer = WriteBehind.from_env(
+        app.state.outbox.append if app.state.outbox is not None else app.state.db_upsert
+    )
+
+    # One ingestion pipeline shared by every configured reader
+    app.state.ingest_pipeline = build_ingest_pipeline(app)
+    app.state.reader_supervisor = ReaderSupervisor(
+        app, readers_from_env(), app.state.ingest_pipeline, reconnect=ReconnectPolicy.from_env()
+    )
+
+    # WebSocket push feed for dashboards (/api/live)
+    app.state.live_feed = LiveFeed.from_env(app)
+    # serialized /api/active-tags body, rebuilt once per state change
+    app.state.active_tags_response = ResponseCache()
 
     # Routers
     app.include_router(reader_stream_router, tags=["reader-stream-sim"])
     app.include_router(terminal_inject_router, prefix="/api/sim", tags=["reader-terminal-sim"])
     app.include_router(dashboard_router, prefix="/api", tags=["dashboard"])
+    app.include_router(history_router, prefix="/api", tags=["history"])
+    app.include_router(metrics_router, tags=["metrics"])
 
     # Debug endpoints
+    app.state.profiler = Profiler.from_env()   # /debug/profile
     app.include_router(debug_router)
 
     @app.get("/health")
@@ -57,8 +119,50 @@ def create_app() -> FastAPI:
  
     @app.on_event("startup")
     async def _start_reader_stream():
-        asyncio.create_task(run_reader_stream(app))
-        
+        app.state.loop_monitor_task = asyncio.create_task(app.state.loop_monitor.run())
+        if app.state.sql_database is not None:
+            await app.state.sql_database.prepare()
+        store = app.state.tag_info_store
+        if store is not None:
+            # warm the cache before any reader connects, then persist new IAS results
+            await asyncio.to_thread(store.compact)
+            await asyncio.to_thread(store.load, app.state.tag_info_cache)
+            store.attach(app.state.tag_info_cache)
+            app.state.cache_flusher = asyncio.create_task(
+                store.run_flusher(interval=float(os.getenv("TAG_CACHE_FLUSH_SECONDS", "5")))
+            )
+        if app.state.outbox is not None:
+            # resumes whatever backlog the previous run left on disk
+            app.state.outbox_replayer = asyncio.create_task(app.state.outbox.run_replayer(app.state.db_upsert))
+        if app.state.scan_history is not None:
+            app.state.history_flusher = asyncio.create_task(app.state.scan_history.run_flusher())
+        app.state.cache_sweeper = asyncio.create_task(app.state.tag_info_cache.run_sweeper())
+        app.state.live_feed_task = asyncio.create_task(app.state.live_feed.run())
+        app.state.reader_supervisor.start()
+
+    @app.on_event("shutdown")
+    async def _stop_reader_stream():
+        await app.state.reader_supervisor.stop()
+        await app.state.db_writer.close()
+        if app.state.outbox is not None:
+            # a batch being replayed in a worker thread acks after it is sent:
+            # let it finish before the SQLite connection goes away
+            app.state.outbox.stop()
+            await asyncio.gather(app.state.outbox_replayer, return_exceptions=True)
+            await asyncio.to_thread(app.state.outbox.close)
+        if app.state.sql_database is not None:
+            await app.state.sql_database.close()
+        await app.state.ias_client.aclose()
+        app.state.cache_sweeper.cancel()
+        if app.state.scan_history is not None:
+            app.state.history_flusher.cancel()
+            await asyncio.to_thread(app.state.scan_history.close)
+        app.state.live_feed_task.cancel()
+        app.state.loop_monitor_task.cancel()
+        store = app.state.tag_info_store
+        if store is not None:
+            app.state.cache_flusher.cancel()
+            await asyncio.to_thread(store.close)
 
     return app
 
@@ -0,0 +1,30 @@
+"""create data table
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # latest state per tag, same shape as the Supabase table
+    op.create_table(
+        "data",
+        sa.Column("tid_hex", sa.Text(), primary_key=True),
+        sa.Column("first_seen", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("auth", sa.Boolean(), nullable=False),
+        sa.Column("info", sa.Text()),
+        sa.Column("epc_hex", sa.Text()),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("data")
@@ -14,6 +14,32 @@ class ScanResult(BaseModel):
     auth: bool
     info: Optional[str] = None
 
+# Delta of the dashboard list since a client's last version (/api/active-tags/changes)
+class ActiveTagChanges(BaseModel):
+    epoch: str
+    version: int
+    reset: bool
+    upserts: List[ScanResult]
+    removed: List[str]
+
+# One compacted history record: a tag's reads on one antenna within the history window (/api/history)
+class HistoryRead(BaseModel):
+    tidHex: str
+    epcHex: Optional[str] = None
+    first_seen: datetime
+    last_seen: datetime
+    antenna: Optional[int] = None
+    peakRssiCdbm: Optional[int] = None
+    reads: int
+    auth: Optional[bool] = None
+    info: Optional[str] = None
+
+class HistoryPage(BaseModel):
+    reads: List[HistoryRead]
+    truncated: bool
+    segments_read: int
+    segments_skipped: int
+
 # Authentication payload to be sent to IAS
 class AuthPayload(BaseModel):
     messageHex: str
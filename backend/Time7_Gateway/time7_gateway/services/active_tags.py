@@ -1,16 +1,53 @@
-from dataclasses import dataclass
-from datetime import datetime, timezone, timedelta
+import heapq
+import threading
+import time
+from datetime import datetime, timezone
 from typing import Dict, Iterable, List, Optional, Set
 
+from time7_gateway.services.change_log import ADDED, EXPIRED, UPDATED, ChangeLog
+
 
-@dataclass
 class ActiveTag:
-    tidHex: str
-    first_seen: datetime
-    last_seen: datetime
-    epcHex: Optional[str] = None
-    messageHex: Optional[str] = None
-    responseHex: Optional[str] = None
+
+    # One tag in view. __slots__ plus float timestamps (epoch seconds) keep each record
+    # small; first_seen / last_seen datetimes are only built when a response reads them.
+    # `due` is the last_ts the record was queued under in the expiry heap (records are
+    # heap entries themselves, ordered by due).
+
+    __slots__ = ("tidHex", "epcHex", "messageHex", "responseHex", "first_ts", "last_ts", "reads", "due")
+
+    def __init__(
+        self,
+        tidHex: str,
+        first_ts: float,
+        last_ts: float,
+        epcHex: Optional[str] = None,
+        messageHex: Optional[str] = None,
+        responseHex: Optional[str] = None,
+        reads: int = 1,
+    ) -> None:
+        self.tidHex = tidHex
+        self.first_ts = first_ts
+        self.last_ts = last_ts
+        self.epcHex = epcHex
+        self.messageHex = messageHex
+        self.responseHex = responseHex
+        self.reads = reads
+        self.due = last_ts
+
+    @property
+    def first_seen(self) -> datetime:
+        return datetime.fromtimestamp(self.first_ts, timezone.utc)
+
+    @property
+    def last_seen(self) -> datetime:
+        return datetime.fromtimestamp(self.last_ts, timezone.utc)
+
+    def __lt__(self, other: "ActiveTag") -> bool:
+        return self.due < other.due
+
+    def __repr__(self) -> str:
+        return f"ActiveTag(tidHex={self.tidHex!r}, epcHex={self.epcHex!r}, reads={self.reads})"
 
 
 def _utc(dt: datetime) -> datetime:
@@ -19,11 +56,34 @@ def _utc(dt: datetime) -> datetime:
     return dt.astimezone(timezone.utc)
 
 
+def _ts(dt: Optional[datetime]) -> float:
+    # epoch seconds; naive datetimes are taken as UTC like _utc()
+    if dt is None:
+        return time.time()
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
 class ActiveTags:
 
-    def __init__(self, remove_grace_seconds: float) -> None:
+    # _tags is kept in first_seen order (insertion order), so reads never sort.
+    # Expiry uses a lazy min-heap of records ordered by `due`: sync_seen/touch only bump
+    # last_ts; when a record reaches the front and the tag has been seen since, it is
+    # pushed back due at its current last_ts. Expiring costs O(k log n) for the k
+    # entries that come due instead of a scan of every tag.
+    # Every change a dashboard can see (tag added, epcHex / auth result updated, tag
+    # expired) is recorded in `changes` so clients can fetch deltas.
+
+    def __init__(self, remove_grace_seconds: float, change_log_size: int = 10000) -> None:
         self._tags: Dict[str, ActiveTag] = {}
-        self._grace = timedelta(seconds=float(remove_grace_seconds))
+        self._grace = float(remove_grace_seconds)
+        self._expiry: List[ActiveTag] = []
+        self._newest_first_ts = float("-inf")
+        self._unordered = False   # set when a tag arrives with an older first_seen
+        self._lock = threading.Lock()  # dashboard reads run in the threadpool
+        self.changes = ChangeLog(maxlen=change_log_size)
+        self.expired = 0   # tags removed by remove_inactive, ever
 
     def sync_seen(
         self,
@@ -34,61 +94,114 @@ class ActiveTags:
         seen_at: Optional[datetime] = None,
     ) -> Set[str]:
 
-        now = _utc(seen_at) if seen_at else datetime.now(timezone.utc)
+        now = _ts(seen_at)
         seen_now: Set[str] = {str(t) for t in (tidHex or [])}
 
         new_ids: Set[str] = set()
 
-        for tid in seen_now:
-            epc_val = epcHex.get(tid) if epcHex else None
-            msg_val = messageHex.get(tid) if messageHex else None
-            resp_val = responseHex.get(tid) if responseHex else None
-
-            cur = self._tags.get(tid)
-            if cur is None:
-                self._tags[tid] = ActiveTag(
-                    tidHex=tid,
-                    first_seen=now,
-                    last_seen=now,
-                    epcHex=epc_val,
-                    messageHex=msg_val,
-                    responseHex=resp_val,
-                )
-                new_ids.add(tid)
-            else:
-             
-                cur.last_seen = now
-                if epcHex is not None:
-                    cur.epcHex = epc_val
-                if messageHex is not None:
-                    cur.messageHex = msg_val
-                if responseHex is not None:
-                    cur.responseHex = resp_val
+        with self._lock:
+            for tid in seen_now:
+                epc_val = epcHex.get(tid) if epcHex else None
+                msg_val = messageHex.get(tid) if messageHex else None
+                resp_val = responseHex.get(tid) if responseHex else None
+
+                cur = self._tags.get(tid)
+                if cur is None:
+                    self._add(ActiveTag(tid, now, now, epc_val, msg_val, resp_val))
+                    self.changes.record(ADDED, tid)
+                    new_ids.add(tid)
+                else:
+
+                    cur.last_ts = now
+                    cur.reads += 1
+                    if epcHex is not None:
+                        if cur.epcHex != epc_val:
+                            self.changes.record(UPDATED, tid)
+                        cur.epcHex = epc_val
+                    if messageHex is not None:
+                        cur.messageHex = msg_val
+                    if responseHex is not None:
+                        cur.responseHex = resp_val
 
 
         return new_ids
 
+    def _add(self, tag: ActiveTag) -> None:
+        self._tags[tag.tidHex] = tag
+        tag.due = tag.last_ts
+        heapq.heappush(self._expiry, tag)
+        if tag.first_ts < self._newest_first_ts:
+            self._unordered = True
+        else:
+            self._newest_first_ts = tag.first_ts
+
+    def mark_updated(self, tidHex: str) -> None:
+        # the tag's auth result changed (TagInfoCache); only logged while it is in view
+        with self._lock:
+            if tidHex in self._tags:
+                self.changes.record(UPDATED, tidHex)
+
+    def get(self, tidHex: str) -> Optional[ActiveTag]:
+        return self._tags.get(tidHex)
+
+    def touch(self, tidHex: str, seen_at: Optional[datetime] = None) -> bool:
+        # Fast path for repeat reads: bump last_seen and the read counter only.
+        # Returns False if the tag is not (or no longer) active, so the caller takes the full path.
+        cur = self._tags.get(tidHex)
+        if cur is None:
+            return False
+
+        now = _ts(seen_at)
+        if now - cur.last_ts > self._grace:
+            return False
+
+        cur.last_ts = now
+        cur.reads += 1
+        return True
+
     def remove_inactive(self, now: Optional[datetime] = None) -> int:
-        now_utc = _utc(now) if now else datetime.now(timezone.utc)
-        cutoff = now_utc - self._grace
+        cutoff = _ts(now) - self._grace
 
         removed = 0
-        for tid in list(self._tags.keys()):
-            if self._tags[tid].last_seen < cutoff:
-                del self._tags[tid]
-                removed += 1
+        with self._lock:
+            heap = self._expiry
+            while heap and heap[0].due < cutoff:
+                tag = heapq.heappop(heap)
+                if self._tags.get(tag.tidHex) is not tag:
+                    continue  # entry for a tag that already expired and came back
+                if tag.last_ts < cutoff:
+                    del self._tags[tag.tidHex]
+                    self.changes.record(EXPIRED, tag.tidHex)
+                    removed += 1
+                else:
+                    tag.due = tag.last_ts
+                    heapq.heappush(heap, tag)
+            self.expired += removed
         return removed
 
+    def _ordered(self) -> List[ActiveTag]:
+        # first_seen ascending; only re-sorted if a tag arrived out of order
+        if self._unordered:
+            self._tags = dict(sorted(self._tags.items(), key=lambda kv: kv[1].first_ts))
+            self._unordered = False
+        return list(self._tags.values())
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
     def get_active(self) -> List[ActiveTag]:
         self.remove_inactive()
-        return sorted(self._tags.values(), key=lambda x: x.first_seen, reverse=True)
+        with self._lock:
+            items = self._ordered()
+        items.reverse()
+        return items
 
     def get_active_ids(self) -> List[str]:
         self.remove_inactive()
-        return list(self._tags.keys())
+        with self._lock:
+            return list(self._tags.keys())
 
     def snapshot(self) -> dict:
-        self.remove_inactive()
         items = [
             {
                 "tidHex": t.tidHex,
@@ -100,4 +213,4 @@ class ActiveTags:
             }
             for t in self.get_active()
         ]
-        return {"count": len(items), "items": items}
\ No newline at end of file
+        return {"count": len(items), "items": items}
@@ -0,0 +1,47 @@
+import threading
+import uuid
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+ADDED = "added"
+UPDATED = "updated"
+EXPIRED = "expired"
+
+
+class ChangeLog:
+
+    # Monotonic version plus a bounded ring buffer of (version, kind, tidHex).
+    # Clients keep the version they last saw and ask for what changed since; once
+    # their version has fallen out of the buffer (or belongs to an earlier process,
+    # see `epoch`) they have to resync from a full list.
+
+    def __init__(self, maxlen: int = 10000) -> None:
+        self.epoch = uuid.uuid4().hex[:12]   # changes on every gateway start
+        self.version = 0
+        self._buf: Deque[Tuple[int, str, str]] = deque(maxlen=max(1, int(maxlen)))
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, tidHex: str) -> int:
+        with self._lock:
+            self.version += 1
+            self._buf.append((self.version, kind, tidHex))
+            return self.version
+
+    def since(self, version: int) -> Optional[List[Tuple[int, str, str]]]:
+        # Changes after `version`, oldest first; None if the caller must resync.
+        with self._lock:
+            if version > self.version:
+                return None
+            floor = self.version - len(self._buf)   # oldest version still in the buffer, minus one
+            if version < floor:
+                return None
+            skip = version - floor
+            return [self._buf[i] for i in range(skip, len(self._buf))]
+
+    def stats(self) -> dict:
+        return {
+            "epoch": self.epoch,
+            "version": self.version,
+            "buffered": len(self._buf),
+            "maxlen": self._buf.maxlen,
+        }
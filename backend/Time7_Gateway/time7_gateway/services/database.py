@@ -1,14 +1,29 @@
 from datetime import datetime
+from typing import List
+
 from time7_gateway.clients.supabase_client import get_supabase
 
 
-def upsert_latest_tag(tidHex: str, seen_at: datetime, auth: bool, info: str | None, epcHex: str | None):
-    sb = get_supabase()
-    payload = {
+def tag_row(tidHex: str, seen_at: datetime, auth: bool, info: str | None, epcHex: str | None) -> dict:
+    return {
         "tid_hex": tidHex,
         "first_seen": seen_at.isoformat(),
         "auth": auth,
         "info": info,
         "epc_hex": epcHex,
     }
-    sb.table("data").upsert(payload).execute()
\ No newline at end of file
+
+
+def upsert_latest_tag(tidHex: str, seen_at: datetime, auth: bool, info: str | None, epcHex: str | None):
+    sb = get_supabase()
+    payload = tag_row(tidHex, seen_at, auth, info, epcHex)
+    sb.table("data").upsert(payload).execute()
+
+
+def upsert_latest_tags(rows: List[dict]):
+    # One bulk upsert; rows must have distinct tid_hex (Postgres rejects a batch
+    # that touches the same key twice), which WriteBehind guarantees
+    if not rows:
+        return
+    sb = get_supabase()
+    sb.table("data").upsert(rows).execute()
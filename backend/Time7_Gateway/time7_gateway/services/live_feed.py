@@ -0,0 +1,295 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+try:
+    import orjson
+except ImportError:  # optional, json is used otherwise
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Messages (JSON text frames):
+#   {"type": "snapshot", "epoch", "version", "tags": [row, ...], "reader": {...}}
+#   {"type": "delta", "version", "upserts": [row, ...], "removed": [tidHex, ...]}
+#   {"type": "reader", "connected": bool, "readers": [{"name", "connected"}, ...]}
+# row = same fields as /api/active-tags (tidHex, epcHex, first_seen, auth, info)
+
+
+def _dumps(obj) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def scan_row(tag, cached) -> dict:
+    auth, info = cached
+    return {
+        "tidHex": tag.tidHex,
+        "epcHex": tag.epcHex,
+        "first_seen": tag.first_seen.isoformat(),
+        "auth": auth,
+        "info": info,
+    }
+
+
+class Subscriber:
+
+    # One connected client. Deltas broadcast while it is busy (or inside its rate
+    # limit) pile up in _pending and are merged into one message on the next send.
+    # If more than max_pending pile up the client is behind: pending is dropped and
+    # the next send is a fresh snapshot instead.
+
+    def __init__(self, min_interval: float, max_pending: int) -> None:
+        self.min_interval = min_interval
+        self.max_pending = max_pending
+        self._pending: List[dict] = []
+        self._reader: Optional[str] = None
+        self._wake = asyncio.Event()
+        self.resync = True   # first message is always a snapshot
+        self.resyncs = 0     # consecutive, reset once a delta goes out
+        self.sent = 0
+
+    def offer_delta(self, delta: dict) -> None:
+        if not self.resync:
+            if len(self._pending) >= self.max_pending:
+                self._pending.clear()
+                self.resync = True
+                self.resyncs += 1
+            else:
+                self._pending.append(delta)
+        self._wake.set()
+
+    def offer_reader(self, text: str) -> None:
+        self._reader = text
+        self._wake.set()
+
+    def force_resync(self) -> None:
+        self._pending.clear()
+        self.resync = True
+        self._wake.set()
+
+    def take(self, feed: "LiveFeed") -> List[str]:
+        out: List[str] = []
+        if self.resync:
+            out.append(feed.snapshot_text())
+            self._pending.clear()
+            self._reader = None   # the snapshot carries the reader status
+            self.resync = False
+        elif len(self._pending) == 1:
+            out.append(self._pending[0]["text"])
+            self.resyncs = 0
+        elif self._pending:
+            out.append(_merge(self._pending))
+            self.resyncs = 0
+        self._pending = []
+
+        if self._reader is not None:
+            out.append(self._reader)
+            self._reader = None
+        return out
+
+
+def _merge(deltas: List[dict]) -> str:
+    upserts: Dict[str, dict] = {}
+    removed: Set[str] = set()
+    for d in deltas:
+        for tid, row in d["upserts"].items():
+            upserts[tid] = row
+            removed.discard(tid)
+        for tid in d["removed"]:
+            upserts.pop(tid, None)
+            removed.add(tid)
+    return _dumps({
+        "type": "delta",
+        "version": deltas[-1]["version"],
+        "upserts": list(upserts.values()),
+        "removed": sorted(removed),
+    })
+
+
+class LiveFeed:
+
+    # Pushes dashboard changes to WebSocket subscribers.
+    # One broadcaster task wakes at most max_hz times a second, expires tags, turns
+    # the ActiveTags change log into one delta (rows built and JSON-encoded once for
+    # every subscriber) and watches reader connection state. Each subscriber has its
+    # own sender loop with its own rate limit, so a slow client never delays others.
+
+    def __init__(
+        self,
+        app,
+        max_hz: float = 4.0,
+        max_pending: int = 16,
+        send_timeout: float = 5.0,
+        max_resyncs: int = 3,
+    ) -> None:
+        self.app = app
+        self.max_hz = float(max_hz)
+        self.max_pending = int(max_pending)
+        self.send_timeout = float(send_timeout)
+        self.max_resyncs = int(max_resyncs)
+        self._subs: Set[Subscriber] = set()
+        self._version: Optional[int] = None
+        self._reader_key = None
+        self._snapshot: Optional[tuple] = None   # ((version, cache version, reader_key), text)
+
+        self.ticks = 0
+        self.deltas = 0
+        self.snapshots = 0
+        self.dropped = 0
+
+    @classmethod
+    def from_env(cls, app) -> "LiveFeed":
+        return cls(
+            app,
+            max_hz=float(os.getenv("LIVE_FEED_MAX_HZ", "4")),
+            max_pending=int(os.getenv("LIVE_FEED_MAX_PENDING", "16")),
+            send_timeout=float(os.getenv("LIVE_FEED_SEND_TIMEOUT", "5")),
+        )
+
+    # --- state -> messages ---
+
+    def _reader_state(self):
+        supervisor = getattr(self.app.state, "reader_supervisor", None)
+        if supervisor is None:
+            connected = bool(getattr(self.app.state, "reader_connected", False))
+            return (connected, ())
+        readers = tuple((s["name"], s["connected"]) for s in supervisor.status())
+        return (supervisor.connected, readers)
+
+    def _reader_payload(self, key) -> dict:
+        connected, readers = key
+        return {"connected": connected, "readers": [{"name": n, "connected": c} for n, c in readers]}
+
+    def snapshot_text(self) -> str:
+        tags = self.app.state.active_tags
+        cache = self.app.state.tag_info_cache
+        tags.remove_inactive()
+        version = tags.changes.version
+        reader_key = self._reader_state()
+        # the cache version also moves on TTL expiry / eviction (same key as /api/active-tags)
+        key = (version, cache.version, reader_key)
+        if self._snapshot is not None and self._snapshot[0] == key:
+            return self._snapshot[1]
+
+        rows = []
+        for t in tags.get_active():
+            cached = cache.get(t.tidHex)
+            if cached is not None:
+                rows.append(scan_row(t, cached))
+        text = _dumps({
+            "type": "snapshot",
+            "epoch": tags.changes.epoch,
+            "version": version,
+            "tags": rows,
+            "reader": self._reader_payload(reader_key),
+        })
+        self._snapshot = (key, text)
+        self.snapshots += 1
+        return text
+
+    def tick(self) -> None:
+        tags = self.app.state.active_tags
+        cache = self.app.state.tag_info_cache
+        log = tags.changes
+        self.ticks += 1
+
+        tags.remove_inactive()
+        version = log.version
+        if self._version is None:
+            self._version = version
+
+        if version != self._version and self._subs:
+            changes = log.since(self._version)
+            if changes is None:
+                # fell out of the change log (very long tick gap): everyone starts over
+                for sub in self._subs:
+                    sub.force_resync()
+            else:
+                self._broadcast_delta(changes, version, tags, cache)
+        self._version = version
+
+        reader_key = self._reader_state()
+        if reader_key != self._reader_key:
+            self._reader_key = reader_key
+            text = _dumps({"type": "reader", **self._reader_payload(reader_key)})
+            for sub in self._subs:
+                sub.offer_reader(text)
+
+    def _broadcast_delta(self, changes, version: int, tags, cache) -> None:
+        upserts: Dict[str, dict] = {}
+        removed: List[str] = []
+        for tid in dict.fromkeys(tid for v, _, tid in changes if v <= version):
+            t = tags.get(tid)
+            cached = cache.get(tid) if t is not None else None
+            if cached is None:
+                removed.append(tid)
+            else:
+                upserts[tid] = scan_row(t, cached)
+
+        delta = {
+            "version": version,
+            "upserts": upserts,
+            "removed": removed,
+            "text": _dumps({"type": "delta", "version": version, "upserts": list(upserts.values()), "removed": removed}),
+        }
+        self.deltas += 1
+        for sub in self._subs:
+            sub.offer_delta(delta)
+
+    async def run(self) -> None:
+        interval = 1.0 / self.max_hz if self.max_hz > 0 else 0.25
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("live feed tick failed")
+
+    # --- subscribers ---
+
+    def subscribe(self, max_hz: Optional[float] = None) -> Subscriber:
+        hz = self.max_hz if not max_hz or max_hz <= 0 else min(float(max_hz), self.max_hz)
+        sub = Subscriber(min_interval=1.0 / hz if hz > 0 else 0.0, max_pending=self.max_pending)
+        sub._wake.set()
+        self._subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        self._subs.discard(sub)
+
+    async def serve(self, sub: Subscriber, send: Callable[[str], Awaitable[None]]) -> None:
+        # Sender loop for one subscriber. Returns when the client has to be dropped
+        # (kept falling behind, or a send stalled past send_timeout).
+        while True:
+            await sub._wake.wait()
+            sub._wake.clear()
+
+            if sub.resyncs > self.max_resyncs:
+                self.dropped += 1
+                return
+
+            for text in sub.take(self):
+                try:
+                    await asyncio.wait_for(send(text), self.send_timeout)
+                except asyncio.TimeoutError:
+                    self.dropped += 1
+                    return
+                sub.sent += 1
+
+            if sub.min_interval:
+                await asyncio.sleep(sub.min_interval)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subs),
+            "max_hz": self.max_hz,
+            "ticks": self.ticks,
+            "deltas": self.deltas,
+            "snapshots": self.snapshots,
+            "dropped": self.dropped,
+            "resyncing": sum(1 for s in self._subs if s.resync),
+        }
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, List, Optional
+
+from time7_gateway.services.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# seconds; scheduling lag of a healthy loop is well under a millisecond
+LAG_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class LoopMonitor:
+
+    # Event-loop health. run() sleeps `tick` seconds in a loop and records how late
+    # each wakeup was (scheduling lag) in a histogram. A lag over `threshold` means
+    # something held the loop: a slow callback. Its stack can only be taken while it
+    # is still running, so a watchdog thread checks the tick's heartbeat every
+    # threshold / 2 and, once the loop is overdue, captures the loop thread's stack
+    # (and the task it is in) via sys._current_frames(). When the loop wakes up the
+    # stall is logged with that stack and kept in `reports` (the most recent ones).
+    # A stall inside C code that holds the GIL is only seen once it returns, so such
+    # reports have no stack.
+
+    def __init__(
+        self,
+        tick: float = 0.1,
+        threshold: float = 0.1,
+        max_reports: int = 20,
+        lag: Optional[Histogram] = None,
+    ) -> None:
+        self.tick = float(tick)
+        self.threshold = float(threshold)
+        self.lag = lag if lag is not None else Histogram(LAG_BUCKETS)
+        self.reports: Deque[dict] = deque(maxlen=max(1, int(max_reports)))
+
+        self.ticks = 0
+        self.slow_callbacks = 0
+        self.max_lag = 0.0
+        self.last_lag: Optional[float] = None
+
+        self._beat: Optional[float] = None     # monotonic time the current tick started
+        self._sample: Optional[tuple] = None   # (beat, stack, task) taken by the watchdog
+        self._loop_thread: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_env(cls, lag: Optional[Histogram] = None) -> "LoopMonitor":
+        return cls(
+            tick=float(os.getenv("LOOP_MONITOR_TICK_MS", "100")) / 1000.0,
+            threshold=float(os.getenv("LOOP_SLOW_CALLBACK_MS", "100")) / 1000.0,
+            max_reports=int(os.getenv("LOOP_SLOW_REPORTS", "20")),
+            lag=lag,
+        )
+
+    async def run(self) -> None:
+        # Background task for the loop's lifetime; cancelling it stops the watchdog too
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._stop.clear()
+        watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        watchdog.start()
+        try:
+            while True:
+                start = self._beat = time.monotonic()
+                await asyncio.sleep(self.tick)
+                lag = max(0.0, time.monotonic() - start - self.tick)
+                self._record(start, lag)
+        finally:
+            self._stop.set()
+            self._beat = None
+
+    def _record(self, beat: float, lag: float) -> None:
+        self.ticks += 1
+        self.lag.observe(lag)
+        self.last_lag = lag
+        if lag > self.max_lag:
+            self.max_lag = lag
+        if lag < self.threshold:
+            return
+
+        sample, self._sample = self._sample, None
+        stack, task = (sample[1], sample[2]) if sample is not None and sample[0] == beat else (None, None)
+        self.slow_callbacks += 1
+        report = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "lag_ms": round(lag * 1000, 1),
+            "task": task,
+            "stack": stack,
+        }
+        self.reports.append(report)
+        logger.warning(
+            "event loop blocked for %.0f ms%s%s",
+            lag * 1000,
+            f" in task {task}" if task else "",
+            ":\n" + "".join(stack) if stack else " (no stack captured)",
+        )
+
+    def _watch(self) -> None:
+        interval = max(0.005, self.threshold / 2)
+        while not self._stop.wait(interval):
+            beat = self._beat
+            if beat is None or (self._sample is not None and self._sample[0] == beat):
+                continue
+            if time.monotonic() - beat - self.tick > self.threshold:
+                self._sample = (beat, self._loop_stack(), self._current_task())
+
+    def _loop_stack(self) -> Optional[List[str]]:
+        frame = sys._current_frames().get(self._loop_thread)
+        return traceback.format_stack(frame) if frame is not None else None
+
+    def _current_task(self) -> Optional[str]:
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            return None
+        if task is None:
+            return None
+        return f"{task.get_name()} ({task.get_coro().__qualname__})"
+
+    def stats(self) -> dict:
+        cumulative, buckets = 0, {}
+        for bound, n in zip(self.lag.bounds, self.lag.counts):
+            cumulative += n
+            buckets[f"{bound * 1000:g}"] = cumulative
+        buckets["+Inf"] = self.lag.count
+        return {
+            "tick_ms": self.tick * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "running": self._beat is not None,
+            "ticks": self.ticks,
+            "last_lag_ms": round(self.last_lag * 1000, 3) if self.last_lag is not None else None,
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+            "avg_lag_ms": round(self.lag.sum / self.lag.count * 1000, 3) if self.lag.count else None,
+            "p99_lag_ms_le": _ms(self.lag.quantile(0.99)),
+            "lag_ms_buckets": buckets,   # cumulative: ticks with lag <= bucket
+            "slow_callbacks": self.slow_callbacks,
+            "recent_slow_callbacks": list(reversed(self.reports)),
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    if seconds is None:
+        return None
+    return seconds * 1000 if seconds != float("inf") else None
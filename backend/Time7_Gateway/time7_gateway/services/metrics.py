@@ -0,0 +1,188 @@
+import functools
+import inspect
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Prometheus text exposition format 0.0.4
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# seconds; covers a local IAS / database round-trip up to a stalled one
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+
+    # Fixed buckets, counts in a list allocated once: observe() is a bisect and three
+    # additions, nothing is allocated per observation. Rendered cumulative (`le`).
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.bounds = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.bounds) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        # upper bound of the bucket holding the q-quantile (for logs and benchmarks)
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Counter:
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self, n: int = 1) -> None:
+        self.value += n
+
+
+class Family:
+
+    # One metric name with its HELP / TYPE and a sample per label set. Children are
+    # created when the label set is first used (label values are a small fixed set:
+    # readers, stages, routes), so the recording path only looks one up.
+
+    def __init__(self, name: str, kind: str, help: str, factory: Optional[Callable[[], object]] = None) -> None:
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self._factory = factory
+        self.children: Dict[Labels, object] = {}
+
+    def labels(self, **labels: str):
+        key = tuple(sorted(labels.items()))
+        child = self.children.get(key)
+        if child is None:
+            child = self.children[key] = self._factory()
+        return child
+
+
+class Metrics:
+
+    # Histograms and counters recorded by the gateway (request timings, IAS / database
+    # calls), plus collectors that read the counters the components already keep
+    # (pipeline, caches, readers) at scrape time, so those add nothing per event.
+
+    def __init__(self) -> None:
+        self._families: Dict[str, Family] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Labels, float]]]] = []
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Family:
+        return self._family(name, "histogram", help, lambda: Histogram(buckets))
+
+    def counter(self, name: str, help: str) -> Family:
+        return self._family(name, "counter", help, Counter)
+
+    def _family(self, name: str, kind: str, help: str, factory) -> Family:
+        fam = self._families.get(name)
+        if fam is None:
+            fam = self._families[name] = Family(name, kind, help, factory)
+        return fam
+
+    def collector(self, fn: Callable[[], Iterable[Tuple[str, str, str, Labels, float]]]) -> None:
+        # fn yields (name, "counter" | "gauge", help, labels, value) when scraped
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        out: List[str] = []
+        for fam in self._families.values():
+            out.append(f"# HELP {fam.name} {fam.help}")
+            out.append(f"# TYPE {fam.name} {fam.kind}")
+            for labels, child in fam.children.items():
+                if isinstance(child, Histogram):
+                    _render_histogram(out, fam.name, labels, child)
+                else:
+                    out.append(f"{fam.name}{_labels(labels)} {_value(child.value)}")
+
+        collected: Dict[str, Tuple[str, str, List[Tuple[Labels, float]]]] = {}
+        for fn in self._collectors:
+            for name, kind, help, labels, value in fn():
+                collected.setdefault(name, (kind, help, []))[2].append((labels, value))
+        for name, (kind, help, samples) in collected.items():
+            out.append(f"# HELP {name} {help}")
+            out.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                out.append(f"{name}{_labels(labels)} {_value(value)}")
+        out.append("")
+        return "\n".join(out)
+
+
+def _render_histogram(out: List[str], name: str, labels: Labels, h: Histogram) -> None:
+    cumulative = 0
+    for bound, n in zip(h.bounds, h.counts):
+        cumulative += n
+        out.append(f"{name}_bucket{_labels(labels + (('le', _value(bound)),))} {cumulative}")
+    out.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {h.count}")
+    out.append(f"{name}_sum{_labels(labels)} {_value(h.sum)}")
+    out.append(f"{name}_count{_labels(labels)} {h.count}")
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _value(v) -> str:
+    if v is None:
+        return "NaN"
+    if isinstance(v, bool):
+        return "1" if v else "0"
+    if isinstance(v, int):
+        return str(v)
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v))
+
+
+def timed(fn: Callable, histogram: Histogram, errors: Optional[Counter] = None) -> Callable:
+    # fn with every call's duration observed (failures too) and failures counted;
+    # an async fn stays async so callers that check iscoroutinefunction still await it
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def timed_async(*args, **kwargs):
+            t = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            except Exception:
+                if errors is not None:
+                    errors.value += 1
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - t)
+        return timed_async
+
+    @functools.wraps(fn)
+    def timed_sync(*args, **kwargs):
+        t = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            if errors is not None:
+                errors.value += 1
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - t)
+    return timed_sync
@@ -0,0 +1,212 @@
+import asyncio
+import inspect
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, List, Optional, Union
+
+SendFn = Callable[[List[dict]], Union[None, Awaitable[None]]]
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+    tid_hex     TEXT NOT NULL UNIQUE,
+    row         TEXT NOT NULL,
+    enqueued_at REAL NOT NULL
+)
+"""
+
+
+class Outbox:
+
+    # Durable local queue (SQLite, WAL) for database rows, so ingestion never waits
+    # on the remote store and rows survive an outage or a restart.
+    # append() is the WriteBehind flush target: one local transaction per batch.
+    # Only the latest row per TID is kept (INSERT OR REPLACE gives it a new seq), so
+    # the backlog compacts itself while the remote is down. Past max_rows the oldest
+    # rows are dropped. run_replayer() sends the oldest rows to the remote in bulk and
+    # deletes exactly the rows it sent; a row replaced meanwhile stays for the next pass.
+    # stop() ends the replayer between batches, never in the middle of one.
+
+    RATE_WINDOW = 60.0   # seconds, for replay_rows_per_s
+
+    def __init__(self, path: str, max_rows: int = 1_000_000) -> None:
+        self.path = path
+        self.max_rows = int(max_rows)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA auto_vacuum=INCREMENTAL")   # only takes effect on a new file
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_SCHEMA)
+        self._db.commit()
+        self._lock = threading.Lock()
+        self._count = self._db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+        self.appended = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self._recent = deque()   # (monotonic, rows) replayed in the last RATE_WINDOW seconds
+        self._stopping = False
+        self._wake: Optional[asyncio.Event] = None
+
+    @classmethod
+    def from_env(cls) -> Optional["Outbox"]:
+        # OUTBOX_DB=/var/lib/time7/outbox.sqlite enables it; unset = write straight to the database
+        path = os.getenv("OUTBOX_DB")
+        if not path:
+            return None
+        return cls(path, max_rows=int(os.getenv("OUTBOX_MAX_ROWS", "1000000")))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, rows: List[dict]) -> None:
+        if not rows:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO outbox (tid_hex, row, enqueued_at) VALUES (?, ?, ?)",
+                [(r["tid_hex"], json.dumps(r, separators=(",", ":")), now) for r in rows],
+            )
+            count = self._db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+            if count > self.max_rows:
+                over = count - self.max_rows
+                self._db.execute(
+                    "DELETE FROM outbox WHERE seq IN (SELECT seq FROM outbox ORDER BY seq LIMIT ?)", (over,)
+                )
+                self.dropped += over
+                count = self.max_rows
+                logger.warning("outbox full (%d rows): dropped %d oldest rows", self.max_rows, over)
+            self._db.commit()
+            self._count = count
+        self.appended += len(rows)
+
+    def peek(self, limit: int) -> List[tuple]:
+        # oldest first: [(seq, row dict), ...]
+        with self._lock:
+            cur = self._db.execute("SELECT seq, row FROM outbox ORDER BY seq LIMIT ?", (limit,))
+            return [(seq, json.loads(row)) for seq, row in cur.fetchall()]
+
+    def ack(self, seqs: List[int]) -> None:
+        with self._lock:
+            self._db.executemany("DELETE FROM outbox WHERE seq = ?", [(s,) for s in seqs])
+            self._count = self._db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+            if self._count == 0:
+                # drained: give the disk back
+                self._db.commit()
+                self._db.execute("PRAGMA incremental_vacuum")
+                self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._db.commit()
+
+    def replay_once(self, send_fn: Callable[[List[dict]], None], batch: int = 500) -> int:
+        # Sends one batch; returns rows sent (0 = empty). send_fn errors propagate.
+        entries = self.peek(batch)
+        if not entries:
+            return 0
+        send_fn([row for _, row in entries])
+        self._acked(entries)
+        return len(entries)
+
+    async def _replay_async(self, send_fn: SendFn, batch: int) -> int:
+        # replay_once for an async send_fn: only the SQLite work goes to a thread
+        entries = await asyncio.to_thread(self.peek, batch)
+        if not entries:
+            return 0
+        await send_fn([row for _, row in entries])
+        await asyncio.to_thread(self._acked, entries)
+        return len(entries)
+
+    def _acked(self, entries: List[tuple]) -> None:
+        self.ack([seq for seq, _ in entries])
+        self.replayed += len(entries)
+        self._recent.append((time.monotonic(), len(entries)))
+
+    async def run_replayer(
+        self,
+        send_fn: SendFn,
+        batch: int = 500,
+        interval: float = 0.5,
+        max_backoff: float = 30.0,
+    ) -> None:
+        # Background drain to the remote (off the event loop). Keeps sending while there
+        # is a backlog, waits `interval` when empty and backs off exponentially on errors.
+        # Returns after stop(), once the batch in flight (if any) is sent and acked.
+        send_is_async = inspect.iscoroutinefunction(send_fn)
+        self._wake = asyncio.Event()
+        while not self._stopping:
+            try:
+                if send_is_async:
+                    sent = await self._replay_async(send_fn, batch)
+                else:
+                    sent = await asyncio.to_thread(self.replay_once, send_fn, batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                self.consecutive_failures += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                delay = min(max_backoff, interval * 2 ** self.consecutive_failures)
+                if self.consecutive_failures == 1:
+                    logger.warning("outbox replay failed, backlog %d rows: %s", self._count, self.last_error)
+                await self._wait(delay)
+                continue
+
+            if self.consecutive_failures:
+                logger.info("outbox replay recovered after %d failures", self.consecutive_failures)
+                self.consecutive_failures = 0
+            if sent < batch:
+                await self._wait(interval)
+
+    async def _wait(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def stop(self) -> None:
+        # Await the run_replayer() task afterwards, then close()
+        self._stopping = True
+        if self._wake is not None:
+            self._wake.set()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        while self._recent and now - self._recent[0][0] > self.RATE_WINDOW:
+            self._recent.popleft()
+        with self._lock:
+            row = self._db.execute("SELECT enqueued_at FROM outbox ORDER BY seq LIMIT 1").fetchone()
+        oldest = row[0] if row else None
+        size = 0
+        for suffix in ("", "-wal"):
+            try:
+                size += os.path.getsize(self.path + suffix)
+            except OSError:
+                pass
+        return {
+            "path": self.path,
+            "backlog": self._count,
+            "max_rows": self.max_rows,
+            "oldest_seconds": round(time.time() - oldest, 3) if oldest is not None else None,
+            "disk_bytes": size,
+            "appended": self.appended,
+            "replayed": self.replayed,
+            "replay_rows_per_s": round(sum(n for _, n in self._recent) / self.RATE_WINDOW, 2),
+            "dropped": self.dropped,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+        }
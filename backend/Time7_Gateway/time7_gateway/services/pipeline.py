@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from itertools import count
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# A worker yields to the event loop after this many items so a burst in one stage
+# can't starve downstream stages or the HTTP handlers.
+YIELD_EVERY = 32
+
+
+class OverflowPolicy(str, Enum):
+    BLOCK = "block"              # producer waits until the stage has room (backpressure)
+    DROP_OLDEST = "drop_oldest"  # oldest queued item is discarded to make room
+    COALESCE = "coalesce"        # an item with the same key replaces the queued one; blocks when full
+
+
+@dataclass
+class StageConfig:
+    concurrency: int = 1
+    maxsize: int = 1024
+    policy: OverflowPolicy = OverflowPolicy.BLOCK
+
+
+def stage_config_from_env(name: str, default: StageConfig) -> StageConfig:
+    # e.g. INGEST_AUTH_CONCURRENCY=8, INGEST_AUTH_QUEUE=2048, INGEST_AUTH_POLICY=coalesce
+    prefix = f"INGEST_{name.upper()}_"
+    return StageConfig(
+        concurrency=int(os.getenv(prefix + "CONCURRENCY", default.concurrency)),
+        maxsize=int(os.getenv(prefix + "QUEUE", default.maxsize)),
+        policy=OverflowPolicy(os.getenv(prefix + "POLICY", default.policy.value)),
+    )
+
+
+class StageQueue:
+
+    # Bounded queue with an explicit overflow policy.
+    # Items are kept in an OrderedDict so COALESCE can replace a queued item in place.
+
+    def __init__(self, maxsize: int, policy: OverflowPolicy = OverflowPolicy.BLOCK) -> None:
+        self.maxsize = max(1, int(maxsize))
+        self.policy = OverflowPolicy(policy)
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._seq = count()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._unfinished = 0
+
+        self.dropped = 0
+        self.coalesced = 0
+        self.high_water = 0
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def full(self) -> bool:
+        return len(self._items) >= self.maxsize
+
+    async def put(self, item: Any, key: Optional[Hashable] = None) -> None:
+        if self.policy is OverflowPolicy.COALESCE and key is not None:
+            if key in self._items:
+                self._items[key] = item
+                self.coalesced += 1
+                return
+        else:
+            key = ("seq", next(self._seq))
+
+        while self.full():
+            if self.policy is OverflowPolicy.DROP_OLDEST:
+                self._items.popitem(last=False)
+                self.dropped += 1
+                self._task_done()
+                continue
+            self._not_full.clear()
+            await self._not_full.wait()
+            # another producer may have queued the same key while we waited
+            if self.policy is OverflowPolicy.COALESCE and key in self._items:
+                self._items[key] = item
+                self.coalesced += 1
+                return
+
+        self._items[key] = item
+        self._unfinished += 1
+        self._idle.clear()
+        if len(self._items) > self.high_water:
+            self.high_water = len(self._items)
+        self._not_empty.set()
+
+    async def get(self) -> Any:
+        while not self._items:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        _, item = self._items.popitem(last=False)
+        self._not_full.set()
+        return item
+
+    def task_done(self) -> None:
+        self._task_done()
+
+    def _task_done(self) -> None:
+        self._unfinished -= 1
+        if self._unfinished <= 0:
+            self._unfinished = 0
+            self._idle.set()
+
+    async def join(self) -> None:
+        await self._idle.wait()
+
+
+Handler = Callable[[Any], Awaitable[Optional[Any]]]
+
+
+class Stage:
+
+    # One pipeline step: `concurrency` workers pull from a bounded queue and run `handler`.
+    # A non-None return value is forwarded to the next stage.
+
+    def __init__(
+        self,
+        name: str,
+        handler: Handler,
+        config: Optional[StageConfig] = None,
+        key: Optional[Callable[[Any], Hashable]] = None,
+    ) -> None:
+        self.name = name
+        self.handler = handler
+        self.config = config or StageConfig()
+        self.key = key
+        self.queue = StageQueue(self.config.maxsize, self.config.policy)
+        self.next: Optional["Stage"] = None
+        self._workers: List[asyncio.Task] = []
+
+        self.processed = 0
+        self.errors = 0
+
+    async def put(self, item: Any) -> None:
+        await self.queue.put(item, self.key(item) if self.key else None)
+
+    def start(self) -> None:
+        for i in range(max(1, self.config.concurrency)):
+            self._workers.append(asyncio.create_task(self._worker(), name=f"{self.name}-{i}"))
+
+    async def stop(self) -> None:
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+    async def _worker(self) -> None:
+        handled = 0
+        while True:
+            handled += 1
+            if handled % YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+            item = await self.queue.get()
+            try:
+                out = await self.handler(item)
+                if out is not None and self.next is not None:
+                    await self.next.put(out)
+                self.processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.errors += 1
+                logger.exception("pipeline stage %s failed", self.name)
+            finally:
+                self.queue.task_done()
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.queue.qsize(),
+            "maxsize": self.queue.maxsize,
+            "high_water": self.queue.high_water,
+            "policy": self.queue.policy.value,
+            "concurrency": self.config.concurrency,
+            "processed": self.processed,
+            "errors": self.errors,
+            "dropped": self.queue.dropped,
+            "coalesced": self.queue.coalesced,
+        }
+
+
+class Pipeline:
+
+    def __init__(self, stages: List[Stage]) -> None:
+        if not stages:
+            raise ValueError("pipeline needs at least one stage")
+        self.stages = stages
+        self._by_name: Dict[str, Stage] = {s.name: s for s in stages}
+        for cur, nxt in zip(stages, stages[1:]):
+            cur.next = nxt
+        self.running = False
+
+    def stage(self, name: str) -> Stage:
+        return self._by_name[name]
+
+    async def put(self, item: Any, stage: Optional[str] = None) -> None:
+        target = self._by_name[stage] if stage else self.stages[0]
+        await target.put(item)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        for s in self.stages:
+            s.start()
+        self.running = True
+
+    async def drain(self) -> None:
+        # Stages only route forward, so joining in order leaves every queue empty.
+        while any(s.queue._unfinished for s in self.stages):
+            for s in self.stages:
+                await s.queue.join()
+
+    async def stop(self) -> None:
+        for s in self.stages:
+            await s.stop()
+        self.running = False
+
+    def stats(self) -> dict:
+        return {"running": self.running, "stages": {s.name: s.stats() for s in self.stages}}
@@ -0,0 +1,71 @@
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class ReadCoalescer:
+
+    # Remembers, per TID, what the last fully processed read looked like.
+    # A repeat read inside the window with the same epcHex/responseHex can skip the
+    # full ingestion path and only bump ActiveTags.last_seen.
+    # Anything that could change the outcome (new TID, different response, no fresh
+    # cache entry) is never coalesced.
+
+    def __init__(self, window_seconds: float = 1.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.window = float(window_seconds)
+        self._clock = clock
+        # tid -> [until (monotonic), epcHex, responseHex]
+        self._entries: Dict[str, List] = {}
+        self._since_prune = 0
+
+        # maintained by the ingestion decode stage
+        self.coalesced = 0
+        self.full = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def is_repeat(self, tidHex: str, epcHex: Optional[str], responseHex: Optional[str]) -> bool:
+        e = self._entries.get(tidHex)
+        if e is None:
+            return False
+        if e[1] != epcHex or e[2] != responseHex:
+            return False
+        return self._clock() < e[0]
+
+    def remember(
+        self,
+        tidHex: str,
+        epcHex: Optional[str],
+        responseHex: Optional[str],
+        valid_for: float,
+    ) -> None:
+        # Called once a read went through the full path or its IAS result was cached.
+        # valid_for: seconds the cached IAS result stays fresh (0 = nothing cached yet).
+        valid_for = float(valid_for)
+        if valid_for <= 0 or not self.enabled:
+            self._entries.pop(tidHex, None)
+            return
+
+        now = self._clock()
+        self._entries[tidHex] = [now + min(self.window, valid_for), epcHex, responseHex]
+
+        self._since_prune += 1
+        if self._since_prune >= 4096:
+            self.prune(now)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        now = self._clock() if now is None else now
+        stale = [tid for tid, e in self._entries.items() if e[0] <= now]
+        for tid in stale:
+            del self._entries[tid]
+        self._since_prune = 0
+        return len(stale)
+
+    def stats(self) -> dict:
+        return {
+            "window_seconds": self.window,
+            "tracked": len(self._entries),
+            "coalesced": self.coalesced,
+            "full": self.full,
+        }
@@ -0,0 +1,56 @@
+import threading
+from typing import Callable, Hashable, Optional, Tuple
+
+
+class ResponseCache:
+
+    # Serialized response body for one endpoint, keyed on a state version.
+    # Requests for a key that is already built get the same bytes back; a new key
+    # is built by exactly one caller (others wait on the lock and then reuse it),
+    # so the body is rebuilt at most once per state change however many clients poll.
+    # (key, body, etag) is one tuple replaced in a single store, so the lock-free
+    # fast path (threadpool requests) never pairs a new key / etag with an old body.
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entry: Tuple[Optional[Hashable], bytes, str] = (None, b"", "")
+        self.hits = 0
+        self.builds = 0
+
+    def get(self, key: Hashable, build: Callable[[], bytes]) -> Tuple[bytes, str]:
+        # returns (body, etag); the etag is derived from the key, not from the bytes
+        entry = self._entry
+        if entry[0] == key:
+            self.hits += 1
+            return entry[1], entry[2]
+
+        with self._lock:
+            entry = self._entry
+            if entry[0] != key:
+                entry = self._entry = (key, build(), etag_for(key))
+                self.builds += 1
+            else:
+                self.hits += 1
+            return entry[1], entry[2]
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "builds": self.builds, "etag": self._entry[2] or None}
+
+
+def etag_for(key) -> str:
+    parts = key if isinstance(key, tuple) else (key,)
+    return '"' + "-".join(str(p) for p in parts) + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):   # weak comparison is fine for GET revalidation
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
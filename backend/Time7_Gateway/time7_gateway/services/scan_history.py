@@ -0,0 +1,387 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Segment file: a sequence of blocks, each  <header><zlib payload>
+#   header = min_ms, max_ms (u64), records, payload bytes (u32)
+#   payload = one JSON array per line:
+#     [first_ms, last_ms, tidHex, antenna, peak_rssi_cdbm, reads, auth, info, epcHex]
+# Sidecar <segment>.idx (written when the segment is sealed, rebuilt from the block
+# headers if missing): block offsets / time ranges (sparse time index) + TID bloom.
+_BLOCK = struct.Struct("<QQII")
+SEGMENT_SUFFIX = ".t7h"
+INDEX_SUFFIX = ".idx"
+
+
+class BloomFilter:
+
+    # Per-segment TID filter: "definitely not here" or "maybe here"
+
+    def __init__(self, m_bits: int, k: int, bits: Optional[bytearray] = None) -> None:
+        self.m = m_bits
+        self.k = k
+        self.bits = bits if bits is not None else bytearray((m_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, n: int, fp_rate: float = 0.01) -> "BloomFilter":
+        # m = -n ln p / ln2^2, k = m/n ln2 (rounded)
+        n = max(1, n)
+        m = max(64, int(-n * math.log(fp_rate) / math.log(2) ** 2))
+        return cls(m, max(1, round(m / n * math.log(2))))
+
+    def _positions(self, key: str) -> Iterator[int]:
+        d = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(d[:8], "little")
+        h2 = int.from_bytes(d[8:], "little") | 1
+        for i in range(self.k):
+            yield (h1 + i * h2) % self.m
+
+    def add(self, key: str) -> None:
+        for p in self._positions(key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def to_dict(self) -> dict:
+        return {"m": self.m, "k": self.k, "bits": base64.b64encode(bytes(self.bits)).decode()}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "BloomFilter":
+        return cls(d["m"], d["k"], bytearray(base64.b64decode(d["bits"])))
+
+
+class Segment:
+
+    # One on-disk segment and its in-memory index
+
+    def __init__(self, path: str, bloom: BloomFilter) -> None:
+        self.path = path
+        self.bloom = bloom
+        self.blocks: List[Tuple[int, int, int, int]] = []   # (offset, min_ms, max_ms, records)
+        self.size = 0
+        self.sealed = False
+
+    @property
+    def min_ms(self) -> int:
+        return min(b[1] for b in self.blocks) if self.blocks else 0
+
+    @property
+    def max_ms(self) -> int:
+        return max(b[2] for b in self.blocks) if self.blocks else 0
+
+    @property
+    def records(self) -> int:
+        return sum(b[3] for b in self.blocks)
+
+    def write_index(self) -> None:
+        tmp = self.path + INDEX_SUFFIX + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"blocks": self.blocks, "size": self.size, "bloom": self.bloom.to_dict()}, f)
+        os.replace(tmp, self.path + INDEX_SUFFIX)
+
+    @classmethod
+    def open(cls, path: str, bloom_capacity: int) -> "Segment":
+        idx = path + INDEX_SUFFIX
+        if os.path.exists(idx):
+            with open(idx) as f:
+                d = json.load(f)
+            seg = cls(path, BloomFilter.from_dict(d["bloom"]))
+            seg.blocks = [tuple(b) for b in d["blocks"]]
+            seg.size = d["size"]
+            seg.sealed = True
+            return seg
+
+        # no index (crash before seal): rebuild from the block headers, drop a torn tail
+        seg = cls(path, BloomFilter.for_capacity(bloom_capacity))
+        with open(path, "rb") as f:
+            data = f.read()
+        offset = 0
+        while offset + _BLOCK.size <= len(data):
+            min_ms, max_ms, n, length = _BLOCK.unpack_from(data, offset)
+            end = offset + _BLOCK.size + length
+            if end > len(data):
+                break
+            for rec in _decode(data[offset + _BLOCK.size:end]):
+                seg.bloom.add(rec[2])
+            seg.blocks.append((offset, min_ms, max_ms, n))
+            offset = end
+        if offset != len(data):
+            with open(path, "r+b") as f:
+                f.truncate(offset)
+        seg.size = offset
+        return seg
+
+
+def _decode(payload: bytes) -> List[list]:
+    return [json.loads(line) for line in zlib.decompress(payload).split(b"\n") if line]
+
+
+class ScanHistory:
+
+    # Append-only read history on disk.
+    # record() runs in the ingestion path for every read (including repeats the
+    # coalescer drops) and only updates an in-memory window per (TID, antenna): first/
+    # last time, read count, peak RSSI. flush() seals windows older than window_ms,
+    # stamps them with the tag's current IAS result and appends them as one compressed
+    # block to the open segment (time index + TID bloom updated). A segment is sealed
+    # after segment_seconds and segments older than retention_seconds are deleted.
+    # query() skips segments by time range and bloom, and blocks by time range.
+
+    def __init__(
+        self,
+        directory: str,
+        window_seconds: float = 1.0,
+        segment_seconds: float = 3600.0,
+        retention_seconds: Optional[float] = 30 * 24 * 3600.0,
+        bloom_capacity: int = 50000,
+        auth_of: Optional[Callable[[str], Optional[Tuple[bool, Optional[str]]]]] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.window_ms = int(window_seconds * 1000)
+        self.segment_ms = int(segment_seconds * 1000)
+        self.retention_ms = int(retention_seconds * 1000) if retention_seconds else None
+        self.bloom_capacity = bloom_capacity
+        self.auth_of = auth_of
+        self._clock = clock
+
+        # (tid, antenna) -> [first_ms, last_ms, tid, antenna, rssi, reads, epc]
+        self._windows: Dict[Tuple[str, Optional[int]], list] = {}
+        self._lock = threading.Lock()       # segments list / open segment
+        self._write_lock = threading.Lock()  # one writer at a time
+        self._segments: List[Segment] = []
+        self._open: Optional[Segment] = None
+        self._open_started_ms = 0
+
+        self.reads = 0
+        self.records_written = 0
+        self.blocks_written = 0
+        self.bytes_written = 0
+        self.segments_deleted = 0
+
+        self._load()
+
+    @classmethod
+    def from_env(cls, auth_of=None) -> Optional["ScanHistory"]:
+        # HISTORY_DIR=/var/lib/time7/history enables it
+        directory = os.getenv("HISTORY_DIR")
+        if not directory:
+            return None
+        retention_hours = float(os.getenv("HISTORY_RETENTION_HOURS", "720"))
+        return cls(
+            directory,
+            window_seconds=float(os.getenv("HISTORY_WINDOW_SECONDS", "1")),
+            segment_seconds=float(os.getenv("HISTORY_SEGMENT_SECONDS", "3600")),
+            retention_seconds=retention_hours * 3600 if retention_hours > 0 else None,
+            auth_of=auth_of,
+        )
+
+    def _load(self) -> None:
+        names = sorted(n for n in os.listdir(self.directory) if n.endswith(SEGMENT_SUFFIX))
+        for name in names:
+            seg = Segment.open(os.path.join(self.directory, name), self.bloom_capacity)
+            if not seg.sealed:
+                # a segment left open by a crash: index it and start a new one
+                seg.sealed = True
+                seg.write_index()
+            self._segments.append(seg)
+
+    # --- ingestion ---
+
+    def record(self, tid: str, antenna: Optional[int] = None, rssi: Optional[int] = None,
+               epc: Optional[str] = None, ts: Optional[float] = None) -> None:
+        ms = int((ts if ts is not None else self._clock()) * 1000)
+        self.reads += 1
+        key = (tid, antenna)
+        w = self._windows.get(key)
+        if w is None:
+            self._windows[key] = [ms, ms, tid, antenna, rssi, 1, epc]
+            return
+        if ms > w[1]:
+            w[1] = ms
+        if rssi is not None and (w[4] is None or rssi > w[4]):
+            w[4] = rssi
+        w[5] += 1
+        if epc:
+            w[6] = epc
+
+    def _seal_windows(self, now_ms: Optional[int], all_: bool = False) -> List[list]:
+        out = []
+        for key, w in list(self._windows.items()):
+            if all_ or now_ms - w[0] >= self.window_ms:
+                del self._windows[key]
+                first, last, tid, antenna, rssi, reads, epc = w
+                result = self.auth_of(tid) if self.auth_of is not None else None
+                auth, info = result if result is not None else (None, None)
+                out.append([first, last, tid, antenna, rssi, reads, auth, info, epc])
+        out.sort(key=lambda r: r[0])
+        return out
+
+    def _append(self, records: List[list]) -> None:
+        if not records:
+            return
+        payload = zlib.compress(b"\n".join(json.dumps(r, separators=(",", ":")).encode() for r in records), 6)
+        min_ms = min(r[0] for r in records)
+        max_ms = max(r[1] for r in records)
+        header = _BLOCK.pack(min_ms, max_ms, len(records), len(payload))
+
+        with self._write_lock:
+            seg = self._open
+            if seg is None or min_ms - self._open_started_ms >= self.segment_ms:
+                self._rotate(min_ms)
+                seg = self._open
+            with open(seg.path, "ab") as f:
+                f.write(header)
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            for r in records:
+                seg.bloom.add(r[2])
+            with self._lock:
+                seg.blocks.append((seg.size, min_ms, max_ms, len(records)))
+                seg.size += len(header) + len(payload)
+
+        self.records_written += len(records)
+        self.blocks_written += 1
+        self.bytes_written += len(header) + len(payload)
+
+    def _rotate(self, start_ms: int) -> None:
+        if self._open is not None:
+            self._open.sealed = True
+            self._open.write_index()
+        path = os.path.join(self.directory, f"seg-{start_ms:013d}{SEGMENT_SUFFIX}")
+        while os.path.exists(path):   # never append to a sealed segment
+            start_ms += 1
+            path = os.path.join(self.directory, f"seg-{start_ms:013d}{SEGMENT_SUFFIX}")
+        seg = Segment(path, BloomFilter.for_capacity(self.bloom_capacity))
+        open(path, "ab").close()
+        with self._lock:
+            self._segments.append(seg)
+        self._open = seg
+        self._open_started_ms = start_ms
+
+    def flush(self, all_: bool = False) -> int:
+        # Seal due windows and write them in the calling thread (run_flusher splits the two)
+        records = self._seal_windows(int(self._clock() * 1000), all_=all_)
+        self._append(records)
+        return len(records)
+
+    def expire(self) -> int:
+        if self.retention_ms is None:
+            return 0
+        cutoff = int(self._clock() * 1000) - self.retention_ms
+        with self._lock:
+            old = [s for s in self._segments if s.sealed and s.blocks and s.max_ms < cutoff]
+            self._segments = [s for s in self._segments if s not in old]
+        for seg in old:
+            for path in (seg.path, seg.path + INDEX_SUFFIX):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        self.segments_deleted += len(old)
+        return len(old)
+
+    async def run_flusher(self, interval: float = 1.0, expire_every: int = 600) -> None:
+        # Window sealing happens on the loop (reads the cache); compression and file
+        # writes in a worker thread
+        n = 0
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                records = self._seal_windows(int(self._clock() * 1000))
+                await asyncio.to_thread(self._append, records)
+                n += 1
+                if n % expire_every == 0:
+                    await asyncio.to_thread(self.expire)
+            except OSError:
+                logger.exception("scan history write to %s failed", self.directory)
+
+    def close(self) -> None:
+        self.flush(all_=True)
+        with self._write_lock:
+            if self._open is not None:
+                self._open.sealed = True
+                self._open.write_index()
+                self._open = None
+
+    # --- queries ---
+
+    def query(self, start: float, end: float, tid: Optional[str] = None, limit: int = 10000) -> Tuple[List[dict], dict]:
+        # Reads whose window overlaps [start, end] (epoch seconds), oldest first.
+        # Returns (reads, scan stats).
+        start_ms, end_ms = int(start * 1000), int(end * 1000)
+        with self._lock:
+            segments = [(s, list(s.blocks)) for s in self._segments]
+
+        out: List[dict] = []
+        scan = {"segments": len(segments), "segments_read": 0, "segments_skipped": 0, "blocks_read": 0}
+        for seg, blocks in segments:
+            if not blocks or min(b[1] for b in blocks) > end_ms or max(b[2] for b in blocks) < start_ms:
+                scan["segments_skipped"] += 1
+                continue
+            if tid is not None and tid not in seg.bloom:
+                scan["segments_skipped"] += 1
+                continue
+            scan["segments_read"] += 1
+            with open(seg.path, "rb") as f:
+                for offset, min_ms, max_ms, _ in blocks:
+                    if min_ms > end_ms or max_ms < start_ms:
+                        continue
+                    f.seek(offset)
+                    _, _, _, length = _BLOCK.unpack(f.read(_BLOCK.size))
+                    scan["blocks_read"] += 1
+                    for r in _decode(f.read(length)):
+                        if r[0] > end_ms or r[1] < start_ms or (tid is not None and r[2] != tid):
+                            continue
+                        out.append(_read_dict(r))
+                        if len(out) >= limit:
+                            out.sort(key=lambda x: x["first_ms"])
+                            scan["truncated"] = True
+                            return out, scan
+        out.sort(key=lambda x: x["first_ms"])
+        return out, scan
+
+    def stats(self) -> dict:
+        with self._lock:
+            segments = list(self._segments)
+        return {
+            "directory": self.directory,
+            "segments": len(segments),
+            "disk_bytes": sum(s.size for s in segments),
+            "records": sum(s.records for s in segments),
+            "open_windows": len(self._windows),
+            "reads": self.reads,
+            "records_written": self.records_written,
+            "blocks_written": self.blocks_written,
+            "bytes_written": self.bytes_written,
+            "segments_deleted": self.segments_deleted,
+        }
+
+
+def _read_dict(r: list) -> dict:
+    first, last, tid, antenna, rssi, reads, auth, info, epc = r
+    return {
+        "first_ms": first,
+        "last_ms": last,
+        "tidHex": tid,
+        "epcHex": epc,
+        "antenna": antenna,
+        "peakRssiCdbm": rssi,
+        "reads": reads,
+        "auth": auth,
+        "info": info,
+    }
@@ -0,0 +1,34 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+R = TypeVar("R")
+
+
+class SingleFlight(Generic[R]):
+
+    # In-flight registry: concurrent calls with the same key share one execution.
+    # The work runs in its own task, so a cancelled caller doesn't cancel it for
+    # the others; its result (or exception) is handed to every waiter.
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+        self.calls = 0   # executions actually started
+        self.shared = 0  # calls answered by an execution already in flight (work saved)
+
+    def inflight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[R]]) -> R:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.shared += 1
+        else:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "saved": self.shared, "inflight": len(self._inflight)}
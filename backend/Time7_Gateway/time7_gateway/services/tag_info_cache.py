@@ -1,54 +1,203 @@
+import asyncio
+import sys
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
-from typing import Dict, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
+
+# rough per-entry overhead (TagInfo object + two dict slots) used for the byte limit
+_ENTRY_OVERHEAD = 200
 
 
 @dataclass
 class TagInfo:
     auth: bool
     info: Optional[str]
-    fetched_at: datetime
+    fetched_at: datetime   # wall clock, kept for display / persistence
+    expires: float = 0.0   # monotonic deadline used for TTL checks
+    size: int = 0
+
+
+def _entry_size(tid_hex: str, info: Optional[str]) -> int:
+    return _ENTRY_OVERHEAD + sys.getsizeof(tid_hex) + (sys.getsizeof(info) if info is not None else 0)
 
 
 class TagInfoCache:
 
 
     #caches IAS results. Avoid repeating checking with IAS
+    # Bounded by max_entries / max_bytes (least recently used entries are evicted first);
+    # TTL is checked against a monotonic clock. Expired entries are dropped when touched
+    # and by sweep(), which walks entries in expiry order a few at a time.
+
+    def __init__(
+        self,
+        cache_ttl_hours: float = 24,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.cache_ttl = timedelta(hours=float(cache_ttl_hours))
+        self._ttl_seconds = self.cache_ttl.total_seconds()
+        self.max_entries = int(max_entries) if max_entries else None
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self._clock = clock
+
+        self._cache: "OrderedDict[str, TagInfo]" = OrderedDict()   # LRU order
+        self._expiry: "OrderedDict[str, float]" = OrderedDict()    # set order == expiry order
+        self._bytes = 0
+        self._lock = threading.Lock()  # dashboard handlers read from the threadpool
+        # optional hook (tid, auth, info, fetched_at) -> None, e.g. TagInfoStore.record
+        self.on_set: Optional[Callable[[str, bool, Optional[str], datetime], None]] = None
+        # optional hook (tid) -> None for entries that expire or are evicted, called
+        # outside the lock, e.g. ActiveTags.mark_updated
+        self.on_drop: Optional[Callable[[str], None]] = None
+
+        # bumped whenever a cached result appears, changes or goes away
+        self.version = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
 
-    def __init__(self, cache_ttl_hours: int = 24):
-        self.cache_ttl = timedelta(hours=int(cache_ttl_hours))
-        self._cache: Dict[str, TagInfo] = {}
+    def __len__(self) -> int:
+        return len(self._cache)
 
     def get(self, tid_hex: str) -> Optional[Tuple[bool, Optional[str]]]:
+        with self._lock:
+            cur = self._cache.get(tid_hex)
+            if cur is None:
+                self.misses += 1
+                return None
+
+            if self._clock() < cur.expires:
+                self._cache.move_to_end(tid_hex)
+                self.hits += 1
+                return (cur.auth, cur.info)
+
+            self._drop(tid_hex)
+            self.expirations += 1
+            self.misses += 1
+        self._dropped([tid_hex])
+        return None
+
+    def peek(self, tid_hex: str) -> Optional[Tuple[bool, Optional[str]]]:
+        # get() without hit/miss counting, LRU touch or expiry side effects
         cur = self._cache.get(tid_hex)
-        if cur is None:
+        if cur is None or self._clock() >= cur.expires:
             return None
+        return (cur.auth, cur.info)
 
-        now = datetime.now(timezone.utc)
-        if now - cur.fetched_at > self.cache_ttl:
-            del self._cache[tid_hex]
-            return None
+    def remaining_ttl(self, tid_hex: str) -> float:
+        # seconds until the cached result expires (0.0 if missing or expired)
+        cur = self._cache.get(tid_hex)
+        if cur is None:
+            return 0.0
+        return max(0.0, cur.expires - self._clock())
 
-        return (cur.auth, cur.info)
+    def set(self, tid_hex: str, auth: bool, info: Optional[str], fetched_at: Optional[datetime] = None) -> bool:
+        # fetched_at lets a restored entry keep its original age (and so its TTL)
+        # Returns True if the (auth, info) result is new or differs from the cached one.
+        now_wall = datetime.now(timezone.utc)
+        if fetched_at is None:
+            fetched_at = now_wall
+        expires = self._clock() + self._ttl_seconds - (now_wall - fetched_at).total_seconds()
 
-    def set(self, tid_hex: str, auth: bool, info: Optional[str]) -> None:
-        self._cache[tid_hex] = TagInfo(
+        entry = TagInfo(
             auth=auth,
             info=info,
-            fetched_at=datetime.now(timezone.utc),
+            fetched_at=fetched_at,
+            expires=expires,
+            size=_entry_size(tid_hex, info),
         )
-        
+        with self._lock:
+            old = self._cache.get(tid_hex)
+            changed = old is None or old.auth != auth or old.info != info
+            if old is not None:
+                self._remove(tid_hex)
+            if changed:
+                self.version += 1
+            self._cache[tid_hex] = entry
+            self._expiry[tid_hex] = expires
+            self._bytes += entry.size
+            evicted = self._evict()
+
+        self._dropped(evicted)
+        if self.on_set is not None:
+            self.on_set(tid_hex, auth, info, fetched_at)
+        return changed
+
+    def _remove(self, tid_hex: str) -> None:
+        old = self._cache.pop(tid_hex)
+        self._expiry.pop(tid_hex, None)
+        self._bytes -= old.size
+
+    def _drop(self, tid_hex: str) -> None:
+        # entry leaves the cache (expired / evicted)
+        self._remove(tid_hex)
+        self.version += 1
+
+    def _evict(self) -> List[str]:
+        evicted = []
+        while self._cache and (
+            (self.max_entries is not None and len(self._cache) > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            tid_hex = next(iter(self._cache))
+            self._drop(tid_hex)
+            self.evictions += 1
+            evicted.append(tid_hex)
+        return evicted
+
+    def _dropped(self, tids: List[str]) -> None:
+        if self.on_drop is not None:
+            for tid_hex in tids:
+                self.on_drop(tid_hex)
+
+    def sweep(self, budget: int = 1024) -> int:
+        # Drop up to `budget` expired entries, oldest deadline first.
+        now = self._clock()
+        expired = []
+        with self._lock:
+            while len(expired) < budget and self._expiry:
+                tid_hex, expires = next(iter(self._expiry.items()))
+                if expires > now:
+                    break
+                self._drop(tid_hex)
+                expired.append(tid_hex)
+            self.expirations += len(expired)
+        self._dropped(expired)
+        return len(expired)
+
+    async def run_sweeper(self, interval: float = 1.0, budget: int = 1024) -> None:
+        # Background task: small bounded sweeps so the loop is never held for long
+        while True:
+            removed = self.sweep(budget)
+            await asyncio.sleep(0 if removed >= budget else interval)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._cache),
+            "version": self.version,
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
     # for debugging
     def snapshot(self) -> dict:
-        items = []
-        for tid_hex, value in self._cache.items():
-            if isinstance(value, (tuple, list)) and len(value) >= 2:
-                auth, info = value[0], value[1]
-            else:
-                auth = getattr(value, "auth", None)
-                info = getattr(value, "info", None)
-
-            items.append({"id": tid_hex, "auth": auth, "info": info})
+        with self._lock:
+            items = [
+                {"id": tid_hex, "auth": value.auth, "info": value.info}
+                for tid_hex, value in self._cache.items()
+            ]
 
         items.sort(key=lambda x: x.get("id") or "")
-        return {"count": len(items), "items": items}
\ No newline at end of file
+        return {"count": len(items), "items": items}
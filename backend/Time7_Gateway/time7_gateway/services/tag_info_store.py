@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from time7_gateway.services.tag_info_cache import TagInfoCache
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tag_info (
+    tid_hex    TEXT PRIMARY KEY,
+    auth       INTEGER NOT NULL,
+    info       TEXT,
+    fetched_at REAL NOT NULL
+)
+"""
+
+
+class TagInfoStore:
+
+    # On-disk copy of TagInfoCache (SQLite) so a restart doesn't send every tag in
+    # the field back to IAS.
+    # cache.set() records into an in-memory pending dict (latest result per TID);
+    # flush() writes that batch in one transaction and compact() drops rows older
+    # than the TTL. Results keep their original fetched_at, so TTL survives restarts.
+
+    def __init__(self, path: str, ttl_seconds: float = 24 * 3600) -> None:
+        self.path = path
+        self.ttl_seconds = float(ttl_seconds)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_SCHEMA)
+        self._db.commit()
+        self._db_lock = threading.Lock()
+
+        self._pending: Dict[str, Tuple[int, Optional[str], float]] = {}
+        self._pending_lock = threading.Lock()
+
+        self.loaded = 0
+        self.flushed = 0
+        self.compacted = 0
+
+    @classmethod
+    def from_env(cls, ttl_seconds: float) -> Optional["TagInfoStore"]:
+        # TAG_CACHE_DB=/var/lib/time7/tag_cache.sqlite enables it; unset = memory only
+        path = os.getenv("TAG_CACHE_DB")
+        return cls(path, ttl_seconds=ttl_seconds) if path else None
+
+    def record(self, tid_hex: str, auth: bool, info: Optional[str], fetched_at: datetime) -> None:
+        with self._pending_lock:
+            self._pending[tid_hex] = (1 if auth else 0, info, fetched_at.timestamp())
+
+    def attach(self, cache: TagInfoCache) -> None:
+        cache.on_set = self.record
+
+    def load(self, cache: TagInfoCache) -> int:
+        # Bulk warm start. Oldest first so the cache's expiry order stays sorted.
+        cutoff = datetime.now(timezone.utc).timestamp() - self.ttl_seconds
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT tid_hex, auth, info, fetched_at FROM tag_info WHERE fetched_at > ? ORDER BY fetched_at",
+                (cutoff,),
+            ).fetchall()
+
+        on_set, cache.on_set = cache.on_set, None   # don't write loaded rows straight back
+        try:
+            for tid_hex, auth, info, fetched_at in rows:
+                cache.set(tid_hex, bool(auth), info, fetched_at=datetime.fromtimestamp(fetched_at, timezone.utc))
+        finally:
+            cache.on_set = on_set
+
+        self.loaded = len(rows)
+        return len(rows)
+
+    def flush(self) -> int:
+        with self._pending_lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+
+        try:
+            with self._db_lock:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO tag_info (tid_hex, auth, info, fetched_at) VALUES (?, ?, ?, ?)",
+                    [(tid, auth, info, ts) for tid, (auth, info, ts) in batch.items()],
+                )
+                self._db.commit()
+        except sqlite3.Error:
+            # keep the batch for the next flush unless a newer result replaced it
+            with self._pending_lock:
+                for tid, row in batch.items():
+                    self._pending.setdefault(tid, row)
+            raise
+        self.flushed += len(batch)
+        return len(batch)
+
+    def compact(self) -> int:
+        cutoff = datetime.now(timezone.utc).timestamp() - self.ttl_seconds
+        with self._db_lock:
+            cur = self._db.execute("DELETE FROM tag_info WHERE fetched_at <= ?", (cutoff,))
+            self._db.commit()
+            if cur.rowcount:
+                self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.compacted += cur.rowcount
+        return cur.rowcount
+
+    async def run_flusher(self, interval: float = 5.0, compact_every: int = 720) -> None:
+        # Periodic background flush (off the event loop); compacts every `compact_every` flushes
+        n = 0
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.flush)
+                n += 1
+                if n % compact_every == 0:
+                    await asyncio.to_thread(self.compact)
+            except sqlite3.Error:
+                logger.exception("tag cache flush to %s failed", self.path)
+
+    def close(self) -> None:
+        self.flush()
+        with self._db_lock:
+            self._db.close()
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "pending": len(self._pending),
+            "loaded": self.loaded,
+            "flushed": self.flushed,
+            "compacted": self.compacted,
+        }
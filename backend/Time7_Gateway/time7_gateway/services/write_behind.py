@@ -0,0 +1,188 @@
+import asyncio
+import inspect
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehind:
+
+    # Write-behind buffer for database rows.
+    # add() only stores the row (last write per key wins) and returns; one flusher
+    # task hands batches of up to max_batch rows to flush_fn (a plain function runs in
+    # a worker thread, an async one is awaited) once a batch is full or the oldest
+    # pending row is max_age seconds old. A failed batch is put back (rows written
+    # again in the meantime stay newer) and retried after retry_seconds. close()
+    # stops the flusher and writes what is left.
+
+    def __init__(
+        self,
+        flush_fn: Callable[[List[dict]], Union[None, Awaitable[None]]],
+        key: str = "tid_hex",
+        max_batch: int = 500,
+        max_age: float = 0.5,
+        retry_seconds: float = 2.0,
+    ) -> None:
+        self.flush_fn = flush_fn
+        self._flush_is_async = inspect.iscoroutinefunction(flush_fn)
+        self.key = key
+        self.max_batch = max(1, int(max_batch))
+        self.max_age = float(max_age)
+        self.retry_seconds = float(retry_seconds)
+
+        self._pending: Dict[str, dict] = {}
+        self._oldest: Optional[float] = None   # monotonic time of the oldest pending row
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._closed = False
+
+        self.added = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.rows_written = 0
+        self.errors = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+        self.last_flush_seconds: Optional[float] = None
+        self.max_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+
+    @classmethod
+    def from_env(cls, flush_fn: Callable[[List[dict]], Union[None, Awaitable[None]]]) -> "WriteBehind":
+        return cls(
+            flush_fn,
+            max_batch=int(os.getenv("DB_BATCH_MAX_ROWS", "500")),
+            max_age=float(os.getenv("DB_BATCH_MAX_AGE", "0.5")),
+            retry_seconds=float(os.getenv("DB_BATCH_RETRY_SECONDS", "2")),
+        )
+
+    def add(self, row: dict) -> None:
+        # Called from the event loop; starts the flusher on first use
+        if self._closed:
+            raise RuntimeError("write-behind buffer is closed")
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="write-behind")
+
+        k = row[self.key]
+        if k in self._pending:
+            self.coalesced += 1
+        elif not self._pending:
+            # the flusher may be idle with no deadline: have it arm max_age for this row
+            self._oldest = time.monotonic()
+            self._wake.set()
+        self._pending[k] = row
+        self.added += 1
+        if len(self._pending) >= self.max_batch:
+            self._wake.set()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def _run(self) -> None:
+        # Exits once close() sets _closed and wakes it, after any batch in flight
+        while not self._closed:
+            if self._pending:
+                timeout = max(0.0, self._oldest + self.max_age - time.monotonic())
+            else:
+                timeout = None
+            await self._wait(timeout)
+            if self._closed:
+                break
+
+            if not self._pending:
+                continue
+            aged = time.monotonic() - self._oldest >= self.max_age
+            if len(self._pending) < self.max_batch and not aged:
+                continue
+            if not await self.flush(full_only=not aged):
+                await self._wait(self.retry_seconds)
+
+    async def _wait(self, timeout: Optional[float]) -> None:
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    async def flush(self, full_only: bool = False) -> bool:
+        # Writes what is pending in batches of at most max_batch rows (only full
+        # batches with full_only; the rest waits for max_age).
+        # Returns False if a batch failed (its rows are pending again).
+        if self._flush_lock is None:
+            return True
+        async with self._flush_lock:
+            while self._pending and (not full_only or len(self._pending) >= self.max_batch):
+                rows = list(self._pending.values())[:self.max_batch]
+                for row in rows:
+                    del self._pending[row[self.key]]
+                oldest = self._oldest
+                if not self._pending:
+                    self._oldest = None   # else keep it: the rest are no older than that
+
+                t = time.perf_counter()
+                try:
+                    if self._flush_is_async:
+                        await self.flush_fn(rows)
+                    else:
+                        await asyncio.to_thread(self.flush_fn, rows)
+                except asyncio.CancelledError:
+                    # cancelled mid-write: the rows may not be stored, keep them
+                    self._requeue(rows, oldest)
+                    raise
+                except Exception:
+                    self.errors += 1
+                    logger.exception("write-behind flush of %d rows failed", len(rows))
+                    self._requeue(rows, oldest)
+                    return False
+
+                elapsed = time.perf_counter() - t
+                self.batches += 1
+                self.rows_written += len(rows)
+                self.last_batch_size = len(rows)
+                self.max_batch_size = max(self.max_batch_size, len(rows))
+                self.last_flush_seconds = elapsed
+                self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+                self.total_flush_seconds += elapsed
+        return True
+
+    def _requeue(self, rows: List[dict], oldest: Optional[float]) -> None:
+        # put a batch back in front; rows added since are newer and win
+        newer = self._pending
+        self._pending = {row[self.key]: row for row in rows}
+        self._pending.update(newer)
+        self._oldest = oldest
+
+    async def close(self) -> None:
+        # Lets a batch already being written finish (cancelling it would leave a
+        # sync flush_fn running unobserved in its thread), then writes the rest
+        self._closed = True
+        if self._task is not None:
+            self._wake.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if not await self.flush():
+            logger.error("write-behind closed with %d unwritten rows", len(self._pending))
+
+    def stats(self) -> dict:
+        return {
+            "backlog": len(self._pending),
+            "oldest_pending_seconds": round(time.monotonic() - self._oldest, 3) if self._pending else 0.0,
+            "max_batch": self.max_batch,
+            "max_age": self.max_age,
+            "added": self.added,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "rows_written": self.rows_written,
+            "errors": self.errors,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_size,
+            "avg_batch_size": round(self.rows_written / self.batches, 1) if self.batches else 0.0,
+            "last_flush_ms": round(self.last_flush_seconds * 1000, 2) if self.last_flush_seconds is not None else None,
+            "max_flush_ms": round(self.max_flush_seconds * 1000, 2),
+            "avg_flush_ms": round(self.total_flush_seconds / self.batches * 1000, 2) if self.batches else None,
+        }
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import mmap
+import re
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import AsyncIterator, Optional, Union
+
+_TIMESTAMP = re.compile(rb'"timestamp": ?"(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(\.\d+)?Z?"')
+
+# as-fast-as-possible replay writes about this much per chunk
+MAX_CHUNK_BYTES = 256 * 1024
+
+
+def parse_timestamp(text: Union[str, bytes]) -> Optional[float]:
+    # reader timestamps carry nanoseconds, which datetime.fromisoformat does not take
+    if isinstance(text, str):
+        text = f'"timestamp":"{text}"'.encode()
+    m = _TIMESTAMP.search(text)
+    if m is None:
+        return None
+    whole = datetime.fromisoformat(m.group(1).decode()).replace(tzinfo=timezone.utc).timestamp()
+    return whole + (float(m.group(2)) if m.group(2) else 0.0)
+
+
+class CaptureIndex:
+
+    # A capture file mapped into memory with a line-offset index built once.
+    # offsets[i] is where line i starts (offsets[-1] is the end of the file) and
+    # times[i] its reader timestamp in seconds since the first line; lines without one
+    # inherit the previous line's time, and times never go backwards, so a range of
+    # capture time is a bisect and its lines one contiguous slice of the map.
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._file = self.path.open("rb")
+        size = self.path.stat().st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+        self.offsets = array("q")
+        self.times = array("d")
+        self.start: Optional[float] = None   # epoch seconds of the first timestamp
+        self._build()
+        self._needs_newline = size > 0 and self._map[size - 1:size] != b"\n"
+
+    def _build(self) -> None:
+        mm, pos, size = self._map, 0, len(self._map)
+        last = 0.0
+        while pos < size:
+            end = mm.find(b"\n", pos)
+            end = size if end < 0 else end + 1
+            ts = parse_timestamp(mm[pos:min(end, pos + 128)])
+            if ts is not None:
+                if self.start is None:
+                    self.start = ts
+                last = max(last, ts - self.start)
+            self.offsets.append(pos)
+            self.times.append(last)
+            pos = end
+        self.offsets.append(size)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def duration(self) -> float:
+        return self.times[-1] if self.times else 0.0
+
+    def position(self, seconds: float) -> int:
+        # first line at or after `seconds` into the capture
+        return bisect_left(self.times, seconds)
+
+    def seek_seconds(self, value: Union[str, float, None]) -> float:
+        # seconds into the capture, from an offset ("12.5") or a reader timestamp
+        if value is None or value == "":
+            return 0.0
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        ts = parse_timestamp(str(value))
+        if ts is None:
+            raise ValueError(f"seek wants seconds or an ISO timestamp, got {value!r}")
+        return max(0.0, ts - (self.start or ts))
+
+    def lines_until(self, pos: int, seconds: float) -> int:
+        # end (exclusive) of the lines from `pos` whose time is <= seconds
+        return bisect_right(self.times, seconds, lo=pos)
+
+    def lines_within(self, pos: int, nbytes: int) -> int:
+        # end (exclusive) of about nbytes of lines from `pos`, at least one line
+        if pos >= len(self):
+            return pos
+        return max(pos + 1, min(len(self), bisect_left(self.offsets, self.offsets[pos] + nbytes, lo=pos)))
+
+    def slice(self, start: int, end: int) -> bytes:
+        data = self._map[self.offsets[start]:self.offsets[end]]
+        if self._needs_newline and end == len(self):
+            data += b"\n"
+        return data
+
+    def close(self) -> None:
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+
+@lru_cache(maxsize=16)
+def capture_index(path: Path) -> CaptureIndex:
+    return CaptureIndex(path)
+
+
+async def replay_stream(
+    index: CaptureIndex,
+    speed: float = 1.0,
+    loop: bool = False,
+    seek: float = 0.0,
+    chunk_ms: float = 50.0,
+) -> AsyncIterator[bytes]:
+
+    # Lines go out when their recorded time comes due at `speed` x real time (speed <= 0:
+    # as fast as possible), everything due since the last write in one chunk, so bursts
+    # in the capture stay bursts on the wire. A loop starts over from the top of the file,
+    # no sooner than one chunk_ms tick after the previous pass started.
+    if not len(index):
+        return
+    interval = max(0.001, chunk_ms / 1000.0)
+    pos = index.position(seek)
+    origin = index.times[pos] if pos < len(index) else 0.0
+    t0 = time.monotonic()
+
+    while True:
+        if pos >= len(index):
+            if not loop:
+                return
+            if speed > 0:
+                # a pass takes at least one tick: a single-line (zero duration) capture
+                # must not restart in a tight loop that starves the event loop
+                period = max((index.times[-1] - origin) / speed, interval)
+                await asyncio.sleep(max(0.0, t0 + period - time.monotonic()))
+            pos, origin, t0 = 0, 0.0, time.monotonic()
+
+        if speed <= 0:
+            end = index.lines_within(pos, MAX_CHUNK_BYTES)
+            yield index.slice(pos, end)
+            pos = end
+            # still give the server a chance to notice a client disconnect
+            await asyncio.sleep(0)
+            continue
+
+        end = index.lines_until(pos, origin + (time.monotonic() - t0) * speed)
+        if end > pos:
+            yield index.slice(pos, end)
+            pos = end
+        if pos < len(index):
+            # wake on a fixed tick grid: the first tick after the next line is due, so quiet
+            # stretches are slept through and a burst is not cut at the wakeup
+            elapsed = time.monotonic() - t0
+            due = max(elapsed, (index.times[pos] - origin) / speed)
+            await asyncio.sleep(math.floor(due / interval + 1) * interval - elapsed)
@@ -1,4 +1,7 @@
-from typing import Dict, Tuple
+import asyncio
+import os
+from typing import Dict, List, Tuple
+from time7_gateway.clients.ias_services import MicroBatcher
 from time7_gateway.models.schemas import AuthPayload
 from time7_gateway.utilities.simulate_encryption import generate_response
 
@@ -19,3 +22,57 @@ def mock_ias_lookup(auth_payload: AuthPayload) -> Tuple[bool, str]:
     else:
         return False, "Authentication Failed"
     
+
+
+async def mock_ias_lookup_batch(auth_payloads: List[AuthPayload], latency: float = 0.0) -> List[Tuple[bool, str]]:
+    # Async batch equivalent of mock_ias_lookup: one simulated round-trip per batch
+    if latency > 0:
+        await asyncio.sleep(latency)
+    return [mock_ias_lookup(p) for p in auth_payloads]
+
+
+class MockIASClient:
+
+    # Same interface as clients.ias_services.IASClient, answering locally with a
+    # configurable round-trip latency so the whole ingestion path can be load tested.
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        max_concurrency: int = 8,
+        batch_size: int = 32,
+        batch_delay: float = 0.01,
+    ) -> None:
+        self.latency = float(latency)
+        self._sem = asyncio.Semaphore(max(1, int(max_concurrency)))
+        self._batcher = MicroBatcher(self.lookup_batch, max_batch=batch_size, max_delay=batch_delay) if batch_size > 1 else None
+        self.requests = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> "MockIASClient":
+        return cls(
+            latency=float(os.getenv("IAS_MOCK_LATENCY_MS", "0")) / 1000.0,
+            max_concurrency=int(os.getenv("IAS_MAX_CONCURRENCY", "8")),
+            batch_size=int(os.getenv("IAS_BATCH_SIZE", "32")),
+            batch_delay=float(os.getenv("IAS_BATCH_DELAY_MS", "10")) / 1000.0,
+        )
+
+    async def lookup(self, auth_payload: AuthPayload) -> Tuple[bool, str]:
+        if self._batcher is not None:
+            return await self._batcher.submit(auth_payload)
+        return (await self.lookup_batch([auth_payload]))[0]
+
+    async def lookup_batch(self, auth_payloads: List[AuthPayload]) -> List[Tuple[bool, str]]:
+        async with self._sem:
+            self.requests += 1
+            return await mock_ias_lookup_batch(auth_payloads, latency=self.latency)
+
+    async def aclose(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        stats = {"requests": self.requests, "errors": self.errors, "latency_ms": self.latency * 1000.0}
+        if self._batcher is not None:
+            stats["batching"] = self._batcher.stats()
+        return stats
@@ -1,16 +1,19 @@
 
+import asyncio
+import inspect
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, Body, HTTPException, Request
 
-from time7_gateway.services.database import upsert_latest_tag
+from time7_gateway.models.schemas import AuthPayload
+from time7_gateway.services.database import tag_row, upsert_latest_tag
 
 router = APIRouter()
 
 
 @router.post("/reader/events")
-def reader_events(request: Request, payload: Any = Body(...)):
+async def reader_events(request: Request, payload: Any = Body(...)):
     active_tags = request.app.state.active_tags
     cache = request.app.state.tag_info_cache
 
@@ -24,18 +27,29 @@ def reader_events(request: Request, payload: Any = Body(...)):
     if isinstance(payload, dict) and "tagIds" in payload:
         now = datetime.now(timezone.utc)
 
-        tidHex = payload.get("tidHex") or []
-        tags_seen = len(tidHex)
+        tags = _auth_payloads(payload.get("tidHex") or [])
+        tags_seen = len(tags)
 
-        active_tags.sync_seen(tidHex, seen_at=now)
+        active_tags.sync_seen(tags.keys(), seen_at=now)
 
-        for tidHex in tidHex:
-            tidHex = str(tidHex)
+        for tidHex, auth_payload in tags.items():
             if cache.get(tidHex) is None:
-                auth, info = ias_lookup(tidHex)
-                cache.set(tidHex, auth, info)
-                product_info_fetched += 1
-                upsert_latest_tag(tidHex=tidHex, seen_at=now, auth=auth, info=info)
+                if auth_payload is None:
+                    # no challenge/response to verify, same as an empty responseHex from the reader
+                    auth, info = False, "Unsupported Tag"
+                else:
+                    result = ias_lookup(auth_payload)
+                    if inspect.isawaitable(result):
+                        result = await result
+                    auth, info = result
+                    product_info_fetched += 1
+                if cache.set(tidHex, auth, info):
+                    active_tags.mark_updated(tidHex)
+                writer = getattr(request.app.state, "db_writer", None)
+                if writer is not None:
+                    writer.add(tag_row(tidHex, now, auth, info, None))
+                else:
+                    await asyncio.to_thread(upsert_latest_tag, tidHex=tidHex, seen_at=now, auth=auth, info=info, epcHex=None)
 
         return {
             "ok": True,
@@ -43,4 +57,25 @@ def reader_events(request: Request, payload: Any = Body(...)):
             "product_info_fetched": product_info_fetched,
         }
 
-    raise HTTPException(status_code=400, detail="Invalid payload.") 
\ No newline at end of file
+    raise HTTPException(status_code=400, detail="Invalid payload.") 
+
+
+def _auth_payloads(tags) -> Dict[str, Optional[AuthPayload]]:
+    # Entries are a bare tidHex, or {"tidHex", "messageHex", "responseHex"} like a
+    # reader's tagAuthenticationResponse. Only the latter can be sent to IAS.
+    out: Dict[str, Optional[AuthPayload]] = {}
+    for tag in tags:
+        if isinstance(tag, dict):
+            tidHex = str(tag.get("tidHex") or "")
+            auth_payload = None
+            if tag.get("responseHex"):
+                auth_payload = AuthPayload(
+                    messageHex=str(tag.get("messageHex") or ""),
+                    responseHex=str(tag["responseHex"]),
+                    tidHex=tidHex,
+                )
+        else:
+            tidHex, auth_payload = str(tag), None
+        if tidHex:
+            out[tidHex] = auth_payload
+    return out
@@ -1,48 +1,120 @@
 from __future__ import annotations
 
 import asyncio
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import AsyncIterator
+from typing import AsyncIterator, Optional, Tuple
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import StreamingResponse
 
+from time7_gateway.simulators.capture_replay import capture_index, replay_stream
+from time7_gateway.simulators.tag_generator import GeneratorConfig, SyntheticReader, parse_mix
+
 router = APIRouter()
 
-# ----- SWITCH SIMULATOR DATA-STREAM -----
+SIM_DIR = Path(__file__).parent
+
+# ----- SIMULATOR DATA-STREAM (?source=file|replay&file=...) -----
 # datastream1 = tagAuthenticationResponse DISABLED
 # datasteam2 = tagAuthenticationResponse ENABLED but INCOMPATIBLE
 # datastream3 = tagAuthenticationResponse ENABLED & COMPATIBLE with INCORRECT RESPONSE
 # datastream4 = tagAuthenticationResponse ENABLED & COMPATIBLE with CORRECT RESPONSE
-DATA_FILE = Path(__file__).with_name("datastream5.ndjson")# use "datastream1", "datastream2", "datastream3", or "datastream4"
+DATA_FILE = SIM_DIR / "datastream5.ndjson"
 
+# unthrottled streams send this many lines per write
+UNTHROTTLED_CHUNK = 256
 
-async def ndjson_line_stream(loop: bool = True, rate_hz: float = 20.0) -> AsyncIterator[bytes]:
 
-    delay = 0.0 if rate_hz <= 0 else 1.0 / rate_hz
+def scenario_path(name: str) -> Path:
+    # only .ndjson captures that sit next to this module
+    path = SIM_DIR / name
+    if Path(name).name != name or path.suffix != ".ndjson" or not path.is_file():
+        raise HTTPException(status_code=404, detail=f"unknown scenario file {name!r}")
+    return path
 
-    while True:
 
-        with DATA_FILE.open("r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
+@lru_cache(maxsize=16)
+def _lines(path: Path) -> Tuple[bytes, ...]:
+    with path.open("rb") as f:
+        return tuple(line.strip() + b"\n" for line in f if line.strip())
+
 
-            
-                yield (line + "\n").encode("utf-8")
+async def ndjson_line_stream(
+    loop: bool = True, rate_hz: float = 20.0, path: Optional[Path] = None, chunk_ms: float = 50.0
+) -> AsyncIterator[bytes]:
 
-                if delay:
-                    await asyncio.sleep(delay)
+    # rate_hz lines per second, written in chunks of whatever is due every chunk_ms
+    lines = _lines(path or DATA_FILE)
+    if not lines:
+        return
+    n_lines = len(lines)
+    interval = max(0.001, chunk_ms / 1000.0)
+    t0 = time.monotonic()
+    pos = sent = 0
 
-        if not loop:
-            break
+    while True:
+        if rate_hz <= 0:
+            n = UNTHROTTLED_CHUNK
+        else:
+            started = time.monotonic()
+            n = int((started - t0) * rate_hz) + 1 - sent   # first line goes out immediately
+
+        while n > 0:
+            take = min(n, n_lines - pos)
+            yield b"".join(lines[pos:pos + take])
+            pos += take
+            sent += take
+            n -= take
+            if pos == n_lines:
+                if not loop:
+                    return
+                pos = 0
+
+        if rate_hz <= 0:
+            # unthrottled: still give the server a chance to notice a client disconnect
+            await asyncio.sleep(0)
+        else:
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
 
 
 @router.get("/data/stream")
-async def data_stream(loop: bool = True, rate_hz: float = 20.0):
+async def data_stream(
+    source: str = Query("file", pattern="^(file|replay|generator)$"),
+    file: str = DATA_FILE.name,
+    loop: bool = True,
+    rate_hz: float = 20.0,
+    speed: float = 1.0,
+    seek: Optional[str] = None,
+    tags: int = Query(200, ge=1),
+    churn: float = Query(0.0, ge=0),
+    mix: str = "passing=1",
+    antennas: int = Query(1, ge=1),
+    seed: Optional[int] = None,
+    chunk_ms: float = Query(50.0, gt=0),
+):
+    """Capture at a fixed rate (?file=datastream4.ndjson&rate_hz=20), at its recorded timing
+    (?source=replay&speed=10&seek=5.0, speed=0 as fast as possible) or synthetic tags
+    (?source=generator&tags=5000&rate_hz=20000&churn=50&mix=passing=7,failing=1,unsupported=1,disabled=1)."""
+
+    if source == "generator":
+        try:
+            weights = parse_mix(mix)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        reader = SyntheticReader(GeneratorConfig(
+            tags=tags, rate=rate_hz, churn=churn, mix=weights, antennas=antennas, seed=seed, chunk_ms=chunk_ms,
+        ))
+        body = reader.stream()
+    elif source == "replay":
+        index = capture_index(scenario_path(file))
+        try:
+            offset = index.seek_seconds(seek)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        body = replay_stream(index, speed=speed, loop=loop, seek=offset, chunk_ms=chunk_ms)
+    else:
+        body = ndjson_line_stream(loop=loop, rate_hz=rate_hz, path=scenario_path(file), chunk_ms=chunk_ms)
 
-    return StreamingResponse(
-        ndjson_line_stream(loop=loop, rate_hz=rate_hz),
-        media_type="application/x-ndjson",
-    )
\ No newline at end of file
+    return StreamingResponse(body, media_type="application/x-ndjson")
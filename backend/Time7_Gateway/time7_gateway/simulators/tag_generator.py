@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional
+
+from time7_gateway.utilities.simulate_encryption import generate_response
+
+# Tag kinds, same cases as the capture files:
+#   disabled    - no tagAuthenticationResponse                   (datastream1)
+#   unsupported - tagAuthenticationResponse with empty response  (datastream2)
+#   failing     - compatible tag, wrong response                 (datastream3)
+#   passing     - compatible tag, correct response               (datastream4)
+KINDS = ("disabled", "unsupported", "failing", "passing")
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    # "passing=0.7,failing=0.1,unsupported=0.1,disabled=0.1" -> normalised weights
+    mix: Dict[str, float] = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in KINDS:
+            raise ValueError(f"unknown tag kind {kind!r} (expected one of {', '.join(KINDS)})")
+        mix[kind] = float(weight)
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError("tag mix needs at least one positive weight")
+    return {k: w / total for k, w in mix.items() if w > 0}
+
+
+@dataclass
+class GeneratorConfig:
+    tags: int = 200                 # distinct tags in view at any time
+    rate: float = 1000.0            # reads per second (<= 0: as fast as possible)
+    churn: float = 0.0              # tags leaving (and as many new ones arriving) per second
+    mix: Dict[str, float] = field(default_factory=lambda: {"passing": 1.0})
+    antennas: int = 1
+    chunk_ms: float = 50.0          # one write to the socket every chunk_ms
+    seed: Optional[int] = None
+    hostname: str = "t7-simulator"
+
+
+class SyntheticReader:
+
+    # Generates tagInventory NDJSON for a configurable tag population.
+    # Every tag gets a fixed challenge (like the captures) and its response is computed
+    # once on arrival, so a read is only a string format of a pre-encoded template.
+    # Reads are emitted in chunks of rate * chunk_ms lines, paced against the wall
+    # clock (no per-line sleep), so 10k+ reads/s cost 20 timer wakeups a second.
+
+    def __init__(self, config: GeneratorConfig) -> None:
+        self.config = config
+        self._rng = random.Random(config.seed)
+        self._kinds = list(config.mix)
+        self._weights = [config.mix[k] for k in self._kinds]
+        self._serial = 0
+        self._tags: List[tuple] = [self._new_tag() for _ in range(max(1, config.tags))]
+        self._churn_due = 0.0
+
+        self.events = 0
+        self.arrivals = len(self._tags)
+        self.departures = 0
+
+    def _new_tag(self) -> tuple:
+        rng = self._rng
+        self._serial += 1
+        tid = f"E280{self._serial:08X}{rng.getrandbits(48):012X}"
+        epc = f"3036{rng.getrandbits(80):020X}"
+        kind = rng.choices(self._kinds, self._weights)[0]
+        antenna = rng.randint(1, max(1, self.config.antennas))
+        rssi = rng.randint(-70, -35) * 100
+
+        if kind == "disabled":
+            tar = ""
+        else:
+            challenge = f"{rng.getrandbits(48):012X}"
+            if kind == "unsupported":
+                response = ""
+            elif kind == "failing":
+                response = f"{rng.getrandbits(64):016x}"
+            else:
+                response = generate_response(tid, challenge)
+            tar = ',"tagAuthenticationResponse":' + json.dumps(
+                {"messageHex": challenge, "responseHex": response, "tidHex": tid}, separators=(",", ":")
+            )
+
+        head = '{"timestamp":"'
+        middle = (
+            f'","hostname":"{self.config.hostname}","eventType":"tagInventory","tagInventoryEvent":'
+            f'{{"epcHex":"{epc}","tidHex":"{tid}","antennaPort":{antenna},"antennaName":"{antenna}",'
+            '"peakRssiCdbm":'
+        )
+        tail = f'{tar}}}}}\n'
+        return (tid, kind, head, middle, rssi, tail)
+
+    @property
+    def tag_ids(self) -> List[str]:
+        return [t[0] for t in self._tags]
+
+    def _apply_churn(self, seconds: float) -> None:
+        self._churn_due += self.config.churn * seconds
+        n = int(self._churn_due)
+        if n <= 0:
+            return
+        self._churn_due -= n
+        for _ in range(min(n, len(self._tags))):
+            i = self._rng.randrange(len(self._tags))
+            self._tags[i] = self._new_tag()
+        self.departures += n
+        self.arrivals += n
+
+    def chunk(self, n: int, now: Optional[datetime] = None, elapsed: float = 0.0) -> bytes:
+        # n reads as NDJSON; `elapsed` seconds of churn are applied first
+        if elapsed:
+            self._apply_churn(elapsed)
+        ts = (now or datetime.now(timezone.utc)).isoformat().replace("+00:00", "Z")
+        rng = self._rng
+        tags = self._tags
+        picks = rng.choices(tags, k=n)
+        jitter = rng.choices((-200, -100, 0, 0, 100, 200), k=n)
+        lines = [f"{head}{ts}{middle}{rssi + j},\"lastSeenTime\":\"{ts}\"{tail}"
+                 for (_, _, head, middle, rssi, tail), j in zip(picks, jitter)]
+        self.events += n
+        return "".join(lines).encode()
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        cfg = self.config
+        t0 = last = time.monotonic()
+        if cfg.rate <= 0:
+            # unthrottled: fixed-size chunks, still yielding to the loop between them
+            while True:
+                now = time.monotonic()
+                yield self.chunk(256, elapsed=now - last)
+                last = now
+                await asyncio.sleep(0)
+
+        interval = max(0.001, cfg.chunk_ms / 1000.0)
+        sent = 0
+        while True:
+            now = time.monotonic()
+            # how many reads are due by now; catches up after a slow send
+            n = int((now - t0) * cfg.rate) - sent
+            if n > 0:
+                yield self.chunk(n, elapsed=now - last)
+                sent += n
+                last = now
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - now)))
+
+    def stats(self) -> dict:
+        return {
+            "tags": len(self._tags),
+            "events": self.events,
+            "arrivals": self.arrivals,
+            "departures": self.departures,
+        }
@@ -73,4 +73,72 @@ def test_get_active_sorted_by_first_seen_desc():
     service.sync_seen(["B"], seen_at=t2)
 
     active = service.get_active()
-    assert [t.tag_id for t in active] == ["B", "A"]  # B first (newer first_seen)
\ No newline at end of file
+    assert [t.tag_id for t in active] == ["B", "A"]  # B first (newer first_seen)
+
+def test_remove_inactive_keeps_tags_seen_again_within_grace():
+    service = ActiveTags(remove_grace_seconds=5.0)
+    t0 = datetime.now(timezone.utc)
+
+    service.sync_seen(["A", "B"], seen_at=t0)
+    service.sync_seen(["A"], seen_at=t0 + timedelta(seconds=4))
+
+    assert service.remove_inactive(now=t0 + timedelta(seconds=6)) == 1
+    assert service.get_active_ids() == ["A"]
+    assert service.remove_inactive(now=t0 + timedelta(seconds=10)) == 1
+    assert len(service) == 0
+
+
+def test_touch_extends_expiry():
+    service = ActiveTags(remove_grace_seconds=5.0)
+    t0 = datetime.now(timezone.utc)
+
+    service.sync_seen(["A"], seen_at=t0)
+    assert service.touch("A", seen_at=t0 + timedelta(seconds=3))
+    assert service.remove_inactive(now=t0 + timedelta(seconds=7)) == 0
+
+
+def test_tag_that_expires_and_returns_is_tracked_once():
+    service = ActiveTags(remove_grace_seconds=1.0)
+    t0 = datetime.now(timezone.utc) - timedelta(seconds=10)
+
+    service.sync_seen(["A"], seen_at=t0)
+    service.remove_inactive(now=t0 + timedelta(seconds=5))
+    assert service.sync_seen(["A"], seen_at=t0 + timedelta(seconds=6)) == {"A"}
+
+    assert service.remove_inactive(now=t0 + timedelta(seconds=6.5)) == 0
+    assert service.remove_inactive(now=t0 + timedelta(seconds=8)) == 1
+    assert service._expiry == []
+
+
+def test_get_active_newest_first_even_when_seen_out_of_order():
+    service = ActiveTags(remove_grace_seconds=100.0)
+    t0 = datetime.now(timezone.utc)
+
+    service.sync_seen(["B"], seen_at=t0)
+    service.sync_seen(["C"], seen_at=t0 + timedelta(seconds=1))
+    service.sync_seen(["A"], seen_at=t0 - timedelta(seconds=1))  # a late reader batch
+
+    assert [t.tidHex for t in service.get_active()] == ["C", "B", "A"]
+    assert [x["tidHex"] for x in service.snapshot()["items"]] == ["C", "B", "A"]
+
+
+def test_first_and_last_seen_round_trip_through_float_storage():
+    service = ActiveTags(remove_grace_seconds=100.0)
+    t1 = datetime.now(timezone.utc).replace(microsecond=123457)
+    t2 = t1 + timedelta(microseconds=1)
+
+    service.sync_seen(["A"], seen_at=t1)
+    service.sync_seen(["A"], seen_at=t2)
+
+    tag = service.get_active()[0]
+    assert tag.first_seen == t1
+    assert tag.last_seen == t2
+    assert tag.first_seen.tzinfo == timezone.utc
+    assert tag.reads == 2
+
+
+def test_active_tag_has_no_instance_dict():
+    from time7_gateway.services.active_tags import ActiveTag
+
+    tag = ActiveTag("A", 1.0, 1.0)
+    assert not hasattr(tag, "__dict__")
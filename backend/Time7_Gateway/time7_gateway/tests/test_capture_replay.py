@@ -0,0 +1,126 @@
+import asyncio
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from time7_gateway.simulators.capture_replay import CaptureIndex, capture_index, parse_timestamp, replay_stream
+from time7_gateway.simulators.reader_streamer import router
+
+SIM_DIR = Path(__file__).resolve().parents[1] / "simulators"
+
+
+def line(ts: str, tid: str) -> str:
+    return f'{{"timestamp":"{ts}","eventType":"tagInventory","tagInventoryEvent":{{"tidHex":"{tid}"}}}}'
+
+
+def write_capture(tmp_path, offsets, trailing_newline=True) -> Path:
+    # offsets: seconds after 2026-02-08T22:43:36Z, one line each
+    lines = [line(f"2026-02-08T22:43:{36 + int(o):02d}.{int(round(o % 1 * 1e9)):09d}Z", f"T{i}") for i, o in enumerate(offsets)]
+    path = tmp_path / "capture.ndjson"
+    path.write_text("\n".join(lines) + ("\n" if trailing_newline else ""))
+    return path
+
+
+async def collect(stream):
+    chunks = []
+    async for chunk in stream:
+        chunks.append((time.monotonic(), chunk))
+    return chunks
+
+
+def test_parse_timestamp_keeps_nanoseconds():
+    a = parse_timestamp("2026-02-08T22:43:36.736669722Z")
+    b = parse_timestamp(b'{"timestamp": "2026-02-08T22:43:36.737795972Z", "hostname": "x"}')
+    assert b - a == pytest.approx(0.00112625, abs=1e-6)
+    assert parse_timestamp(b'{"eventType":"keepalive"}') is None
+
+
+def test_index_covers_every_line_of_a_capture():
+    path = SIM_DIR / "datastream4.ndjson"
+    index = CaptureIndex(path)
+    try:
+        assert len(index) == 5777
+        assert index.slice(0, len(index)) == path.read_bytes()
+        assert list(index.times) == sorted(index.times)
+        assert index.duration == pytest.approx(19.37, abs=0.01)
+        assert index.seek_seconds("2026-02-08T22:43:46.736669722Z") == pytest.approx(10.0)
+        assert index.seek_seconds("2.5") == 2.5
+        with pytest.raises(ValueError):
+            index.seek_seconds("yesterday")
+    finally:
+        index.close()
+
+
+@pytest.mark.asyncio
+async def test_max_speed_replays_the_file_byte_for_byte_in_large_chunks():
+    path = SIM_DIR / "datastream3.ndjson"
+    chunks = await collect(replay_stream(capture_index(path), speed=0))
+    assert b"".join(c for _, c in chunks) == path.read_bytes()
+    assert len(chunks) < 20
+
+
+@pytest.mark.asyncio
+async def test_replay_keeps_recorded_gaps_and_bursts(tmp_path):
+    # one read, a burst of three 0.53 s later, then one more 1 s after that; at 10x
+    index = CaptureIndex(write_capture(tmp_path, [0.0, 0.53, 0.531, 0.532, 1.532], trailing_newline=False))
+    start = time.monotonic()
+    chunks = await collect(replay_stream(index, speed=10, chunk_ms=10))
+
+    assert [c.count(b"\n") for _, c in chunks] == [1, 3, 1]
+    assert 0.05 < chunks[1][0] - start < 0.1
+    assert 0.09 < chunks[2][0] - chunks[1][0] < 0.15
+    assert b"".join(c for _, c in chunks).endswith(b'"T4"}}\n')
+
+
+@pytest.mark.asyncio
+async def test_seek_starts_at_the_first_line_at_or_after_the_offset(tmp_path):
+    index = CaptureIndex(write_capture(tmp_path, [0.0, 1.0, 2.0, 3.0]))
+    chunks = await collect(replay_stream(index, speed=0, seek=1.5))
+    body = b"".join(c for _, c in chunks)
+    assert b'"T2"' in body and b'"T1"' not in body
+
+
+@pytest.mark.asyncio
+async def test_looping_a_single_line_capture_yields_to_other_tasks(tmp_path):
+    index = CaptureIndex(write_capture(tmp_path, [0.0]))
+    ticks = 0
+    chunks = []
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    async def replay():
+        async for chunk in replay_stream(index, loop=True, chunk_ms=50):
+            chunks.append(chunk)
+
+    tasks = [asyncio.create_task(ticker()), asyncio.create_task(replay())]
+    await asyncio.sleep(0.3)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert ticks >= 15
+    # one pass per 50 ms tick, not as fast as the loop can spin
+    assert 4 <= len(chunks) <= 8
+
+
+@pytest.mark.asyncio
+async def test_data_stream_replay_source():
+    app = FastAPI()
+    app.include_router(router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://sim") as client:
+        r = await client.get("/data/stream", params={
+            "source": "replay", "file": "datastream2.ndjson", "speed": 0, "loop": "false",
+        })
+        assert r.status_code == 200
+        assert r.content == (SIM_DIR / "datastream2.ndjson").read_bytes()
+
+        r = await client.get("/data/stream", params={"source": "replay", "seek": "soon"})
+        assert r.status_code == 422
@@ -0,0 +1,34 @@
+from time7_gateway.services.change_log import ADDED, EXPIRED, UPDATED, ChangeLog
+
+
+def test_version_increases_per_record():
+    log = ChangeLog()
+    assert log.record(ADDED, "A") == 1
+    assert log.record(UPDATED, "A") == 2
+    assert log.version == 2
+
+
+def test_since_returns_changes_after_version():
+    log = ChangeLog()
+    log.record(ADDED, "A")
+    log.record(ADDED, "B")
+    log.record(EXPIRED, "A")
+
+    assert log.since(1) == [(2, ADDED, "B"), (3, EXPIRED, "A")]
+    assert log.since(3) == []
+    assert [c[0] for c in log.since(0)] == [1, 2, 3]
+
+
+def test_since_requires_resync_when_version_fell_out_of_buffer():
+    log = ChangeLog(maxlen=3)
+    for tid in "ABCDE":
+        log.record(ADDED, tid)
+
+    assert log.since(1) is None
+    assert log.since(2) == [(3, ADDED, "C"), (4, ADDED, "D"), (5, ADDED, "E")]
+
+
+def test_since_requires_resync_for_future_version():
+    log = ChangeLog()
+    log.record(ADDED, "A")
+    assert log.since(5) is None
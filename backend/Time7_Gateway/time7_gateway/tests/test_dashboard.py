@@ -0,0 +1,169 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from time7_gateway.api.dashboard import router
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.tag_info_cache import TagInfoCache
+
+
+def make_client(change_log_size=10000):
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.state.active_tags = ActiveTags(remove_grace_seconds=60.0, change_log_size=change_log_size)
+    app.state.tag_info_cache = TagInfoCache()
+    return app, TestClient(app)
+
+
+def see(app, tid, epc="EPC", auth=True, info="ok"):
+    app.state.active_tags.sync_seen([tid], epcHex={tid: epc}, seen_at=datetime.now(timezone.utc))
+    if auth is not None and app.state.tag_info_cache.set(tid, auth, info):
+        app.state.active_tags.mark_updated(tid)
+
+
+def test_changes_without_version_is_full_reset():
+    app, client = make_client()
+    see(app, "A")
+    see(app, "B")
+
+    body = client.get("/api/active-tags/changes").json()
+    assert body["reset"] is True
+    assert {r["tidHex"] for r in body["upserts"]} == {"A", "B"}
+    assert body["version"] == app.state.active_tags.changes.version
+
+
+def test_changes_since_version_only_returns_delta():
+    app, client = make_client()
+    see(app, "A")
+    first = client.get("/api/active-tags/changes").json()
+
+    see(app, "B")
+    see(app, "A")   # repeat read, nothing visible changed
+    body = client.get(
+        "/api/active-tags/changes", params={"since": first["version"], "epoch": first["epoch"]}
+    ).json()
+
+    assert body["reset"] is False
+    assert [r["tidHex"] for r in body["upserts"]] == ["B"]
+    assert body["removed"] == []
+
+
+def test_auth_result_change_is_an_upsert():
+    app, client = make_client()
+    see(app, "A", auth=None)
+    first = client.get("/api/active-tags/changes").json()
+    assert first["upserts"] == []   # no IAS result yet, not on the dashboard
+
+    app.state.tag_info_cache.set("A", False, "Unsupported Tag")
+    app.state.active_tags.mark_updated("A")
+    body = client.get("/api/active-tags/changes", params={"since": first["version"], "epoch": first["epoch"]}).json()
+
+    assert [(r["tidHex"], r["auth"], r["info"]) for r in body["upserts"]] == [("A", False, "Unsupported Tag")]
+
+
+def test_expired_tag_is_removed():
+    app, client = make_client()
+    see(app, "A")
+    first = client.get("/api/active-tags/changes").json()
+
+    app.state.active_tags.remove_inactive(now=datetime.now(timezone.utc).replace(year=2100))
+    body = client.get("/api/active-tags/changes", params={"since": first["version"], "epoch": first["epoch"]}).json()
+
+    assert body["removed"] == ["A"]
+    assert body["upserts"] == []
+
+
+def test_stale_version_or_other_epoch_resets():
+    app, client = make_client(change_log_size=2)
+    see(app, "A")
+    first = client.get("/api/active-tags/changes").json()
+    for tid in ("B", "C", "D"):
+        see(app, tid)
+
+    stale = client.get("/api/active-tags/changes", params={"since": first["version"], "epoch": first["epoch"]}).json()
+    assert stale["reset"] is True
+    assert len(stale["upserts"]) == 4
+
+    other = client.get("/api/active-tags/changes", params={"since": stale["version"], "epoch": "restarted"}).json()
+    assert other["reset"] is True
+
+
+def test_active_tags_body_is_built_once_per_state_change():
+    app, client = make_client()
+    see(app, "A")
+    see(app, "B")
+
+    first = client.get("/api/active-tags")
+    second = client.get("/api/active-tags")
+    assert [r["tidHex"] for r in first.json()] == ["B", "A"]
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+    assert app.state.active_tags_response.builds == 1
+
+    see(app, "A")   # repeat read: same rows, same version
+    assert client.get("/api/active-tags").headers["etag"] == first.headers["etag"]
+    assert app.state.active_tags_response.builds == 1
+
+    see(app, "C")
+    third = client.get("/api/active-tags")
+    assert third.headers["etag"] != first.headers["etag"]
+    assert len(third.json()) == 3
+    assert app.state.active_tags_response.builds == 2
+
+
+def test_active_tags_if_none_match_returns_304():
+    app, client = make_client()
+    see(app, "A")
+    etag = client.get("/api/active-tags").headers["etag"]
+
+    cached = client.get("/api/active-tags", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    app.state.tag_info_cache.set("A", False, "Unsupported Tag")
+    app.state.active_tags.mark_updated("A")
+    changed = client.get("/api/active-tags", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()[0]["auth"] is False
+
+
+def test_active_tags_etag_follows_cache_expiry():
+    app, client = make_client()
+    now = [0.0]
+    app.state.tag_info_cache = TagInfoCache(cache_ttl_hours=1, clock=lambda: now[0])
+    see(app, "A")
+    etag = client.get("/api/active-tags").headers["etag"]
+
+    # IAS result ages out of the cache without any tag change
+    now[0] = 3601.0
+    app.state.tag_info_cache.sweep()
+    resp = client.get("/api/active-tags", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json() == []
+
+
+def test_cache_expiry_and_eviction_of_an_active_tag_reach_delta_clients():
+    app, client = make_client()
+    now = [0.0]
+    cache = app.state.tag_info_cache = TagInfoCache(cache_ttl_hours=1, max_entries=2, clock=lambda: now[0])
+    cache.on_drop = app.state.active_tags.mark_updated
+    see(app, "A")
+    see(app, "B")
+    first = client.get("/api/active-tags/changes").json()
+
+    # "C" evicts the least recently used of "A" / "B", which stays in view without a result
+    see(app, "C")
+    body = client.get("/api/active-tags/changes", params={"since": first["version"], "epoch": first["epoch"]}).json()
+    (evicted,) = body["removed"]
+    assert evicted in ("A", "B")
+    assert [r["tidHex"] for r in body["upserts"]] == ["C"]
+    assert evicted not in {r["tidHex"] for r in client.get("/api/active-tags").json()}
+
+    now[0] = 3601.0
+    cache.sweep()
+    last = client.get("/api/active-tags/changes", params={"since": body["version"], "epoch": body["epoch"]}).json()
+    assert sorted(last["removed"]) == sorted({"A", "B", "C"} - {evicted})
+    assert client.get("/api/active-tags").json() == []
@@ -0,0 +1,80 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from time7_gateway.clients.event_decoder import (
+    ImpinjEventDecoder,
+    available_backends,
+    inventory_from_dict,
+)
+
+SIM_DIR = Path(__file__).resolve().parents[1] / "simulators"
+
+FIELDS = ("tidHex", "epcHex", "antennaPort", "peakRssiCdbm", "tarPresent", "messageHex", "responseHex", "tarTidHex")
+
+
+def as_tuple(inv):
+    return None if inv is None else tuple(getattr(inv, f) for f in FIELDS)
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_non_inventory_lines_are_filtered_before_parsing(backend):
+    dec = ImpinjEventDecoder(backend)
+    # not valid JSON at all: would raise if it reached the parser
+    assert dec.decode(b'{"eventType": "keepalive", broken') is None
+    assert dec.filtered == 1
+    assert dec.errors == 0
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_empty_tar_is_not_present_and_empty_response_is_kept(backend):
+    dec = ImpinjEventDecoder(backend)
+    disabled = dec.decode(b'{"eventType":"tagInventory","tagInventoryEvent":{"tidHex":"T1","tagAuthenticationResponse":{}}}')
+    unsupported = dec.decode(
+        b'{"eventType":"tagInventory","tagInventoryEvent":{"tidHex":"T2",'
+        b'"tagAuthenticationResponse":{"messageHex":"AA","responseHex":""}}}'
+    )
+
+    assert disabled.tidHex == "T1" and disabled.tarPresent is False
+    assert unsupported.tarPresent is True and unsupported.responseHex == ""
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_malformed_shapes_are_counted_as_errors(backend):
+    dec = ImpinjEventDecoder(backend)
+    lines = [
+        b'{"eventType":"tagInventory","tagInventoryEvent":"T1"}',
+        b'{"eventType":"tagInventory","tagInventoryEvent":{"tidHex":"T2","tagAuthenticationResponse":"AA"}}',
+        b'{"eventType":"tagInventory","tagInventoryEvent":[1, 2]}',
+    ]
+    assert [dec.decode(line) for line in lines] == [None, None, None]
+    assert dec.errors == 3
+    assert dec.decoded == 0
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_tar_without_known_fields_is_not_present_on_every_path(backend):
+    dec = ImpinjEventDecoder(backend)
+    line = b'{"eventType":"tagInventory","tagInventoryEvent":{"tidHex":"T1","tagAuthenticationResponse":{"other":1}}}'
+    assert dec.decode(line).tarPresent is False
+    assert inventory_from_dict(json.loads(line)).tarPresent is False
+
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("name", ["datastream1.ndjson", "datastream2.ndjson", "datastream5.ndjson"])
+def test_backends_match_dict_decoding_on_captures(backend, name):
+    dec = ImpinjEventDecoder(backend)
+    with (SIM_DIR / name).open("rb") as f:
+        for i, line in enumerate(f):
+            if i >= 500:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            assert as_tuple(dec.decode(line)) == as_tuple(inventory_from_dict(json.loads(line)))
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        ImpinjEventDecoder("simdjson")
@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from time7_gateway.clients.ias_services import IASClient, IASError, MicroBatcher
+from time7_gateway.models.schemas import AuthPayload
+from time7_gateway.simulators.ias_services import MockIASClient, mock_ias_lookup
+from time7_gateway.utilities.simulate_encryption import generate_response
+
+
+def payload(tid, good=True):
+    msg = "A1B2C3"
+    return AuthPayload(messageHex=msg, responseHex=generate_response(tid, msg) if good else "00", tidHex=tid)
+
+
+def ias_transport(requests, fail=False):
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        requests.append((request.url.path, body))
+        if fail:
+            return httpx.Response(503)
+        if request.url.path.endswith("/batch"):
+            return httpx.Response(200, json={"results": [
+                {"auth": True, "info": f"ok {item['tidHex']}"} for item in body["items"]
+            ]})
+        return httpx.Response(200, json={"auth": True, "info": f"ok {body['tidHex']}"})
+    return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_are_batched_into_one_request():
+    requests = []
+    client = IASClient("http://ias", batch_size=8, batch_delay=0.05, transport=ias_transport(requests))
+
+    results = await asyncio.gather(*(client.lookup(payload(f"T{i}")) for i in range(5)))
+    await client.aclose()
+
+    assert results == [(True, f"ok T{i}") for i in range(5)]
+    assert len(requests) == 1
+    assert requests[0][0] == "/authenticate/batch"
+    assert [item["tidHex"] for item in requests[0][1]["items"]] == [f"T{i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_sent_without_waiting_for_the_delay():
+    requests = []
+    client = IASClient("http://ias", batch_size=2, batch_delay=10.0, transport=ias_transport(requests))
+
+    results = await asyncio.wait_for(
+        asyncio.gather(client.lookup(payload("A")), client.lookup(payload("B"))), timeout=1
+    )
+    await client.aclose()
+    assert [r[0] for r in results] == [True, True]
+
+
+@pytest.mark.asyncio
+async def test_single_endpoint_when_batching_disabled():
+    requests = []
+    client = IASClient("http://ias", batch_path=None, transport=ias_transport(requests))
+
+    assert await client.lookup(payload("A")) == (True, "ok A")
+    await client.aclose()
+    assert requests == [("/authenticate", {"messageHex": "A1B2C3", "responseHex": payload("A").responseHex, "tidHex": "A"})]
+
+
+@pytest.mark.asyncio
+async def test_ias_failure_raises_instead_of_returning_a_result():
+    client = IASClient("http://ias", transport=ias_transport([], fail=True), batch_delay=0.001)
+    with pytest.raises(IASError):
+        await client.lookup(payload("A"))
+    await client.aclose()
+    assert client.errors == 1
+
+
+@pytest.mark.asyncio
+async def test_batcher_propagates_result_count_mismatch():
+    async def short(items):
+        return items[:-1]
+
+    b = MicroBatcher(short, max_batch=2, max_delay=0.001)
+    with pytest.raises(IASError):
+        await asyncio.gather(b.submit(1), b.submit(2))
+
+
+@pytest.mark.asyncio
+async def test_mock_client_matches_sync_mock_and_batches():
+    client = MockIASClient(latency=0.01, batch_size=16, batch_delay=0.005)
+    payloads = [payload("T1"), payload("T2", good=False), payload("T3")]
+
+    results = await asyncio.gather(*(client.lookup(p) for p in payloads))
+
+    assert results == [mock_ias_lookup(p) for p in payloads]
+    assert client.requests == 1
+    assert client.stats()["batching"]["items"] == 3
+
+
+def test_real_client_without_a_url_names_the_setting(monkeypatch):
+    monkeypatch.delenv("IAS_BASE_URL", raising=False)
+    with pytest.raises(ValueError, match="IAS_BASE_URL"):
+        IASClient.from_env()
@@ -0,0 +1,185 @@
+import asyncio
+import json
+from datetime import datetime, timezone, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from time7_gateway.api.dashboard import router
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.live_feed import LiveFeed
+from time7_gateway.services.tag_info_cache import TagInfoCache
+
+
+def make_app(change_log_size=10000):
+    return SimpleNamespace(state=SimpleNamespace(
+        active_tags=ActiveTags(remove_grace_seconds=60.0, change_log_size=change_log_size),
+        tag_info_cache=TagInfoCache(),
+        reader_connected=False,
+    ))
+
+
+def see(app, tid, auth=True, info="ok", epc="EPC"):
+    app.state.active_tags.sync_seen([tid], epcHex={tid: epc}, seen_at=datetime.now(timezone.utc))
+    if app.state.tag_info_cache.set(tid, auth, info):
+        app.state.active_tags.mark_updated(tid)
+
+
+class Collector:
+    def __init__(self, delay=0.0):
+        self.messages = []
+        self.delay = delay
+
+    async def send(self, text):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.messages.append(json.loads(text))
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_first_message_is_snapshot_then_deltas():
+    app = make_app()
+    see(app, "A")
+    feed = LiveFeed(app, max_hz=0)
+    feed.tick()
+
+    sub = feed.subscribe()
+    out = Collector()
+    task = asyncio.create_task(feed.serve(sub, out.send))
+    await settle()
+
+    see(app, "B")
+    feed.tick()
+    await settle()
+    task.cancel()
+
+    assert out.messages[0]["type"] == "snapshot"
+    assert [r["tidHex"] for r in out.messages[0]["tags"]] == ["A"]
+    assert out.messages[1] == {
+        "type": "delta",
+        "version": app.state.active_tags.changes.version,
+        "upserts": [out.messages[1]["upserts"][0]],
+        "removed": [],
+    }
+    assert out.messages[1]["upserts"][0]["tidHex"] == "B"
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_subscriber_gets_merged_delta():
+    app = make_app()
+    feed = LiveFeed(app, max_hz=100)
+    feed.tick()
+
+    sub = feed.subscribe(max_hz=5)   # at most one message per 200 ms
+    out = Collector()
+    task = asyncio.create_task(feed.serve(sub, out.send))
+    await settle()
+
+    see(app, "A")
+    feed.tick()
+    see(app, "B")
+    feed.tick()
+    app.state.active_tags.remove_inactive(now=datetime.now(timezone.utc) + timedelta(hours=1))
+    see(app, "C")
+    feed.tick()
+    await asyncio.sleep(0.25)
+    task.cancel()
+
+    assert [m["type"] for m in out.messages] == ["snapshot", "delta"]
+    delta = out.messages[1]
+    assert [r["tidHex"] for r in delta["upserts"]] == ["C"]
+    assert delta["removed"] == ["A", "B"]
+
+
+@pytest.mark.asyncio
+async def test_backlogged_subscriber_is_resynced_with_snapshot():
+    app = make_app()
+    feed = LiveFeed(app, max_hz=100, max_pending=2)
+    feed.tick()
+    sub = feed.subscribe()
+    sub.take(feed)   # initial snapshot consumed elsewhere
+
+    for tid in ("A", "B", "C", "D"):
+        see(app, tid)
+        feed.tick()
+
+    assert sub.resync is True
+    messages = [json.loads(t) for t in sub.take(feed)]
+    assert messages[0]["type"] == "snapshot"
+    assert len(messages[0]["tags"]) == 4
+
+
+@pytest.mark.asyncio
+async def test_subscriber_that_keeps_falling_behind_is_dropped():
+    app = make_app()
+    feed = LiveFeed(app, max_hz=100, max_pending=1, max_resyncs=1)
+    feed.tick()
+    sub = feed.subscribe()
+    sub.take(feed)
+
+    for i in range(6):
+        see(app, f"T{i}")
+        feed.tick()
+        if sub.resync and i < 3:
+            sub.take(feed)   # snapshot goes out, then it falls behind again
+
+    await asyncio.wait_for(feed.serve(sub, Collector().send), 1.0)
+    assert feed.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_reader_change_is_pushed():
+    app = make_app()
+    feed = LiveFeed(app, max_hz=100)
+    feed.tick()
+    sub = feed.subscribe()
+    sub.take(feed)
+
+    app.state.reader_connected = True
+    feed.tick()
+    messages = [json.loads(t) for t in sub.take(feed)]
+    assert messages == [{"type": "reader", "connected": True, "readers": []}]
+
+    feed.tick()
+    assert sub.take(feed) == []
+
+
+def test_websocket_sends_initial_snapshot():
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.state.active_tags = ActiveTags(remove_grace_seconds=60.0)
+    app.state.tag_info_cache = TagInfoCache()
+    app.state.reader_connected = True
+    app.state.live_feed = LiveFeed(app)
+    see(app, "A")
+
+    with TestClient(app).websocket_connect("/api/live") as ws:
+        msg = ws.receive_json()
+
+    assert msg["type"] == "snapshot"
+    assert [r["tidHex"] for r in msg["tags"]] == ["A"]
+    assert msg["reader"]["connected"] is True
+
+
+def test_snapshot_is_rebuilt_when_a_cached_result_expires():
+    now = [0.0]
+    app = make_app()
+    app.state.tag_info_cache = TagInfoCache(cache_ttl_hours=1, clock=lambda: now[0])
+    see(app, "A")
+    see(app, "B")
+    feed = LiveFeed(app, max_hz=0)
+    assert [t["tidHex"] for t in json.loads(feed.snapshot_text())["tags"]] == ["B", "A"]
+
+    # only the cache version moves: "A"'s result expires while the tag stays in view
+    now[0] = 1800.0
+    app.state.tag_info_cache.set("B", True, "ok")
+    now[0] = 3601.0
+    app.state.tag_info_cache.sweep()
+    assert [t["tidHex"] for t in json.loads(feed.snapshot_text())["tags"]] == ["B"]
@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from time7_gateway.debug.routes import router as debug_router
+from time7_gateway.services.loop_monitor import LoopMonitor
+
+
+def blocking_ias_call():
+    time.sleep(0.25)
+
+
+async def run_monitor(monitor: LoopMonitor, body) -> None:
+    task = asyncio.create_task(monitor.run(), name="loop-monitor")
+    await asyncio.sleep(0.05)
+    await body()
+    await asyncio.sleep(0.05)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_lag_is_recorded_every_tick_without_slow_reports():
+    monitor = LoopMonitor(tick=0.01, threshold=0.1)
+    await run_monitor(monitor, lambda: asyncio.sleep(0.2))
+
+    stats = monitor.stats()
+    assert stats["ticks"] >= 10
+    assert stats["slow_callbacks"] == 0 and stats["recent_slow_callbacks"] == []
+    assert stats["lag_ms_buckets"]["+Inf"] == stats["ticks"]
+    assert not stats["running"]
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_is_reported_with_its_stack(caplog):
+    monitor = LoopMonitor(tick=0.01, threshold=0.05)
+
+    async def reader_loop():
+        blocking_ias_call()
+
+    async def body():
+        await asyncio.create_task(reader_loop(), name="reader-a")
+
+    with caplog.at_level("WARNING", logger="time7_gateway.services.loop_monitor"):
+        await run_monitor(monitor, body)
+
+    assert monitor.slow_callbacks == 1
+    (report,) = monitor.reports
+    assert report["lag_ms"] >= 200
+    assert report["task"].startswith("reader-a")
+    assert any("blocking_ias_call" in frame for frame in report["stack"])
+    assert "event loop blocked for" in caplog.text and "blocking_ias_call" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_debug_loop_endpoint():
+    app = FastAPI()
+    app.include_router(debug_router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://gw") as client:
+        assert (await client.get("/debug/loop")).status_code == 404
+
+        app.state.loop_monitor = LoopMonitor(tick=0.01, threshold=0.05)
+
+        async def body():
+            blocking_ias_call()
+            await asyncio.sleep(0.03)
+            r = await client.get("/debug/loop")
+            assert r.status_code == 200
+            assert r.json()["slow_callbacks"] == 1
+            assert r.json()["recent_slow_callbacks"][0]["stack"]
+
+        await run_monitor(app.state.loop_monitor, body)
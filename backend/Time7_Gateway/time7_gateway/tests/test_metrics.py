@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from time7_gateway.api.dashboard import router as dashboard_router
+from time7_gateway.api.metrics import instrument, router as metrics_router
+from time7_gateway.clients.reader_client import ReaderDefinition, build_ingest_pipeline
+from time7_gateway.clients.reader_supervisor import ReaderSupervisor
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.metrics import Histogram, Metrics, timed
+from time7_gateway.services.response_cache import ResponseCache
+from time7_gateway.services.tag_info_cache import TagInfoCache
+
+MODULE = "time7_gateway.clients.reader_client"
+
+
+def samples(text: str) -> dict:
+    out = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            out[name] = float(value)
+    return out
+
+
+def test_histogram_buckets_are_cumulative_and_le_inclusive():
+    m = Metrics()
+    h = m.histogram("t_seconds", "test", buckets=(0.1, 1.0)).labels(route="/x")
+    for v in (0.05, 0.1, 0.5, 3.0):
+        h.observe(v)
+
+    s = samples(m.render())
+    assert s['t_seconds_bucket{route="/x",le="0.1"}'] == 2
+    assert s['t_seconds_bucket{route="/x",le="1.0"}'] == 3
+    assert s['t_seconds_bucket{route="/x",le="+Inf"}'] == 4
+    assert s['t_seconds_count{route="/x"}'] == 4
+    assert s['t_seconds_sum{route="/x"}'] == pytest.approx(3.65)
+    assert h.quantile(0.5) == 0.1
+
+
+@pytest.mark.asyncio
+async def test_timed_keeps_sync_and_async_and_counts_failures():
+    h, errors = Histogram(), Metrics().counter("e_total", "test").labels()
+
+    async def lookup(x):
+        if x is None:
+            raise RuntimeError("down")
+        return x
+
+    wrapped = timed(lookup, h, errors)
+    assert await wrapped(1) == 1
+    with pytest.raises(RuntimeError):
+        await wrapped(None)
+
+    sync = timed(lambda rows: len(rows), h)
+    assert sync([1, 2]) == 2
+    assert (h.count, errors.value) == (3, 1)
+
+
+def test_active_tags_counts_expirations():
+    tags = ActiveTags(remove_grace_seconds=5.0)
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    tags.sync_seen(["A", "B"], seen_at=t0)
+    tags.sync_seen(["B"], seen_at=t0 + timedelta(seconds=4))
+    tags.remove_inactive(now=t0 + timedelta(seconds=6))
+    tags.remove_inactive(now=t0 + timedelta(seconds=20))
+    assert tags.expired == 2 and len(tags) == 0
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_readers_cache_ias_and_requests():
+    lines = {"http://a": ["T1", "T2", None, "T1"], "http://b": ["T3"]}
+
+    async def fake_stream(self_inner, on_connect=None):
+        if on_connect:
+            on_connect()
+        for tid in lines[self_inner.base_url]:
+            if tid is None:
+                yield {"eventType": "keepalive"}
+            else:
+                yield {"eventType": "tagInventory", "tagInventoryEvent": {
+                    "tidHex": tid, "epcHex": "E",
+                    "tagAuthenticationResponse": {"messageHex": "00", "responseHex": "11", "tidHex": tid},
+                }}
+
+    async def ias_lookup(payload):
+        if payload.tidHex == "T3":
+            raise RuntimeError("IAS down")
+        return True, "ok"
+
+    app = FastAPI()
+    app.include_router(dashboard_router, prefix="/api")
+    app.include_router(metrics_router)
+    app.state.active_tags = ActiveTags(remove_grace_seconds=60.0)
+    app.state.tag_info_cache = TagInfoCache()
+    app.state.active_tags_response = ResponseCache()
+    app.state.ias_lookup = ias_lookup
+    app.state.metrics = instrument(app)
+
+    pipeline = build_ingest_pipeline(app, persist_fn=lambda **kw: None)
+    app.state.ingest_pipeline = pipeline
+    sup = app.state.reader_supervisor = ReaderSupervisor(
+        app, [ReaderDefinition("a", "http://a"), ReaderDefinition("b", "http://b")], pipeline
+    )
+    with patch(f"{MODULE}.ImpinjReaderClient.stream_events", new=fake_stream), \
+         patch(f"{MODULE}.ImpinjReaderClient.aclose", new_callable=AsyncMock):
+        sup.start()
+        for task in list(sup._tasks.values()):
+            await task
+        await sup.stop()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://gw") as client:
+        await client.get("/api/active-tags")
+        r = await client.get("/metrics")
+
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    s = samples(r.text)
+    assert s['time7_reader_events_received_total{reader="a"}'] == 4
+    assert s['time7_reader_events_filtered_total{reader="a"}'] == 1
+    assert s['time7_reader_events_received_total{reader="b"}'] == 1
+    assert s['time7_pipeline_processed_total{stage="decode"}'] == 4
+    assert s["time7_ias_request_seconds_count"] == 3
+    assert s["time7_ias_errors_total"] == 1
+    assert s['time7_pipeline_errors_total{stage="auth"}'] == 1
+    assert s["time7_active_tags"] == 3
+    assert s["time7_tag_cache_entries"] == 2
+    assert s['time7_http_request_seconds_count{route="/api/active-tags"}'] == 1
+    assert s['time7_http_request_seconds_count{route="/api/reader-status"}'] == 0
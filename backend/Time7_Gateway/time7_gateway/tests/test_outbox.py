@@ -0,0 +1,164 @@
+import asyncio
+import threading
+
+import pytest
+
+from time7_gateway.services.outbox import Outbox
+from time7_gateway.services.write_behind import WriteBehind
+
+
+def row(tid, info="ok"):
+    return {"tid_hex": tid, "first_seen": "2026-01-01T00:00:00+00:00", "auth": True, "info": info, "epc_hex": None}
+
+
+class FakeDatabase:
+    # remote store that can be switched down
+
+    def __init__(self):
+        self.rows = {}
+        self.calls = 0
+        self.down = False
+
+    def upsert(self, rows):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("supabase unreachable")
+        for r in rows:
+            self.rows[r["tid_hex"]] = r
+
+
+def test_rows_survive_restart_and_replay(tmp_path):
+    path = str(tmp_path / "outbox.sqlite")
+    box = Outbox(path)
+    box.append([row("A"), row("B")])
+    box.close()
+
+    db = FakeDatabase()
+    box = Outbox(path)
+    assert len(box) == 2
+    assert box.replay_once(db.upsert) == 2
+    assert set(db.rows) == {"A", "B"}
+    assert len(box) == 0
+    assert box.replay_once(db.upsert) == 0
+
+
+def test_only_latest_row_per_tid_is_kept(tmp_path):
+    box = Outbox(str(tmp_path / "outbox.sqlite"))
+    box.append([row("A", "first"), row("B")])
+    box.append([row("A", "second")])
+    assert len(box) == 2
+
+    db = FakeDatabase()
+    box.replay_once(db.upsert)
+    assert db.rows["A"]["info"] == "second"
+
+
+def test_failed_replay_keeps_rows(tmp_path):
+    box = Outbox(str(tmp_path / "outbox.sqlite"))
+    box.append([row("A")])
+    db = FakeDatabase()
+    db.down = True
+
+    with pytest.raises(ConnectionError):
+        box.replay_once(db.upsert)
+    assert len(box) == 1
+
+    db.down = False
+    assert box.replay_once(db.upsert) == 1
+    assert "A" in db.rows
+
+
+def test_row_replaced_during_replay_is_sent_again(tmp_path):
+    box = Outbox(str(tmp_path / "outbox.sqlite"))
+    box.append([row("A", "old")])
+    db = FakeDatabase()
+
+    def upsert_while_tag_changes(rows):
+        box.append([row("A", "new")])   # newer result lands while "old" is in flight
+        db.upsert(rows)
+
+    box.replay_once(upsert_while_tag_changes)
+    assert len(box) == 1
+    box.replay_once(db.upsert)
+    assert db.rows["A"]["info"] == "new"
+
+
+def test_backlog_is_bounded_oldest_dropped(tmp_path):
+    box = Outbox(str(tmp_path / "outbox.sqlite"), max_rows=3)
+    box.append([row(t) for t in "ABCDE"])
+    assert len(box) == 3
+    assert box.stats()["dropped"] == 2
+
+    db = FakeDatabase()
+    box.replay_once(db.upsert)
+    assert set(db.rows) == {"C", "D", "E"}
+
+
+@pytest.mark.asyncio
+async def test_ingestion_never_waits_on_remote_outage(tmp_path):
+    box = Outbox(str(tmp_path / "outbox.sqlite"))
+    db = FakeDatabase()
+    db.down = True
+    writer = WriteBehind(box.append, max_batch=10, max_age=0.01)
+    replayer = asyncio.create_task(box.run_replayer(db.upsert, interval=0.01, max_backoff=0.02))
+
+    for i in range(25):
+        writer.add(row(f"T{i}"))
+    await asyncio.sleep(0.1)
+    assert len(box) == 25          # everything is local, nothing reached the remote
+    assert db.rows == {}
+    assert box.stats()["consecutive_failures"] > 0
+
+    db.down = False
+    for _ in range(100):
+        if len(box) == 0:
+            break
+        await asyncio.sleep(0.01)
+
+    replayer.cancel()
+    await asyncio.gather(replayer, return_exceptions=True)
+    await writer.close()
+    assert len(db.rows) == 25
+    stats = box.stats()
+    assert stats["backlog"] == 0
+    assert stats["replayed"] == 25
+    assert stats["consecutive_failures"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stop_lets_the_batch_in_flight_finish(tmp_path):
+    box = Outbox(str(tmp_path / "outbox.sqlite"))
+    box.append([row("A"), row("B")])
+    db = FakeDatabase()
+    sending, release = threading.Event(), threading.Event()
+
+    def slow_upsert(rows):
+        sending.set()
+        release.wait(5)
+        db.upsert(rows)
+
+    replayer = asyncio.create_task(box.run_replayer(slow_upsert, interval=60))
+    await asyncio.to_thread(sending.wait, 5)
+
+    box.stop()
+    await asyncio.sleep(0.05)
+    assert not replayer.done()     # still sending, not cut off
+    release.set()
+    await asyncio.wait_for(replayer, 5)
+
+    assert set(db.rows) == {"A", "B"}
+    assert len(box) == 0           # acked before close(), so nothing is sent twice
+    box.close()
+
+
+@pytest.mark.asyncio
+async def test_stop_wakes_an_idle_replayer(tmp_path):
+    box = Outbox(str(tmp_path / "outbox.sqlite"))
+    db = FakeDatabase()
+    replayer = asyncio.create_task(box.run_replayer(db.upsert, interval=60))
+    await asyncio.sleep(0.05)
+
+    box.stop()
+    await asyncio.wait_for(replayer, 1)
+    assert db.calls == 0
+    box.close()
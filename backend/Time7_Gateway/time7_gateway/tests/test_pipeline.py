@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from time7_gateway.services.pipeline import (
+    OverflowPolicy,
+    Pipeline,
+    Stage,
+    StageConfig,
+    StageQueue,
+)
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_discards_front_when_full():
+    q = StageQueue(maxsize=2, policy=OverflowPolicy.DROP_OLDEST)
+    await q.put("a")
+    await q.put("b")
+    await q.put("c")
+
+    assert q.qsize() == 2
+    assert q.dropped == 1
+    assert [await q.get(), await q.get()] == ["b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_replaces_queued_item_with_same_key():
+    q = StageQueue(maxsize=4, policy=OverflowPolicy.COALESCE)
+    await q.put("A-1", key="A")
+    await q.put("B-1", key="B")
+    await q.put("A-2", key="A")
+
+    assert q.qsize() == 2
+    assert q.coalesced == 1
+    # A keeps its original position but carries the latest value
+    assert [await q.get(), await q.get()] == ["A-2", "B-1"]
+
+
+@pytest.mark.asyncio
+async def test_block_waits_for_room():
+    q = StageQueue(maxsize=1, policy=OverflowPolicy.BLOCK)
+    await q.put("a")
+
+    producer = asyncio.create_task(q.put("b"))
+    await asyncio.sleep(0)
+    assert not producer.done()
+
+    assert await q.get() == "a"
+    await asyncio.wait_for(producer, timeout=1)
+    assert await q.get() == "b"
+
+
+@pytest.mark.asyncio
+async def test_pipeline_forwards_and_drains():
+    out = []
+
+    async def double(x):
+        return x * 2
+
+    async def sink(x):
+        out.append(x)
+
+    p = Pipeline([Stage("double", double), Stage("sink", sink)])
+    p.start()
+    for i in range(5):
+        await p.put(i)
+    await p.drain()
+    await p.stop()
+
+    assert out == [0, 2, 4, 6, 8]
+    stats = p.stats()["stages"]
+    assert stats["double"]["processed"] == 5
+    assert stats["sink"]["depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_stage_does_not_block_producer_until_its_queue_fills():
+    release = asyncio.Event()
+
+    async def passthrough(x):
+        return x
+
+    async def slow(x):
+        await release.wait()
+
+    p = Pipeline([
+        Stage("fast", passthrough, StageConfig(maxsize=100)),
+        Stage("slow", slow, StageConfig(maxsize=100, policy=OverflowPolicy.COALESCE), key=lambda x: x % 3),
+    ])
+    p.start()
+    for i in range(50):
+        await asyncio.wait_for(p.put(i), timeout=1)
+    await asyncio.sleep(0.01)
+
+    # the slow stage holds one item in flight and at most one queued item per key
+    assert p.stage("slow").queue.qsize() <= 3
+    release.set()
+    await p.drain()
+    await p.stop()
+
+
+@pytest.mark.asyncio
+async def test_stage_errors_are_counted_not_raised():
+    async def boom(x):
+        raise ValueError(x)
+
+    p = Pipeline([Stage("boom", boom)])
+    p.start()
+    await p.put(1)
+    await p.drain()
+    await p.stop()
+
+    assert p.stats()["stages"]["boom"]["errors"] == 1
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from time7_gateway.debug.profiler import Profiler, ProfilerBusy
+from time7_gateway.debug.routes import router as debug_router
+
+
+def spin_decode(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def hold_allocations(keep: list, stop: threading.Event) -> None:
+    while not stop.is_set():
+        keep.append(bytearray(64 * 1024))
+        time.sleep(0.005)
+
+
+def run_in_thread(target, *args):
+    stop = threading.Event()
+    thread = threading.Thread(target=target, args=(*args, stop), name="busy-worker", daemon=True)
+    thread.start()
+    return stop, thread
+
+
+def test_sample_finds_the_busy_thread_and_its_function():
+    stop, thread = run_in_thread(spin_decode)
+    try:
+        profile = Profiler().sample(0.3, interval=0.005)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert profile.samples > 10
+    busy = {stack: n for (name, stack), n in profile.stacks.items() if name == "busy-worker"}
+    assert sum(n for stack, n in busy.items() if any("spin_decode" in f for f in stack)) >= profile.samples * 0.8
+
+    lines = profile.collapsed().splitlines()
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any(line.startswith("busy-worker;") and "spin_decode (" in line for line in lines)
+
+    stats = profile.to_dict(top=5)
+    assert stats["threads"]["busy-worker"] == sum(busy.values())
+    assert len(stats["top"]) <= 5
+
+
+def test_allocation_mode_reports_live_allocation_sites():
+    keep = []
+    stop, thread = run_in_thread(hold_allocations, keep)
+    try:
+        result = Profiler().allocations(0.2, top=5)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert result["mode"] == "alloc" and result["top"]
+    assert "test_profiler.py" in result["top"][0]["site"]
+    assert result["top"][0]["size_kib"] >= 64
+
+
+def test_one_run_at_a_time_and_duration_limit():
+    profiler = Profiler(max_seconds=1.0)
+    with pytest.raises(ValueError):
+        profiler.sample(5.0)
+
+    started = threading.Event()
+    thread = threading.Thread(target=lambda: (started.set(), profiler.sample(0.3)))
+    thread.start()
+    started.wait()
+    time.sleep(0.05)
+    with pytest.raises(ProfilerBusy):
+        profiler.allocations(0.1)
+    thread.join()
+    assert profiler.sample(0.05).samples >= 1
+
+
+@pytest.mark.asyncio
+async def test_debug_profile_endpoint():
+    app = FastAPI()
+    app.include_router(debug_router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://gw") as client:
+        assert (await client.get("/debug/profile")).status_code == 404
+
+        app.state.profiler = Profiler(max_seconds=1.0)
+        r = await client.get("/debug/profile", params={"seconds": 0.1})
+        assert r.status_code == 200 and r.headers["content-type"].startswith("text/plain")
+        assert "MainThread;" in r.text
+
+        r = await client.get("/debug/profile", params={"seconds": 0.1, "format": "json", "lines": "true"})
+        assert r.json()["samples"] >= 1
+
+        assert (await client.get("/debug/profile", params={"seconds": 10})).status_code == 400
+
+        first = asyncio.create_task(client.get("/debug/profile", params={"seconds": 0.3}))
+        await asyncio.sleep(0.1)
+        assert (await client.get("/debug/profile", params={"seconds": 0.1, "mode": "alloc"})).status_code == 409
+        assert (await first).status_code == 200
@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from time7_gateway.clients.reader_client import build_ingest_pipeline
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.read_coalescer import ReadCoalescer
+from time7_gateway.services.tag_info_cache import TagInfoCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def event(tid="TID1", response="RESP", epc="EPC1"):
+    return {
+        "eventType": "tagInventory",
+        "tagInventoryEvent": {
+            "tidHex": tid,
+            "epcHex": epc,
+            "tagAuthenticationResponse": {"messageHex": "MSG", "responseHex": response},
+        },
+    }
+
+
+def test_repeat_only_inside_window_and_with_same_response():
+    clock = FakeClock()
+    c = ReadCoalescer(window_seconds=1.0, clock=clock)
+    c.remember("A", "E", "R", valid_for=3600)
+
+    assert c.is_repeat("A", "E", "R")
+    assert not c.is_repeat("A", "E", "OTHER")
+    assert not c.is_repeat("A", "E2", "R")
+    assert not c.is_repeat("B", "E", "R")
+
+    clock.now += 1.5
+    assert not c.is_repeat("A", "E", "R")
+
+
+def test_nothing_cached_means_no_coalescing():
+    c = ReadCoalescer(window_seconds=1.0, clock=FakeClock())
+    c.remember("A", "E", "R", valid_for=0)
+    assert not c.is_repeat("A", "E", "R")
+
+
+def test_window_is_capped_by_cache_expiry():
+    clock = FakeClock()
+    c = ReadCoalescer(window_seconds=10.0, clock=clock)
+    c.remember("A", "E", "R", valid_for=2.0)
+
+    clock.now += 2.5
+    assert not c.is_repeat("A", "E", "R")
+
+
+@pytest.mark.asyncio
+async def test_pipeline_coalesces_repeat_reads_after_first_result():
+    app = SimpleNamespace(state=SimpleNamespace(
+        active_tags=ActiveTags(remove_grace_seconds=5.0),
+        tag_info_cache=TagInfoCache(cache_ttl_hours=24),
+        ias_lookup=MagicMock(return_value=(True, "ok")),
+    ))
+    persisted = []
+    p = build_ingest_pipeline(app, coalesce_window=5.0, persist_fn=lambda **kw: persisted.append(kw))
+    p.start()
+
+    await p.put(event())
+    await p.drain()
+    for _ in range(20):
+        await p.put(event())
+    await p.put(event(response="CHANGED"))
+    await p.drain()
+    await p.stop()
+
+    coalescer = app.state.read_coalescer
+    # once the IAS result is cached, identical reads are coalesced; the changed one is not
+    assert coalescer.coalesced == 20
+    assert coalescer.full == 2
+    assert app.state.active_tags.get_active()[0].reads == 22
+    app.state.ias_lookup.assert_called_once()
+    assert len(persisted) == 1
@@ -6,49 +6,51 @@ TEST CHECKLIST
 ==============
 ImpinjReaderClient
   [ ] 1.  __init__ correctly sets base_url
-  [ ] 2.  __init__ creates httpx.AsyncClient with correct Basic Auth credentials
+  [ ] 2.  __init__ creates httpx.AsyncClient with correct Basic Auth credentials and a read-idle timeout
   [ ] 3.  stream_events constructs the correct URL (/data/stream)
   [ ] 4.  stream_events calls raise_for_status()
   [ ] 5.  stream_events skips empty lines
   [ ] 6.  stream_events correctly yields parsed JSON dicts
   [ ] 7.  aclose closes the underlying httpx client
 
-handle_invalid_tag
-  [ ] 8.  calls active_tags.sync_seen with the correct tag_id and seen_at
-  [ ] 9.  calls cache.set(tag_id, False, info_message)
-  [ ] 10. calls upsert_latest_tag with auth=False and the correct info
-  [ ] 11. does not raise an exception
-
 run_reader_stream — event filtering
-  [ ] 12. events where eventType != "tagInventory" are skipped (no cache/db calls)
-  [ ] 13. events where tag_id (tidHex) is empty are skipped
+  [ ] 8.  events where eventType != "tagInventory" are skipped (no cache/db calls)
+  [ ] 9.  events where tag_id (tidHex) is empty are skipped
 
 run_reader_stream — missing tagAuthenticationResponse
-  [ ] 14. empty tarDict triggers handle_invalid_tag with the correct info message
-  [ ] 15. empty tarDict does not call ias_lookup
+  [ ] 10. empty tarDict is recorded as an invalid tag with the correct info message
+  [ ] 11. empty tarDict does not call ias_lookup
 
 run_reader_stream — empty responseHex
-  [ ] 16. responseHex == "" triggers handle_invalid_tag with the correct info message
-  [ ] 17. responseHex == "" does not call ias_lookup
+  [ ] 12. responseHex == "" is recorded as an invalid tag with the correct info message
+  [ ] 13. responseHex == "" does not call ias_lookup
 
 run_reader_stream — tidHex fallback logic
-  [ ] 18. when tidHex is absent from tarDict, the outer tag_id is used instead
+  [ ] 14. when tidHex is absent from tarDict, the outer tag_id is used instead
 
 run_reader_stream — IAS cache logic
-  [ ] 19. a cache hit skips ias_lookup entirely
-  [ ] 20. a cache miss calls ias_lookup exactly once
-  [ ] 21. the ias_lookup result is correctly written to the cache
-  [ ] 22. the ias_lookup result is correctly written to the database (upsert_latest_tag)
+  [ ] 15. a cache hit skips ias_lookup entirely
+  [ ] 16. a cache miss calls ias_lookup exactly once
+  [ ] 17. the ias_lookup result is correctly written to the cache
+  [ ] 18. the ias_lookup result is correctly written to the database (db_writer bulk upsert)
 
 run_reader_stream — active_tags
-  [ ] 23. a valid event calls active_tags.sync_seen
-  [ ] 24. AuthPayload is constructed with the correct messageHex/responseHex/tidHex
+  [ ] 19. a valid event calls active_tags.sync_seen
+  [ ] 20. AuthPayload is constructed with the correct messageHex/responseHex/tidHex
 
 run_reader_stream — resource cleanup
-  [ ] 25. client.aclose() is called on normal exit
-  [ ] 26. client.aclose() is still called on exception (finally block)
+  [ ] 21. client.aclose() is called on normal exit
+  [ ] 22. client.aclose() is still called on exception (finally block)
+
+run_reader_stream — reconnect
+  [ ] 23. connection errors are retried on the same client and counted
+  [ ] 24. gives up after max_retries consecutive failures
+  [ ] 25. backoff delay grows and stays within the jitter bounds
 """
 
+import asyncio
+
+import httpx
 import pytest
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -105,8 +107,12 @@ class TestImpinjReaderClient:
     def test_init_creates_async_client_with_basic_auth(self):
         from time7_gateway.clients.reader_client import ImpinjReaderClient
         with patch(f"{MODULE}.httpx.AsyncClient") as mock_cls:
-            ImpinjReaderClient("http://reader", "admin", "secret")
-        mock_cls.assert_called_once_with(auth=("admin", "secret"), timeout=None)
+            ImpinjReaderClient("http://reader", "admin", "secret", idle_timeout=15.0)
+        mock_cls.assert_called_once()
+        _, kwargs = mock_cls.call_args
+        assert kwargs["auth"] == ("admin", "secret")
+        # read-idle timeout instead of timeout=None
+        assert kwargs["timeout"].read == 15.0
 
     # [✓] 3 & 4 & 5 & 6
     @pytest.mark.asyncio
@@ -150,52 +156,7 @@ class TestImpinjReaderClient:
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# 8-11  handle_invalid_tag
-# ═══════════════════════════════════════════════════════════════════════════════
-
-class TestHandleInvalidTag:
-
-    def _call(self, info_message="test error"):
-        from time7_gateway.clients.reader_client import handle_invalid_tag
-        active_tags = MagicMock()
-        cache = MagicMock()
-        seen_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
-
-        with patch(f"{MODULE}.upsert_latest_tag") as mock_db:
-            handle_invalid_tag(
-                tidHex="TID1",
-                epcHex="EPC1",
-                seen_at=seen_at,
-                active_tags=active_tags,
-                cache=cache,
-                info_message=info_message,
-            )
-        return active_tags, cache, mock_db, seen_at
-
-    # [✓] 8
-    def test_calls_sync_seen_with_tag_id_and_seen_at(self):
-        active_tags, _, _, seen_at = self._call()
-        active_tags.sync_seen.assert_called_once_with(["TID1"], epcHex={"TID1": "EPC1"}, seen_at=seen_at)
-
-    # [✓] 9
-    def test_sets_cache_auth_false(self):
-        _, cache, _, _ = self._call("some error")
-        cache.set.assert_called_once_with("TID1", False, "some error")
-
-    # [✓] 10
-    def test_upserts_db_auth_false(self):
-        _, _, mock_db, seen_at = self._call("db error")
-        mock_db.assert_called_once_with(
-            tidHex="TID1", seen_at=seen_at, auth=False, info="db error", epcHex="EPC1"
-        )
-
-    # [✓] 11
-    def test_does_not_raise(self):
-        self._call()
-
-
-# ═══════════════════════════════════════════════════════════════════════════════
-# 12-26  run_reader_stream
+# 8-22  run_reader_stream
 # ═══════════════════════════════════════════════════════════════════════════════
 
 class TestRunReaderStream:
@@ -224,77 +185,76 @@ class TestRunReaderStream:
         if app is None:
             app = make_app_state()
         with self._patch_client(events), self._patch_aclose(), \
-             patch(f"{MODULE}.upsert_latest_tag") as mock_db, \
              patch.dict("os.environ", {
                  "READER_BASE_URL": "http://reader",
                  "READER_USER": "u",
                  "READER_PASSWORD": "p",
              }):
             await run_reader_stream(app)
-        return app, mock_db
+        return app
 
-    # [✓] 12 — Non-tagInventory events are skipped
+    # [✓] 8 — Non-tagInventory events are skipped
     @pytest.mark.asyncio
     async def test_skips_non_tag_inventory_events(self):
         events = [{"eventType": "heartbeat"}, {"eventType": "status"}]
-        app, mock_db = await self._run(events)
+        app = await self._run(events)
         app.state.tag_info_cache.set.assert_not_called()
-        mock_db.assert_not_called()
+        app.state.db_writer.add.assert_not_called()
 
-    # [✓] 13 — Event with empty tag_id is skipped
+    # [✓] 9 — Event with empty tag_id is skipped
     @pytest.mark.asyncio
     async def test_skips_event_with_no_tag_id(self):
         events = [{"eventType": "tagInventory", "tagInventoryEvent": {"tidHex": ""}}]
-        app, mock_db = await self._run(events)
-        mock_db.assert_not_called()
+        app = await self._run(events)
+        app.state.db_writer.add.assert_not_called()
 
-    # [✓] 14 — Missing tagAuthenticationResponse triggers handle_invalid_tag
+    # [✓] 10 — Missing tagAuthenticationResponse is recorded as an invalid tag
     @pytest.mark.asyncio
-    async def test_missing_tar_calls_handle_invalid(self):
+    async def test_missing_tar_records_invalid_tag(self):
         events = [{
             "eventType": "tagInventory",
             "tagInventoryEvent": {"tidHex": "TID1", "epcHex": "EPC1"},
         }]
-        app, mock_db = await self._run(events)
-        mock_db.assert_called_once()
-        _, kwargs = mock_db.call_args
-        assert kwargs["auth"] is False
-        assert "tagAuthResponse" in kwargs["info"]
-
-    # [✓] 15 — Missing tar does not call ias_lookup
+        app = await self._run(events)
+        app.state.db_writer.add.assert_called_once()
+        (row,), _ = app.state.db_writer.add.call_args
+        assert row["tid_hex"] == "TID1"
+        assert row["auth"] is False
+        assert row["info"] == "Authentication Disabled"
+
+    # [✓] 11 — Missing tar does not call ias_lookup
     @pytest.mark.asyncio
     async def test_missing_tar_does_not_call_ias(self):
         events = [{
             "eventType": "tagInventory",
             "tagInventoryEvent": {"tidHex": "TID1"},
         }]
-        app, _ = await self._run(events)
+        app = await self._run(events)
         app.state.ias_lookup.assert_not_called()
 
-    # [✓] 16 — Empty responseHex triggers handle_invalid_tag
+    # [✓] 12 — Empty responseHex is recorded as an invalid tag
     @pytest.mark.asyncio
-    async def test_empty_response_hex_calls_handle_invalid(self):
+    async def test_empty_response_hex_records_invalid_tag(self):
         ev = make_valid_event(response="")
-        app, mock_db = await self._run([ev])
-        mock_db.assert_called_once()
-        _, kwargs = mock_db.call_args
-        assert kwargs["auth"] is False
-        assert "responseHex" in kwargs["info"]
+        app = await self._run([ev])
+        app.state.db_writer.add.assert_called_once()
+        (row,), _ = app.state.db_writer.add.call_args
+        assert row["auth"] is False
+        assert row["info"] == "Unsupported Tag"
 
-    # [✓] 17 — Empty responseHex does not call ias_lookup
+    # [✓] 13 — Empty responseHex does not call ias_lookup
     @pytest.mark.asyncio
     async def test_empty_response_hex_does_not_call_ias(self):
         ev = make_valid_event(response="")
-        app, _ = await self._run([ev])
+        app = await self._run([ev])
         app.state.ias_lookup.assert_not_called()
 
-    # [✓] 18 — Missing tidHex in tar falls back to outer tag_id
+    # [✓] 14 — Missing tidHex in tar falls back to outer tag_id
     @pytest.mark.asyncio
     async def test_fallback_tid_hex_uses_tag_id(self):
         ev = make_valid_event(tid="OUTER_TID", tid_in_tar=None)
         app = make_app_state()
         with self._patch_client([ev]), self._patch_aclose(), \
-             patch(f"{MODULE}.upsert_latest_tag"), \
              patch(f"{MODULE}.AuthPayload") as mock_payload, \
              patch.dict("os.environ", {
                  "READER_BASE_URL": "http://r", "READER_USER": "u", "READER_PASSWORD": "p"
@@ -305,13 +265,12 @@ class TestRunReaderStream:
         _, kwargs = mock_payload.call_args
         assert kwargs["tidHex"] == "OUTER_TID"
 
-    # [✓] 19 — Cache hit skips ias_lookup
+    # [✓] 15 — Cache hit skips ias_lookup
     @pytest.mark.asyncio
     async def test_cache_hit_skips_ias_lookup(self):
         ev = make_valid_event()
         app = make_app_state(cache_hit=(True, "cached"))
         with self._patch_client([ev]), self._patch_aclose(), \
-             patch(f"{MODULE}.upsert_latest_tag"), \
              patch.dict("os.environ", {
                  "READER_BASE_URL": "http://r", "READER_USER": "u", "READER_PASSWORD": "p"
              }):
@@ -320,50 +279,50 @@ class TestRunReaderStream:
 
         app.state.ias_lookup.assert_not_called()
 
-    # [✓] 20 — Cache miss calls ias_lookup exactly once
+    # [✓] 16 — Cache miss calls ias_lookup exactly once
     @pytest.mark.asyncio
     async def test_cache_miss_calls_ias_once(self):
         ev = make_valid_event()
-        app, _ = await self._run([ev])
+        app = await self._run([ev])
         app.state.ias_lookup.assert_called_once()
 
-    # [✓] 21 — IAS result is written to the cache
+    # [✓] 17 — IAS result is written to the cache
     @pytest.mark.asyncio
     async def test_ias_result_written_to_cache(self):
         ev = make_valid_event(tid="TID99", tid_in_tar="TID99")
         app = make_app_state()
         app.state.ias_lookup.return_value = (True, "ok")
-        app, _ = await self._run([ev], app=app)
+        app = await self._run([ev], app=app)
         app.state.tag_info_cache.set.assert_called_once_with("TID99", True, "ok")
 
-    # [✓] 22 — IAS result is written to the database
+    # [✓] 18 — IAS result is written to the database
     @pytest.mark.asyncio
     async def test_ias_result_written_to_db(self):
         ev = make_valid_event(tid="TID88", tid_in_tar="TID88")
         app = make_app_state()
         app.state.ias_lookup.return_value = (False, "fake")
-        app, mock_db = await self._run([ev], app=app)
-        _, kwargs = mock_db.call_args
-        assert kwargs["tidHex"] == "TID88"
-        assert kwargs["auth"] is False
-        assert kwargs["info"] == "fake"
-
-    # [✓] 23 — Valid event calls active_tags.sync_seen
+        app = await self._run([ev], app=app)
+        # queued on the write-behind buffer for the next bulk upsert
+        (row,), _ = app.state.db_writer.add.call_args
+        assert row["tid_hex"] == "TID88"
+        assert row["auth"] is False
+        assert row["info"] == "fake"
+
+    # [✓] 19 — Valid event calls active_tags.sync_seen
     @pytest.mark.asyncio
     async def test_valid_event_calls_sync_seen(self):
         ev = make_valid_event(tid="TID77", tid_in_tar="TID77")
-        app, _ = await self._run([ev])
+        app = await self._run([ev])
         app.state.active_tags.sync_seen.assert_called()
         args, _ = app.state.active_tags.sync_seen.call_args
         assert "TID77" in args[0]
 
-    # [✓] 24 — AuthPayload is built with the correct fields
+    # [✓] 20 — AuthPayload is built with the correct fields
     @pytest.mark.asyncio
     async def test_auth_payload_fields(self):
         ev = make_valid_event(message="MSG", response="RESP", tid_in_tar="TID_TAR")
         app = make_app_state()
         with self._patch_client([ev]), self._patch_aclose(), \
-             patch(f"{MODULE}.upsert_latest_tag"), \
              patch(f"{MODULE}.AuthPayload") as mock_payload, \
              patch.dict("os.environ", {
                  "READER_BASE_URL": "http://r", "READER_USER": "u", "READER_PASSWORD": "p"
@@ -375,21 +334,20 @@ class TestRunReaderStream:
             messageHex="MSG", responseHex="RESP", tidHex="TID_TAR"
         )
 
-    # [✓] 25 — aclose is called on normal exit
+    # [✓] 21 — aclose is called on normal exit
     @pytest.mark.asyncio
     async def test_aclose_called_on_normal_exit(self):
         from time7_gateway.clients.reader_client import run_reader_stream
         app = make_app_state()
         with self._patch_client([]), \
              patch(f"{MODULE}.ImpinjReaderClient.aclose", new_callable=AsyncMock) as mock_close, \
-             patch(f"{MODULE}.upsert_latest_tag"), \
              patch.dict("os.environ", {
                  "READER_BASE_URL": "http://r", "READER_USER": "u", "READER_PASSWORD": "p"
              }):
             await run_reader_stream(app)
         mock_close.assert_awaited_once()
 
-    # [✓] 26 — aclose is still called on exception (finally block)
+    # [✓] 22 — aclose is still called on exception (finally block)
     @pytest.mark.asyncio
     async def test_aclose_called_on_exception(self):
         from time7_gateway.clients.reader_client import run_reader_stream, ImpinjReaderClient
@@ -401,11 +359,84 @@ class TestRunReaderStream:
 
         with patch.object(ImpinjReaderClient, "stream_events", new=boom), \
              patch(f"{MODULE}.ImpinjReaderClient.aclose", new_callable=AsyncMock) as mock_close, \
-             patch(f"{MODULE}.upsert_latest_tag"), \
              patch.dict("os.environ", {
                  "READER_BASE_URL": "http://r", "READER_USER": "u", "READER_PASSWORD": "p"
              }):
             with pytest.raises(RuntimeError):
                 await run_reader_stream(app)
 
-        mock_close.assert_awaited_once()
\ No newline at end of file
+        mock_close.assert_awaited_once()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 23-25  run_reader_stream — reconnect
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestReconnect:
+
+    # [✓] 23
+    @pytest.mark.asyncio
+    async def test_reconnects_on_same_client_and_records_metrics(self):
+        from time7_gateway.clients.reader_client import (
+            ReaderDefinition, ReaderState, ReconnectPolicy, run_reader_stream,
+        )
+        app = make_app_state()
+        state = ReaderState(name="r1")
+        calls = {"n": 0}
+
+        async def flaky(self_inner, on_connect=None):
+            calls["n"] += 1
+            if calls["n"] <= 2:
+                raise httpx.ConnectError("reader down")
+            if on_connect:
+                on_connect()
+            yield make_valid_event()
+            if calls["n"] == 3:
+                raise httpx.ReadTimeout("idle")
+            raise asyncio.CancelledError()  # stop the test on the 4th connection
+
+        pipeline = MagicMock()
+        pipeline.put = AsyncMock()
+        with patch(f"{MODULE}.ImpinjReaderClient.stream_events", new=flaky), \
+             patch(f"{MODULE}.httpx.AsyncClient") as mock_cls:
+            mock_cls.return_value.aclose = AsyncMock()
+            with pytest.raises(asyncio.CancelledError):
+                await run_reader_stream(
+                    app, pipeline=pipeline, reader=ReaderDefinition("r1", "http://r"), state=state,
+                    reconnect=ReconnectPolicy(initial=0.001, maximum=0.002),
+                )
+
+        mock_cls.assert_called_once()            # same pooled client for every attempt
+        assert state.reconnects == 3
+        assert state.events == 2
+        assert "ReadTimeout" in state.last_error
+        assert state.last_downtime_seconds is not None
+        assert state.last_time_to_first_event is not None
+        assert not state.connected
+
+    # [✓] 24
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self):
+        from time7_gateway.clients.reader_client import ReconnectPolicy, run_reader_stream
+
+        async def down(self_inner, on_connect=None):
+            raise httpx.ConnectError("reader down")
+            yield
+
+        with patch(f"{MODULE}.ImpinjReaderClient.stream_events", new=down), self._patch_aclose():
+            with pytest.raises(ConnectionError):
+                await run_reader_stream(
+                    make_app_state(), pipeline=MagicMock(),
+                    reconnect=ReconnectPolicy(initial=0.001, maximum=0.001, max_retries=2),
+                )
+
+    # [✓] 25
+    def test_backoff_grows_with_jitter_bounds(self):
+        from time7_gateway.clients.reader_client import ReconnectPolicy
+        policy = ReconnectPolicy(initial=1.0, maximum=8.0)
+        for attempt, base in [(0, 1.0), (1, 2.0), (2, 4.0), (3, 8.0), (10, 8.0)]:
+            for _ in range(20):
+                assert base / 2 <= policy.delay(attempt) <= base
+
+    def _patch_aclose(self):
+        return patch(f"{MODULE}.ImpinjReaderClient.aclose", new_callable=AsyncMock)
@@ -0,0 +1,55 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from time7_gateway.models.schemas import AuthPayload
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.tag_info_cache import TagInfoCache
+from time7_gateway.simulators.reader_route import router
+
+
+class Writer:
+    def __init__(self):
+        self.rows = []
+
+    def add(self, row):
+        self.rows.append(row)
+
+
+def make_client(lookups):
+    async def ias_lookup(auth_payload):
+        assert isinstance(auth_payload, AuthPayload)
+        lookups.append(auth_payload)
+        return True, "ok"
+
+    app = FastAPI()
+    app.include_router(router)
+    app.state.active_tags = ActiveTags(remove_grace_seconds=60.0)
+    app.state.tag_info_cache = TagInfoCache()
+    app.state.ias_lookup = ias_lookup
+    app.state.db_writer = Writer()
+    return app, TestClient(app)
+
+
+def test_bare_tid_is_unsupported_without_an_ias_lookup():
+    lookups = []
+    app, client = make_client(lookups)
+
+    body = client.post("/reader/events", json={"tagIds": True, "tidHex": ["E2A"]}).json()
+
+    assert body == {"ok": True, "tags_seen": 1, "product_info_fetched": 0}
+    assert lookups == []
+    assert app.state.tag_info_cache.get("E2A") == (False, "Unsupported Tag")
+    assert len(app.state.db_writer.rows) == 1
+
+
+def test_tag_with_a_response_is_looked_up_as_an_auth_payload():
+    lookups = []
+    app, client = make_client(lookups)
+    tag = {"tidHex": "E2B", "messageHex": "F622293BD8CB", "responseHex": "537396a721a14d21"}
+
+    body = client.post("/reader/events", json={"tagIds": True, "tidHex": [tag, "E2A"]}).json()
+
+    assert body == {"ok": True, "tags_seen": 2, "product_info_fetched": 1}
+    assert lookups == [AuthPayload(**tag)]
+    assert app.state.tag_info_cache.get("E2B") == (True, "ok")
+    assert set(app.state.active_tags.get_active_ids()) == {"E2A", "E2B"}
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from time7_gateway.clients.reader_client import ReaderDefinition, build_ingest_pipeline
+from time7_gateway.clients.reader_supervisor import ReaderSupervisor, readers_from_env
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.tag_info_cache import TagInfoCache
+
+MODULE = "time7_gateway.clients.reader_client"
+
+
+def test_readers_from_env_single_reader_fallback():
+    env = {"READER_BASE_URL": "http://r1", "READER_USER": "u", "READER_PASSWORD": "p"}
+    with patch.dict("os.environ", env, clear=True):
+        readers = readers_from_env()
+    assert [(r.base_url, r.username, r.password) for r in readers] == [("http://r1", "u", "p")]
+
+
+def test_readers_from_env_url_list_and_json():
+    with patch.dict("os.environ", {"READERS": "http://a, http://b", "READER_USER": "u"}, clear=True):
+        readers = readers_from_env()
+    assert [r.name for r in readers] == ["reader-0", "reader-1"]
+    assert [r.base_url for r in readers] == ["http://a", "http://b"]
+    assert readers[1].username == "u"
+
+    raw = '[{"name": "dock-1", "base_url": "http://a", "username": "x", "password": "y"}]'
+    with patch.dict("os.environ", {"READERS": raw}, clear=True):
+        (reader,) = readers_from_env()
+    assert (reader.name, reader.username, reader.password) == ("dock-1", "x", "y")
+
+
+def test_duplicate_reader_names_rejected():
+    readers = [ReaderDefinition("a", "http://1"), ReaderDefinition("a", "http://2")]
+    with pytest.raises(ValueError):
+        ReaderSupervisor(MagicMock(), readers, MagicMock())
+
+
+@pytest.mark.asyncio
+async def test_each_reader_gets_its_own_state_and_feeds_one_pipeline():
+    per_reader = {"http://a": ["T1", "T2", "T3"], "http://b": ["T4"]}
+
+    async def fake_stream(self_inner, on_connect=None):
+        if on_connect:
+            on_connect()
+        for tid in per_reader[self_inner.base_url]:
+            yield {"eventType": "tagInventory", "tagInventoryEvent": {"tidHex": tid, "epcHex": "E"}}
+
+    app = SimpleNamespace(state=SimpleNamespace(
+        active_tags=ActiveTags(remove_grace_seconds=60.0),
+        tag_info_cache=TagInfoCache(),
+        ias_lookup=MagicMock(return_value=(True, "ok")),
+    ))
+    pipeline = build_ingest_pipeline(app, persist_fn=lambda **kw: None)
+    sup = ReaderSupervisor(app, [ReaderDefinition("a", "http://a"), ReaderDefinition("b", "http://b")], pipeline)
+
+    with patch(f"{MODULE}.ImpinjReaderClient.stream_events", new=fake_stream), \
+         patch(f"{MODULE}.ImpinjReaderClient.aclose", new_callable=AsyncMock):
+        sup.start()
+        for task in list(sup._tasks.values()):
+            await task
+        await sup.stop()
+
+    status = {s["name"]: s for s in sup.status()}
+    assert status["a"]["events"] == 3 and status["b"]["events"] == 1
+    assert status["a"]["last_event_at"] is not None
+    assert not sup.connected
+    assert set(app.state.active_tags.get_active_ids()) == {"T1", "T2", "T3", "T4"}
@@ -0,0 +1,38 @@
+import threading
+
+from time7_gateway.services.response_cache import ResponseCache, etag_for
+
+
+def test_body_is_built_once_per_key():
+    cache = ResponseCache()
+    builds = []
+    for key in (1, 1, 2, 2, 2):
+        body, etag = cache.get(key, lambda: builds.append(key) or f"body-{key}".encode())
+        assert (body, etag) == (f"body-{key}".encode(), etag_for(key))
+    assert builds == [1, 2]
+    assert cache.stats() == {"hits": 3, "builds": 2, "etag": '"2"'}
+
+
+def test_concurrent_readers_never_see_a_body_from_another_key():
+    cache = ResponseCache()
+    version = [0]
+    mismatched = []
+    stop = threading.Event()
+
+    def poll():
+        while not stop.is_set():
+            key = version[0]
+            body, etag = cache.get(key, lambda: str(key).encode())
+            # the etag must describe the body it came with, whichever key that was
+            if etag != etag_for(int(body)):
+                mismatched.append((key, body, etag))
+
+    threads = [threading.Thread(target=poll) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for _ in range(2000):
+        version[0] += 1
+    stop.set()
+    for t in threads:
+        t.join()
+    assert mismatched == []
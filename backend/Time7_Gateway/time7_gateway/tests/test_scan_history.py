@@ -0,0 +1,135 @@
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from time7_gateway.api.history import router
+from time7_gateway.services.scan_history import BloomFilter, ScanHistory
+
+
+class FakeClock:
+    def __init__(self, t=1_700_000_000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def make_history(tmp_path, clock, **kw):
+    kw.setdefault("auth_of", lambda tid: (True, "ok") if tid.startswith("A") else None)
+    return ScanHistory(str(tmp_path / "history"), clock=clock, **kw)
+
+
+def test_repeat_reads_compact_into_one_record(tmp_path):
+    clock = FakeClock()
+    h = make_history(tmp_path, clock)
+    for i, rssi in enumerate([-50, -42, -47]):
+        h.record("A1", antenna=1, rssi=rssi, epc="E", ts=clock.t + i * 0.1)
+    h.record("A1", antenna=2, rssi=-60, ts=clock.t)
+
+    clock.t += 2
+    assert h.flush() == 2
+    reads, _ = h.query(clock.t - 10, clock.t)
+    ant1 = next(r for r in reads if r["antenna"] == 1)
+    assert ant1["reads"] == 3
+    assert ant1["peakRssiCdbm"] == -42
+    assert (ant1["auth"], ant1["info"], ant1["epcHex"]) == (True, "ok", "E")
+
+
+def test_open_window_is_not_written_until_it_closes(tmp_path):
+    clock = FakeClock()
+    h = make_history(tmp_path, clock, window_seconds=1.0)
+    h.record("A1")
+    assert h.flush() == 0
+    clock.t += 1
+    assert h.flush() == 1
+
+
+def test_query_skips_segments_by_time_and_tid(tmp_path):
+    clock = FakeClock()
+    h = make_history(tmp_path, clock, segment_seconds=60)
+    for minute in range(3):
+        h.record(f"A{minute}", ts=clock.t)
+        clock.t += 1
+        h.flush()
+        clock.t += 59
+
+    assert h.stats()["segments"] == 3
+    start = clock.t - 180
+
+    reads, scan = h.query(start, start + 30)
+    assert [r["tidHex"] for r in reads] == ["A0"]
+    assert scan["segments_skipped"] == 2
+
+    reads, scan = h.query(start, clock.t, tid="A2")
+    assert [r["tidHex"] for r in reads] == ["A2"]
+    assert scan["segments_read"] == 1
+
+
+def test_reopen_keeps_history_and_drops_torn_tail(tmp_path):
+    clock = FakeClock()
+    h = make_history(tmp_path, clock)
+    h.record("A1", ts=clock.t)
+    clock.t += 2
+    h.flush()
+    seg = h._open.path   # not sealed: simulates a crash before close()
+    with open(seg, "ab") as f:
+        f.write(b"\x00" * 7)
+
+    h2 = make_history(tmp_path, clock)
+    reads, _ = h2.query(clock.t - 10, clock.t)
+    assert [r["tidHex"] for r in reads] == ["A1"]
+    assert os.path.exists(seg + ".idx")
+
+    h2.record("B1", ts=clock.t)
+    h2.close()
+    h3 = make_history(tmp_path, clock)
+    assert {r["tidHex"] for r in h3.query(clock.t - 10, clock.t + 10)[0]} == {"A1", "B1"}
+
+
+def test_retention_deletes_old_segments(tmp_path):
+    clock = FakeClock()
+    h = make_history(tmp_path, clock, segment_seconds=60, retention_seconds=3600)
+    h.record("A1", ts=clock.t)
+    clock.t += 2
+    h.flush()
+    clock.t += 120
+    h.record("A2", ts=clock.t)
+    clock.t += 2
+    h.flush()
+
+    clock.t += 3600
+    assert h.expire() == 1
+    assert [r["tidHex"] for r in h.query(0, clock.t)[0]] == ["A2"]
+
+
+def test_bloom_has_no_false_negatives():
+    bloom = BloomFilter.for_capacity(1000)
+    tids = [f"E280{i:020X}" for i in range(1000)]
+    for t in tids:
+        bloom.add(t)
+    assert all(t in bloom for t in tids)
+    misses = sum(f"FFFF{i:020X}" in bloom for i in range(10000))
+    assert misses < 300   # ~1% target
+
+
+def test_history_api(tmp_path):
+    clock = FakeClock()
+    h = make_history(tmp_path, clock)
+    h.record("A1", antenna=1, rssi=-40, ts=clock.t)
+    h.record("B1", antenna=1, rssi=-40, ts=clock.t)
+    clock.t += 2
+    h.flush()
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.state.scan_history = h
+    client = TestClient(app)
+    params = {"start": "2023-11-14T22:00:00Z", "end": "2023-11-14T23:00:00Z"}
+
+    body = client.get("/api/history", params={**params, "tid": "B1"}).json()
+    assert [(r["tidHex"], r["auth"]) for r in body["reads"]] == [("B1", None)]
+    assert body["truncated"] is False
+
+    assert client.get("/api/history", params={**params, "limit": 1}).json()["truncated"] is True
+    assert client.get("/api/history", params={"start": params["end"], "end": params["start"]}).status_code == 400
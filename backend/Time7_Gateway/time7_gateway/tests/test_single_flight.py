@@ -0,0 +1,105 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from time7_gateway.clients.reader_client import build_ingest_pipeline
+from time7_gateway.services.active_tags import ActiveTags
+from time7_gateway.services.single_flight import SingleFlight
+from time7_gateway.services.tag_info_cache import TagInfoCache
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    sf = SingleFlight()
+    started = 0
+    gate = asyncio.Event()
+
+    async def work():
+        nonlocal started
+        started += 1
+        await gate.wait()
+        return "result"
+
+    waiters = [asyncio.create_task(sf.do("T1", work)) for _ in range(10)]
+    await asyncio.sleep(0)
+    gate.set()
+
+    assert await asyncio.gather(*waiters) == ["result"] * 10
+    assert started == 1
+    assert sf.stats() == {"calls": 1, "saved": 9, "inflight": 0}
+
+
+@pytest.mark.asyncio
+async def test_exception_reaches_every_waiter_and_key_is_released():
+    sf = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0)
+        raise RuntimeError("ias down")
+
+    results = await asyncio.gather(sf.do("T1", boom), sf.do("T1", boom), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert not sf.inflight("T1")
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_shared_work():
+    sf = SingleFlight()
+    gate = asyncio.Event()
+
+    async def work():
+        await gate.wait()
+        return 42
+
+    first = asyncio.create_task(sf.do("T1", work))
+    second = asyncio.create_task(sf.do("T1", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    gate.set()
+
+    assert await second == 42
+
+
+def tag_event(tid):
+    return {
+        "eventType": "tagInventory",
+        "tagInventoryEvent": {
+            "tidHex": tid,
+            "epcHex": "E",
+            "tagAuthenticationResponse": {"messageHex": "M", "responseHex": "R"},
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_pipeline_sends_one_ias_request_per_new_tag():
+    gate = asyncio.Event()
+    calls = []
+
+    async def slow_ias(payload):
+        calls.append(payload.tidHex)
+        await gate.wait()
+        return True, "ok"
+
+    app = SimpleNamespace(state=SimpleNamespace(
+        active_tags=ActiveTags(remove_grace_seconds=60.0),
+        tag_info_cache=TagInfoCache(),
+        ias_lookup=slow_ias,
+    ))
+    persisted = []
+    p = build_ingest_pipeline(app, coalesce_window=0, persist_fn=lambda **kw: persisted.append(kw["tidHex"]))
+    p.start()
+
+    # reads keep arriving while the first lookup is still pending
+    for _ in range(20):
+        for tid in ("A", "B"):
+            await p.put(tag_event(tid))
+        await asyncio.sleep(0.001)
+    gate.set()
+    await p.drain()
+    await p.stop()
+
+    assert sorted(calls) == ["A", "B"]
+    assert app.state.ias_flights.shared > 0
+    assert sorted(persisted) == ["A", "B"]
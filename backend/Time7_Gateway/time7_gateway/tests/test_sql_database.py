@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+
+from time7_gateway.services.database import tag_row
+from time7_gateway.services.sql_database import SqlDatabase, data
+from time7_gateway.services.write_behind import WriteBehind
+
+SEEN = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+async def make_db(tmp_path):
+    db = SqlDatabase(f"sqlite+aiosqlite:///{tmp_path / 'gateway.sqlite'}")
+    await db.prepare()
+    return db
+
+
+async def rows(db):
+    async with db.engine.connect() as conn:
+        result = await conn.execute(select(data).order_by(data.c.tid_hex))
+        return [dict(r._mapping) for r in result]
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_inserts_then_updates(tmp_path):
+    db = await make_db(tmp_path)
+    await db.upsert_latest_tags([tag_row("A", SEEN, True, "ok", "E1"), tag_row("B", SEEN, False, "Unsupported Tag", None)])
+    await db.upsert_latest_tags([tag_row("A", SEEN, False, "revoked", "E2")])
+
+    got = await rows(db)
+    assert [(r["tid_hex"], r["auth"], r["info"], r["epc_hex"]) for r in got] == [
+        ("A", False, "revoked", "E2"),
+        ("B", False, "Unsupported Tag", None),
+    ]
+    assert db.stats()["rows_written"] == 3
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_single_row_interface_matches_supabase_function(tmp_path):
+    db = await make_db(tmp_path)
+    await db.upsert_latest_tag(tidHex="A", seen_at=SEEN, auth=True, info="ok", epcHex="E1")
+
+    (row,) = await rows(db)
+    assert row["tid_hex"] == "A"
+    assert row["first_seen"].replace(tzinfo=timezone.utc) == SEEN
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_write_behind_awaits_async_backend(tmp_path):
+    db = await make_db(tmp_path)
+    writer = WriteBehind(db.upsert_latest_tags, max_batch=100, max_age=60)
+    for i in range(250):
+        writer.add(tag_row(f"T{i:03d}", SEEN, True, "ok", None))
+    await writer.close()
+
+    assert len(await rows(db)) == 250
+    assert db.stats()["batches"] == 3
+    await db.close()
@@ -0,0 +1,114 @@
+import asyncio
+from collections import Counter
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from time7_gateway.clients.event_decoder import ImpinjEventDecoder
+from time7_gateway.models.schemas import AuthPayload
+from time7_gateway.simulators.ias_services import mock_ias_lookup
+from time7_gateway.simulators.reader_streamer import DATA_FILE, _lines, ndjson_line_stream, router
+from time7_gateway.simulators.tag_generator import GeneratorConfig, SyntheticReader, parse_mix
+
+
+def decode_all(body: bytes):
+    dec = ImpinjEventDecoder()
+    return [dec.decode(line) for line in body.splitlines() if line]
+
+
+def classify(inv) -> str:
+    if not inv.tarPresent:
+        return "disabled"
+    if not inv.responseHex:
+        return "unsupported"
+    auth, _ = mock_ias_lookup(AuthPayload(messageHex=inv.messageHex, responseHex=inv.responseHex, tidHex=inv.tidHex))
+    return "passing" if auth else "failing"
+
+
+def test_parse_mix_normalises_and_rejects_unknown_kinds():
+    assert parse_mix("passing=3, failing=1") == {"passing": 0.75, "failing": 0.25}
+    with pytest.raises(ValueError):
+        parse_mix("valid=1")
+    with pytest.raises(ValueError):
+        parse_mix("passing=0")
+
+
+def test_generated_tags_follow_the_mix_and_authenticate_like_the_ias_expects():
+    mix = parse_mix("passing=1,failing=1,unsupported=1,disabled=1")
+    reader = SyntheticReader(GeneratorConfig(tags=400, mix=mix, antennas=4, seed=7))
+
+    events = decode_all(reader.chunk(4000))
+
+    assert len(events) == 4000 and all(e is not None for e in events)
+    assert len({e.tidHex for e in events}) > 350
+    assert {e.antennaPort for e in events} == {1, 2, 3, 4}
+
+    kinds = {}
+    for e in events:
+        kinds.setdefault(e.tidHex, classify(e))
+    counts = Counter(kinds.values())
+    assert set(counts) == {"passing", "failing", "unsupported", "disabled"}
+    assert all(60 < n < 140 for n in counts.values())
+
+
+def test_each_tag_keeps_its_challenge_and_response():
+    reader = SyntheticReader(GeneratorConfig(tags=5, seed=1))
+    seen = {}
+    for e in decode_all(reader.chunk(200)):
+        assert seen.setdefault(e.tidHex, (e.messageHex, e.responseHex)) == (e.messageHex, e.responseHex)
+    assert len(seen) == 5
+
+
+def test_churn_replaces_tags_over_time():
+    reader = SyntheticReader(GeneratorConfig(tags=100, churn=10.0, seed=3))
+    before = set(reader.tag_ids)
+
+    reader.chunk(10, elapsed=2.5)
+
+    after = set(reader.tag_ids)
+    assert len(after) == 100
+    assert 15 <= len(before - after) <= 25
+    assert reader.stats()["departures"] == 25
+
+
+@pytest.mark.asyncio
+async def test_stream_is_paced_in_chunks():
+    reader = SyntheticReader(GeneratorConfig(tags=50, rate=20_000, chunk_ms=20, seed=5))
+    chunks = []
+
+    async def consume():
+        async for chunk in reader.stream():
+            chunks.append(chunk)
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(0.3)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    lines = sum(c.count(b"\n") for c in chunks)
+    assert 3000 < lines < 9000
+    assert len(chunks) < 30
+
+
+@pytest.mark.asyncio
+async def test_file_stream_without_loop_replays_the_capture_once():
+    body = b"".join([c async for c in ndjson_line_stream(loop=False, rate_hz=0)])
+    assert body == b"".join(_lines(DATA_FILE))
+
+
+@pytest.mark.asyncio
+async def test_data_stream_selects_source_by_query_parameter():
+    app = FastAPI()
+    app.include_router(router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://sim") as client:
+        r = await client.get("/data/stream", params={"file": "datastream2.ndjson", "loop": "false", "rate_hz": 0})
+        assert r.status_code == 200
+        assert all(e is None or e.messageHex is not None for e in decode_all(r.content))
+
+        r = await client.get("/data/stream", params={"file": "../main.py"})
+        assert r.status_code == 404
+
+        r = await client.get("/data/stream", params={"source": "generator", "mix": "bogus=1"})
+        assert r.status_code == 422
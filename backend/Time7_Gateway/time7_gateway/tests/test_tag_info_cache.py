@@ -1,3 +1,4 @@
+import asyncio
 import types
 from datetime import datetime, timezone, timedelta
 
@@ -20,51 +21,142 @@ def test_set_then_get_returns_cached_tuple():
     assert cache.get("tag-1") == (True, "ok")
 
 
-def test_get_returns_none_and_deletes_when_expired(monkeypatch):
-    cache = TagInfoCache(cache_ttl_hours=24)
-
-    t0 = datetime(2026, 2, 12, 0, 0, 0, tzinfo=timezone.utc)
-   
-    t1 = t0 + timedelta(hours=25)
+class FakeClock:
+    def __init__(self, t: float = 1000.0):
+        self.t = t
 
-    
-    class FakeDateTime(datetime):
-        @classmethod
-        def now(cls, tz=None):
-          
-            return t1 if tz else t1.replace(tzinfo=None)
+    def __call__(self) -> float:
+        return self.t
 
-  
-    cache.set("tag-1", True, "ok")
-    cache._cache["tag-1"].fetched_at = t0
 
-    monkeypatch.setattr(mod, "datetime", FakeDateTime)
+def test_get_returns_none_and_deletes_when_expired():
+    clock = FakeClock()
+    cache = TagInfoCache(cache_ttl_hours=24, clock=clock)
 
+    cache.set("tag-1", True, "ok")
+    clock.t += timedelta(hours=25).total_seconds()
 
     assert cache.get("tag-1") is None
     assert "tag-1" not in cache._cache
+    assert cache.stats()["expirations"] == 1
 
 
-def test_get_returns_value_when_not_expired(monkeypatch):
-    cache = TagInfoCache(cache_ttl_hours=24)
+def test_get_returns_value_when_not_expired():
+    clock = FakeClock()
+    cache = TagInfoCache(cache_ttl_hours=24, clock=clock)
 
-    t0 = datetime(2026, 2, 12, 0, 0, 0, tzinfo=timezone.utc)
-    t1 = t0 + timedelta(hours=23)
+    cache.set("tag-1", True, "ok")
+    clock.t += timedelta(hours=23).total_seconds()
+
+    assert cache.get("tag-1") == (True, "ok")
+    assert "tag-1" in cache._cache
+
+
+def test_expiry_ignores_wall_clock_jumps(monkeypatch):
+    clock = FakeClock()
+    cache = TagInfoCache(cache_ttl_hours=24, clock=clock)
+    cache.set("tag-1", True, "ok")
+
+    t1 = datetime.now(timezone.utc) + timedelta(days=30)
 
     class FakeDateTime(datetime):
         @classmethod
         def now(cls, tz=None):
             return t1 if tz else t1.replace(tzinfo=None)
 
-    cache.set("tag-1", True, "ok")
-    cache._cache["tag-1"].fetched_at = t0
-
     monkeypatch.setattr(mod, "datetime", FakeDateTime)
-
     assert cache.get("tag-1") == (True, "ok")
-    assert "tag-1" in cache._cache
 
 
+def test_set_with_old_fetched_at_keeps_remaining_ttl():
+    clock = FakeClock()
+    cache = TagInfoCache(cache_ttl_hours=24, clock=clock)
+
+    cache.set("tag-1", True, "ok", fetched_at=datetime.now(timezone.utc) - timedelta(hours=23))
+    assert 3500 < cache.remaining_ttl("tag-1") <= 3600
+
+    cache.set("tag-2", True, "ok", fetched_at=datetime.now(timezone.utc) - timedelta(hours=25))
+    assert cache.get("tag-2") is None
+
+
+def test_lru_eviction_by_entry_count():
+    cache = TagInfoCache(max_entries=2)
+    cache.set("a", True, "ok")
+    cache.set("b", True, "ok")
+    cache.get("a")            # a is now most recently used
+    cache.set("c", True, "ok")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == (True, "ok")
+    assert cache.get("c") == (True, "ok")
+    assert cache.stats()["evictions"] == 1
+
+
+def test_eviction_by_bytes():
+    one = TagInfoCache()
+    one.set("a" * 24, True, "ok")
+    per_entry = one.stats()["bytes"]
+
+    cache = TagInfoCache(max_bytes=per_entry * 3)
+    for i in range(10):
+        cache.set(f"{i:024d}", True, "ok")
+
+    stats = cache.stats()
+    assert stats["entries"] == 3
+    assert stats["bytes"] <= per_entry * 3
+    assert stats["evictions"] == 7
+
+
+def test_overwrite_does_not_double_count_bytes():
+    cache = TagInfoCache()
+    cache.set("a", True, "ok")
+    before = cache.stats()["bytes"]
+    cache.set("a", True, "ok")
+    assert cache.stats()["bytes"] == before
+    assert len(cache) == 1
+
+
+def test_sweep_removes_expired_in_bounded_steps():
+    clock = FakeClock()
+    cache = TagInfoCache(cache_ttl_hours=1, clock=clock)
+    for i in range(10):
+        cache.set(f"old-{i}", True, "ok")
+    clock.t += 1800
+    cache.set("fresh", True, "ok")
+    clock.t += 1801
+
+    assert cache.sweep(budget=4) == 4
+    assert cache.sweep(budget=100) == 6
+    assert cache.sweep(budget=100) == 0
+    assert cache.get("fresh") == (True, "ok")
+    assert cache.stats()["expirations"] == 10
+
+
+def test_hit_miss_counters():
+    cache = TagInfoCache()
+    cache.get("a")
+    cache.set("a", True, "ok")
+    cache.get("a")
+    cache.get("a")
+
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_run_sweeper_reclaims_in_background():
+    clock = FakeClock()
+    cache = TagInfoCache(cache_ttl_hours=1, clock=clock)
+    cache.set("a", True, "ok")
+    clock.t += 3601
+
+    task = asyncio.create_task(cache.run_sweeper(interval=0.01))
+    await asyncio.sleep(0.05)
+    task.cancel()
+
+    assert len(cache) == 0
+
 
 def test_snapshot_sorted_and_counts_items_if_snapshot_is_method():
    
@@ -86,4 +178,10 @@ def test_snapshot_as_module_function_if_not_method():
 
     snap = mod.snapshot(cache)
     assert snap["count"] == 2
-    assert [x["id"] for x in snap["items"]] == ["a", "b"]
\ No newline at end of file
+    assert [x["id"] for x in snap["items"]] == ["a", "b"]
+
+def test_set_reports_whether_result_changed():
+    cache = TagInfoCache()
+    assert cache.set("a", True, "ok") is True
+    assert cache.set("a", True, "ok") is False
+    assert cache.set("a", False, "ok") is True
@@ -0,0 +1,93 @@
+import sqlite3
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from time7_gateway.services.tag_info_cache import TagInfoCache
+from time7_gateway.services.tag_info_store import TagInfoStore
+
+
+def test_flush_then_load_restores_entries(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = TagInfoCache()
+    store = TagInfoStore(path)
+    store.attach(cache)
+
+    cache.set("A", True, "ok")
+    cache.set("B", False, "Unsupported Tag")
+    store.close()
+
+    warm = TagInfoCache()
+    assert TagInfoStore(path).load(warm) == 2
+    assert warm.get("A") == (True, "ok")
+    assert warm.get("B") == (False, "Unsupported Tag")
+
+
+def test_load_keeps_original_fetched_at(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = TagInfoCache(cache_ttl_hours=24)
+    store = TagInfoStore(path)
+    store.attach(cache)
+
+    cache.set("A", True, "ok", fetched_at=datetime.now(timezone.utc) - timedelta(hours=23))
+    cache.set("OLD", True, "ok", fetched_at=datetime.now(timezone.utc) - timedelta(hours=25))
+    store.close()
+
+    warm = TagInfoCache(cache_ttl_hours=24)
+    assert TagInfoStore(path).load(warm) == 1
+    assert warm.get("OLD") is None
+    assert 3500 < warm.remaining_ttl("A") <= 3600
+
+
+def test_latest_result_per_tid_wins(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = TagInfoCache()
+    store = TagInfoStore(path)
+    store.attach(cache)
+
+    cache.set("A", False, "first")
+    store.flush()
+    cache.set("A", True, "second")
+    store.close()
+
+    warm = TagInfoCache()
+    TagInfoStore(path).load(warm)
+    assert warm.get("A") == (True, "second")
+
+
+def test_load_does_not_mark_rows_pending(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = TagInfoCache()
+    store = TagInfoStore(path)
+    store.attach(cache)
+    cache.set("A", True, "ok")
+    store.close()
+
+    warm = TagInfoCache()
+    store2 = TagInfoStore(path)
+    store2.attach(warm)
+    store2.load(warm)
+
+    assert store2.stats()["pending"] == 0
+
+
+def test_compact_drops_expired_rows(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    store = TagInfoStore(path, ttl_seconds=3600)
+    store.record("A", True, "ok", datetime.now(timezone.utc))
+    store.record("OLD", True, "ok", datetime.now(timezone.utc) - timedelta(hours=2))
+    store.flush()
+
+    assert store.compact() == 1
+    rows = sqlite3.connect(path).execute("SELECT tid_hex FROM tag_info").fetchall()
+    assert rows == [("A",)]
+
+
+def test_failed_flush_keeps_batch(tmp_path):
+    store = TagInfoStore(str(tmp_path / "cache.sqlite"))
+    store.record("A", True, "ok", datetime.now(timezone.utc))
+    store._db.execute("DROP TABLE tag_info")
+
+    with pytest.raises(sqlite3.Error):
+        store.flush()
+    assert store.stats()["pending"] == 1
@@ -0,0 +1,152 @@
+import asyncio
+import threading
+
+import pytest
+
+from time7_gateway.services.write_behind import WriteBehind
+
+
+def row(tid, info="ok"):
+    return {"tid_hex": tid, "info": info}
+
+
+class Recorder:
+    def __init__(self, fail=0):
+        self.batches = []
+        self.threads = set()
+        self.fail = fail
+
+    def __call__(self, rows):
+        self.threads.add(threading.get_ident())
+        if self.fail:
+            self.fail -= 1
+            raise ConnectionError("supabase down")
+        self.batches.append(list(rows))
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_in_one_write_off_the_loop():
+    db = Recorder()
+    wb = WriteBehind(db, max_batch=100, max_age=60)
+    for i in range(250):
+        wb.add(row(f"T{i}"))
+    await asyncio.sleep(0.05)
+
+    assert [len(b) for b in db.batches] == [100, 100]
+    assert len(wb) == 50
+    assert threading.get_ident() not in db.threads
+    await wb.close()
+    assert [len(b) for b in db.batches] == [100, 100, 50]
+
+
+@pytest.mark.asyncio
+async def test_age_threshold_flushes_a_small_batch():
+    db = Recorder()
+    wb = WriteBehind(db, max_batch=500, max_age=0.05)
+    wb.add(row("A"))
+    wb.add(row("B"))
+    await asyncio.sleep(0.02)
+    assert db.batches == []
+
+    await asyncio.sleep(0.1)
+    assert db.batches == [[row("A"), row("B")]]
+
+    # a row trickling in after the buffer went idle is flushed by age too
+    await asyncio.sleep(0.1)
+    wb.add(row("C"))
+    await asyncio.sleep(0.15)
+    assert db.batches == [[row("A"), row("B")], [row("C")]]
+    assert len(wb) == 0
+    await wb.close()
+
+
+@pytest.mark.asyncio
+async def test_pending_rows_coalesce_last_write_wins():
+    db = Recorder()
+    wb = WriteBehind(db, max_batch=500, max_age=60)
+    wb.add(row("A", "first"))
+    wb.add(row("B"))
+    wb.add(row("A", "second"))
+    await wb.close()
+
+    assert db.batches == [[row("A", "second"), row("B")]]
+    assert wb.stats()["coalesced"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_and_newer_rows_win():
+    db = Recorder(fail=1)
+    wb = WriteBehind(db, max_batch=500, max_age=60, retry_seconds=0)
+    wb.add(row("A", "old"))
+    wb.add(row("B"))
+    assert await wb.flush() is False
+    assert len(wb) == 2
+
+    wb.add(row("A", "new"))
+    await wb.close()
+    assert db.batches == [[row("A", "new"), row("B")]]
+    assert wb.stats()["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stats_report_batch_size_latency_and_backlog():
+    db = Recorder()
+    wb = WriteBehind(db, max_batch=3, max_age=60)
+    for tid in "ABCD":
+        wb.add(row(tid))
+    await asyncio.sleep(0.05)
+
+    stats = wb.stats()
+    assert stats["backlog"] == 1
+    assert stats["batches"] == 1
+    assert stats["last_batch_size"] == 3
+    assert stats["last_flush_ms"] is not None
+    await wb.close()
+    assert wb.stats()["backlog"] == 0
+    assert wb.stats()["rows_written"] == 4
+
+    with pytest.raises(RuntimeError):
+        wb.add(row("E"))
+
+
+@pytest.mark.asyncio
+async def test_close_during_a_slow_flush_loses_no_rows():
+    written = []
+    started = asyncio.Event()
+
+    async def slow_upsert(rows):
+        started.set()
+        await asyncio.sleep(0.1)
+        written.extend(r["tid_hex"] for r in rows)
+
+    wb = WriteBehind(slow_upsert, max_batch=4, max_age=60)
+    for i in range(10):
+        wb.add(row(f"T{i}"))
+    await started.wait()
+    await wb.close()
+    assert sorted(written) == sorted(f"T{i}" for i in range(10))
+    assert len(wb) == 0 and wb.stats()["rows_written"] == 10
+
+    db = Recorder()
+    slow = lambda rows: (threading.Event().wait(0.1), db(rows))   # noqa: E731
+    wb = WriteBehind(slow, max_batch=4, max_age=60)
+    for i in range(10):
+        wb.add(row(f"T{i}"))
+    await asyncio.sleep(0.02)
+    await wb.close()
+    assert sum(len(b) for b in db.batches) == 10
+
+
+@pytest.mark.asyncio
+async def test_cancelled_flush_puts_its_batch_back():
+    async def hang(rows):
+        await asyncio.sleep(10)
+
+    wb = WriteBehind(hang, max_batch=500, max_age=60)
+    wb.add(row("A"))
+    wb.add(row("B"))
+    flush = asyncio.create_task(wb.flush())
+    await asyncio.sleep(0.01)
+    flush.cancel()
+    await asyncio.gather(flush, return_exceptions=True)
+    assert len(wb) == 2 and wb.stats()["rows_written"] == 0
@@ -1,11 +1,23 @@
 import { useEffect, useRef, useState } from "react";
-import { fetchActiveTags, fetchReaderStatus } from "../services/gatewayClient";
+import { fetchActiveTagChanges, fetchReaderStatus } from "../services/gatewayClient";
+
+function toScan(r) {
+  return { ...r, id: String(r.tidHex).toUpperCase() };
+}
+
+// newest first_seen first, same order as /api/active-tags
+function byFirstSeenDesc(a, b) {
+  return Date.parse(b.first_seen) - Date.parse(a.first_seen);
+}
 
 export default function useActiveTags({ intervalMs = 1000 } = {}) {
   const [scans, setScans] = useState([]);
   const [gatewayStatus, setGatewayStatus] = useState("connecting");
   const [error, setError] = useState(null);
   const timerRef = useRef(null);
+  // rows by tidHex + the change-log position they reflect; only deltas are fetched after the first tick
+  const rowsRef = useRef(new Map());
+  const cursorRef = useRef({ version: null, epoch: null });
 
   const [readerConnected, setReaderConnected] = useState(false);
 
@@ -14,16 +26,24 @@ export default function useActiveTags({ intervalMs = 1000 } = {}) {
 
     async function tick() {
       try {
-        const [rows, readerStatus] = await Promise.all([
-          fetchActiveTags(),
+        const { version, epoch } = cursorRef.current;
+        const [delta, readerStatus] = await Promise.all([
+          fetchActiveTagChanges(version, epoch),
           fetchReaderStatus(),
         ]);
         if (!alive) return;
 
-        setScans((rows ?? []).map((r) => ({
-          ...r,
-          id: String(r.tidHex).toUpperCase(),
-        })));
+        const rows = rowsRef.current;
+        const upserts = delta?.upserts ?? [];
+        const removed = delta?.removed ?? [];
+        if (delta?.reset) rows.clear();
+        for (const r of upserts) rows.set(r.tidHex, toScan(r));
+        for (const tid of removed) rows.delete(tid);
+        cursorRef.current = { version: delta?.version ?? null, epoch: delta?.epoch ?? null };
+
+        if (delta?.reset || upserts.length || removed.length) {
+          setScans(Array.from(rows.values()).sort(byFirstSeenDesc));
+        }
 
         setReaderConnected(Boolean(readerStatus?.connected));
         setGatewayStatus("live");
@@ -2,23 +2,41 @@
  * @jest-environment jsdom
  */
 
-import { renderHook, waitFor } from "@testing-library/react";
+import { renderHook } from "@testing-library/react";
 import { act } from "react";
 import useActiveTags from "./useActiveTags";
-import { fetchActiveTags } from "../services/gatewayClient";
+import { fetchActiveTagChanges, fetchReaderStatus } from "../services/gatewayClient";
 
-// Factory mock: guarantees fetchActiveTags is a jest.fn()
+// Factory mock: the hook polls the delta endpoint and the reader status
 jest.mock("../services/gatewayClient", () => ({
-  fetchActiveTags: jest.fn(),
+  fetchActiveTagChanges: jest.fn(),
+  fetchReaderStatus: jest.fn(),
 }));
 
 // Helper to flush microtasks/promises
 const flushPromises = () => new Promise((r) => setTimeout(r, 0));
 
+// /api/active-tags/changes payload
+const delta = (overrides = {}) => ({
+  epoch: "e1",
+  version: 1,
+  reset: false,
+  upserts: [],
+  removed: [],
+  ...overrides,
+});
+
+const row = (tidHex, first_seen) => ({ tidHex, epcHex: "E", first_seen, auth: true, info: "ok" });
+const scan = (r) => ({ ...r, id: r.tidHex.toUpperCase() });
+
+const tagA = row("e2a", "2025-02-13T10:00:00Z");
+const tagB = row("e2b", "2025-02-13T10:00:01Z");
+
 describe("useActiveTags", () => {
   beforeEach(() => {
     jest.clearAllMocks();
     jest.useFakeTimers();
+    fetchReaderStatus.mockResolvedValue({ connected: true });
   });
 
   afterEach(() => {
@@ -26,20 +44,16 @@ describe("useActiveTags", () => {
   });
 
   test("should initialize with connecting status", () => {
-    fetchActiveTags.mockResolvedValueOnce([]);
+    fetchActiveTagChanges.mockResolvedValueOnce(delta({ reset: true }));
     const { result } = renderHook(() => useActiveTags());
 
-    expect(result.current.status).toBe("connecting");
+    expect(result.current.gatewayStatus).toBe("connecting");
     expect(result.current.scans).toEqual([]);
     expect(result.current.error).toBeNull();
   });
 
-  test("should set status to live after successful data fetch", async () => {
-    const mockData = [
-      { id: "tag1", timestamp: "2025-02-13T10:00:00" },
-      { id: "tag2", timestamp: "2025-02-13T10:00:01" },
-    ];
-    fetchActiveTags.mockResolvedValueOnce(mockData);
+  test("should set status to live after the first full list", async () => {
+    fetchActiveTagChanges.mockResolvedValueOnce(delta({ reset: true, upserts: [tagA, tagB] }));
 
     const { result } = renderHook(() => useActiveTags());
 
@@ -48,13 +62,17 @@ describe("useActiveTags", () => {
       await flushPromises();
     });
 
-    expect(result.current.status).toBe("live");
-    expect(result.current.scans).toEqual(mockData);
+    // first request has no cursor: full list
+    expect(fetchActiveTagChanges).toHaveBeenCalledWith(null, null);
+    expect(result.current.gatewayStatus).toBe("live");
+    // newest first_seen first
+    expect(result.current.scans).toEqual([scan(tagB), scan(tagA)]);
+    expect(result.current.readerConnected).toBe(true);
     expect(result.current.error).toBeNull();
   });
 
   test("should set status to error when fetch fails", async () => {
-    fetchActiveTags.mockRejectedValueOnce(new Error("Network error"));
+    fetchActiveTagChanges.mockRejectedValueOnce(new Error("Network error"));
 
     const { result } = renderHook(() => useActiveTags());
 
@@ -62,14 +80,15 @@ describe("useActiveTags", () => {
       await flushPromises();
     });
 
-    expect(result.current.status).toBe("error");
+    expect(result.current.gatewayStatus).toBe("error");
     expect(result.current.error).toBe("Network error");
-    // NOTE: hook does not clear scans on error; initial scans is [] so this is true for first-fail case
     expect(result.current.scans).toEqual([]);
   });
 
-  test("should fetch data periodically at specified interval", async () => {
-    fetchActiveTags.mockResolvedValue([{ id: "tag1" }]);
+  test("should poll changes since the last version at the specified interval", async () => {
+    fetchActiveTagChanges
+      .mockResolvedValueOnce(delta({ reset: true, version: 5, upserts: [tagA] }))
+      .mockResolvedValue(delta({ version: 7 }));
 
     renderHook(() => useActiveTags({ intervalMs: 500 }));
 
@@ -77,24 +96,28 @@ describe("useActiveTags", () => {
     await act(async () => {
       await flushPromises();
     });
-    expect(fetchActiveTags).toHaveBeenCalledTimes(1);
+    expect(fetchActiveTagChanges).toHaveBeenCalledTimes(1);
+    expect(fetchReaderStatus).toHaveBeenCalledTimes(1);
 
-    // Next interval tick
+    // Next interval tick asks for changes after the version it has
     await act(async () => {
       jest.advanceTimersByTime(500);
       await flushPromises();
     });
-    expect(fetchActiveTags).toHaveBeenCalledTimes(2);
+    expect(fetchActiveTagChanges).toHaveBeenCalledTimes(2);
+    expect(fetchActiveTagChanges).toHaveBeenLastCalledWith(5, "e1");
 
     await act(async () => {
       jest.advanceTimersByTime(500);
       await flushPromises();
     });
-    expect(fetchActiveTags).toHaveBeenCalledTimes(3);
+    expect(fetchActiveTagChanges).toHaveBeenCalledTimes(3);
+    expect(fetchActiveTagChanges).toHaveBeenLastCalledWith(7, "e1");
+    expect(fetchReaderStatus).toHaveBeenCalledTimes(3);
   });
 
   test("should clean up interval timer on unmount", async () => {
-    fetchActiveTags.mockResolvedValue([]);
+    fetchActiveTagChanges.mockResolvedValue(delta());
 
     const clearIntervalSpy = jest.spyOn(global, "clearInterval");
 
@@ -104,7 +127,7 @@ describe("useActiveTags", () => {
     await act(async () => {
       await flushPromises();
     });
-    expect(fetchActiveTags).toHaveBeenCalledTimes(1);
+    expect(fetchActiveTagChanges).toHaveBeenCalledTimes(1);
 
     unmount();
     expect(clearIntervalSpy).toHaveBeenCalled();
@@ -117,7 +140,7 @@ describe("useActiveTags", () => {
     const promise = new Promise((resolve) => {
       resolveCallback = resolve;
     });
-    fetchActiveTags.mockReturnValue(promise);
+    fetchActiveTagChanges.mockReturnValue(promise);
 
     const { unmount, result } = renderHook(() => useActiveTags());
 
@@ -125,7 +148,7 @@ describe("useActiveTags", () => {
     unmount();
 
     // Resolve the in-flight promise
-    resolveCallback([{ id: "tag1" }]);
+    resolveCallback(delta({ reset: true, upserts: [tagA] }));
 
     // Flush microtasks; state should NOT update because alive=false
     await act(async () => {
@@ -133,12 +156,11 @@ describe("useActiveTags", () => {
     });
 
     expect(result.current.scans).toEqual([]);
-    // status stays whatever it was at render-time in this test setup
-    expect(result.current.status).toBe("connecting");
+    expect(result.current.gatewayStatus).toBe("connecting");
   });
 
-  test("should return empty array when data is null or undefined", async () => {
-    fetchActiveTags.mockResolvedValueOnce(null);
+  test("should return empty array when the response is null", async () => {
+    fetchActiveTagChanges.mockResolvedValueOnce(null);
 
     const { result } = renderHook(() => useActiveTags());
 
@@ -147,13 +169,13 @@ describe("useActiveTags", () => {
     });
 
     expect(result.current.scans).toEqual([]);
-    expect(result.current.status).toBe("live");
+    expect(result.current.gatewayStatus).toBe("live");
     expect(result.current.error).toBeNull();
   });
 
   test("should handle Error objects without message property", async () => {
     const customError = { toString: () => "Custom error string" };
-    fetchActiveTags.mockRejectedValueOnce(customError);
+    fetchActiveTagChanges.mockRejectedValueOnce(customError);
 
     const { result } = renderHook(() => useActiveTags());
 
@@ -161,12 +183,12 @@ describe("useActiveTags", () => {
       await flushPromises();
     });
 
-    expect(result.current.status).toBe("error");
+    expect(result.current.gatewayStatus).toBe("error");
     expect(result.current.error).toBe("Custom error string");
   });
 
   test("should reset interval when interval prop changes", async () => {
-    fetchActiveTags.mockResolvedValue([]);
+    fetchActiveTagChanges.mockResolvedValue(delta());
 
     const setIntervalSpy = jest.spyOn(global, "setInterval");
     const clearIntervalSpy = jest.spyOn(global, "clearInterval");
@@ -179,31 +201,34 @@ describe("useActiveTags", () => {
     await act(async () => {
       await flushPromises();
     });
-    expect(fetchActiveTags).toHaveBeenCalledTimes(1);
+    expect(fetchActiveTagChanges).toHaveBeenCalledTimes(1);
 
-    // Change interval -> triggers cleanup + new interval
+    // Change interval -> triggers cleanup + new interval (which ticks right away)
     rerender({ intervalMs: 500 });
 
     expect(clearIntervalSpy).toHaveBeenCalled(); // cleanup ran
     expect(setIntervalSpy).toHaveBeenCalled();   // new interval set
 
+    await act(async () => {
+      await flushPromises();
+    });
+    expect(fetchActiveTagChanges).toHaveBeenCalledTimes(2);
+
     await act(async () => {
       jest.advanceTimersByTime(500);
       await flushPromises();
     });
-    expect(fetchActiveTags).toHaveBeenCalledTimes(2);
+    expect(fetchActiveTagChanges).toHaveBeenCalledTimes(3);
 
     setIntervalSpy.mockRestore();
     clearIntervalSpy.mockRestore();
   });
 
-  test("should maintain live status during consecutive data updates", async () => {
-    const mockData1 = [{ id: "tag1" }];
-    const mockData2 = [{ id: "tag1" }, { id: "tag2" }];
-
-    fetchActiveTags
-      .mockResolvedValueOnce(mockData1) // first tick
-      .mockResolvedValueOnce(mockData2); // second tick
+  test("should apply upserts on top of the rows it has", async () => {
+    const tagA2 = { ...tagA, auth: false, info: "failed" };
+    fetchActiveTagChanges
+      .mockResolvedValueOnce(delta({ reset: true, upserts: [tagA] }))
+      .mockResolvedValueOnce(delta({ version: 2, upserts: [tagB, tagA2] }));
 
     const { result } = renderHook(() => useActiveTags({ intervalMs: 500 }));
 
@@ -211,24 +236,67 @@ describe("useActiveTags", () => {
       await flushPromises();
     });
 
-    expect(result.current.scans).toEqual(mockData1);
-    expect(result.current.status).toBe("live");
-    expect(result.current.error).toBeNull();
+    expect(result.current.scans).toEqual([scan(tagA)]);
+    expect(result.current.gatewayStatus).toBe("live");
 
     await act(async () => {
       jest.advanceTimersByTime(500);
       await flushPromises();
     });
 
-    expect(result.current.scans).toEqual(mockData2);
-    expect(result.current.status).toBe("live");
+    expect(result.current.scans).toEqual([scan(tagB), scan(tagA2)]);
+    expect(result.current.gatewayStatus).toBe("live");
     expect(result.current.error).toBeNull();
   });
 
+  test("should drop removed tags", async () => {
+    fetchActiveTagChanges
+      .mockResolvedValueOnce(delta({ reset: true, upserts: [tagA, tagB] }))
+      .mockResolvedValueOnce(delta({ version: 2, removed: ["e2b"] }));
+
+    const { result } = renderHook(() => useActiveTags({ intervalMs: 500 }));
+
+    await act(async () => {
+      await flushPromises();
+    });
+    expect(result.current.scans).toHaveLength(2);
+
+    await act(async () => {
+      jest.advanceTimersByTime(500);
+      await flushPromises();
+    });
+    expect(result.current.scans).toEqual([scan(tagA)]);
+  });
+
+  test("should replace all rows on a reset response", async () => {
+    // e.g. the gateway restarted (new epoch) or the client fell behind the change log
+    fetchActiveTagChanges
+      .mockResolvedValueOnce(delta({ reset: true, upserts: [tagA, tagB] }))
+      .mockResolvedValueOnce(delta({ epoch: "e2", version: 1, reset: true, upserts: [tagB] }))
+      .mockResolvedValue(delta({ epoch: "e2", version: 1 }));
+
+    const { result } = renderHook(() => useActiveTags({ intervalMs: 500 }));
+
+    await act(async () => {
+      await flushPromises();
+    });
+    await act(async () => {
+      jest.advanceTimersByTime(500);
+      await flushPromises();
+    });
+    expect(result.current.scans).toEqual([scan(tagB)]);
+
+    await act(async () => {
+      jest.advanceTimersByTime(500);
+      await flushPromises();
+    });
+    expect(fetchActiveTagChanges).toHaveBeenLastCalledWith(1, "e2");
+  });
+
   test("should recover from error state to live state", async () => {
-    fetchActiveTags
+    fetchActiveTagChanges
       .mockRejectedValueOnce(new Error("Connection failed")) // first tick
-      .mockResolvedValueOnce([{ id: "tag1" }]); // second tick
+      .mockResolvedValueOnce(delta({ reset: true, upserts: [tagA] })); // second tick
 
     const { result } = renderHook(() => useActiveTags({ intervalMs: 500 }));
 
@@ -237,17 +305,18 @@ describe("useActiveTags", () => {
       await flushPromises();
     });
 
-    expect(result.current.status).toBe("error");
+    expect(result.current.gatewayStatus).toBe("error");
     expect(result.current.error).toBe("Connection failed");
 
-    // second tick succeeds
+    // second tick succeeds; no cursor yet, so it asks for the full list
     await act(async () => {
       jest.advanceTimersByTime(500);
       await flushPromises();
     });
 
-    expect(result.current.status).toBe("live");
+    expect(fetchActiveTagChanges).toHaveBeenLastCalledWith(null, null);
+    expect(result.current.gatewayStatus).toBe("live");
     expect(result.current.error).toBeNull();
-    expect(result.current.scans).toEqual([{ id: "tag1" }]);
+    expect(result.current.scans).toEqual([scan(tagA)]);
   });
-});
\ No newline at end of file
+});
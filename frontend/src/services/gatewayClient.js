@@ -19,6 +19,20 @@ function mustGetGatewayUrl() {
     return await res.json();
   }
   
+  // Rows changed since `version` (from a previous response); omit both for a full list.
+  // Returns { epoch, version, reset, upserts, removed }.
+  export async function fetchActiveTagChanges(version, epoch) {
+    const base = mustGetGatewayUrl();
+    const params = new URLSearchParams();
+    if (version != null && epoch) {
+      params.set("since", String(version));
+      params.set("epoch", epoch);
+    }
+    const qs = params.toString();
+    const res = await mustOk(await fetch(`${base}/api/active-tags/changes${qs ? `?${qs}` : ""}`));
+    return await res.json();
+  }
+
   export async function sendTagIds(tagIds) {
     const base = mustGetGatewayUrl();
     const res = await mustOk(